@@ -0,0 +1,34 @@
+"""벤치마크와 테스트용 도구
+
+대체 서버(standin), 가짜 추출기, 모의 배치와 벤치마크 실행 코드는 프로그램(창과 명령행)에
+넣지 않고 이 패키지에 둡니다. 다운로더의 standin, bench, simulate 명령은 실행할 때만 이
+패키지를 불러오고, 테스트(tests/)도 여기서 대체 서버를 가져옵니다.
+
+다운로더 모듈의 파일 이름에 점이 있어 일반 import로 가져올 수 없으므로, 이 패키지를 불러올
+때 경로로 불러와 'youtube_downloader' 이름으로 등록합니다. 다운로더 명령에서 불러온 경우에는
+실행 중인 모듈이 이미 등록되어 있어 그대로 사용합니다.
+"""
+import importlib.util
+import os
+import sys
+
+DOWNLOADER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               'youtube_downloader_v1.0.1_kr.py')
+
+
+def load_downloader():
+    """다운로더 모듈을 한 번만 불러와 sys.modules에 등록합니다.
+    
+    Returns:
+        module: 다운로더 모듈
+    """
+    module = sys.modules.get('youtube_downloader')
+    if module is None:
+        spec = importlib.util.spec_from_file_location('youtube_downloader', DOWNLOADER_PATH)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['youtube_downloader'] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+load_downloader()
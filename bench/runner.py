@@ -0,0 +1,352 @@
+"""벤치마크와 예약 정책 모의 실행
+
+bench 명령(대체 서버로 엔진 전체 과정 또는 여러 작업자 프로세스 실행)과 simulate 명령
+(모의 배치로 예약 정책 비교)을 구현합니다.
+"""
+import json
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import tkinter as tk
+from collections import Counter
+from datetime import datetime
+
+import yt_dlp
+
+from youtube_downloader import (DEFAULT_JOB_OPTIONS, ClusterWorker, PhaseLog, SharedJobStore, YouTubeDownloader,
+                                format_rate, parse_duration, parse_rate, percentile, simulate_schedule)
+from bench.standin import StandInServer, standin_engine
+
+
+def sample_workload(seed=None):
+    """자막만 받는 작업, 1080p, 4K 영상이 섞인 모의 배치를 만듭니다.
+    
+    첫 배치(0초)는 자막만 받는 작업 10개, 자막과 1080p 영상 8개, 자막과 4K 영상 3개를
+    섞은 순서로 추가하고, 두 번째 배치(120초)는 자막과 720p 영상 4개를 추가합니다.
+    실제 크기는 예상 크기의 0.8-1.25배입니다.
+    
+    Args:
+        seed (int): 난수 시드
+        
+    Returns:
+        list: {'arrival', 'batch', 'caption', 'estimate', 'size', 'priority'} 딕셔너리 목록
+    """
+    rng = random.Random(seed)
+    mb = 1024 * 1024
+    first = ([0] * 10 + [int(rng.uniform(200, 400) * mb) for _ in range(8)]
+             + [int(rng.uniform(1500, 2200) * mb) for _ in range(3)])
+    rng.shuffle(first)
+    second = [int(rng.uniform(40, 80) * mb) for _ in range(4)]
+    workload = []
+    for arrival, batch, estimates in ((0.0, 'first', first), (120.0, 'second', second)):
+        for estimate in estimates:
+            workload.append({
+                'arrival': arrival,
+                'batch': batch,
+                'caption': True,
+                'estimate': estimate,
+                'size': int(estimate * rng.uniform(0.8, 1.25)),
+                'priority': 0,
+            })
+    return workload
+
+
+def run_simulate(args):
+    """simulate 명령을 실행합니다.
+    
+    같은 모의 배치를 이전 방식(준비 단계 없는 fifo)과 각 예약 정책으로 실행해
+    작업 완료 시간과 자막 완료 시간을 비교합니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    workload = sample_workload(args.seed)
+    options = {
+        'workers': args.workers,
+        'prepare_workers': args.prepare_workers,
+        'bandwidth': parse_rate(args.bandwidth),
+        'aging': parse_rate(args.aging),
+    }
+    results = [simulate_schedule(workload, 'fifo', prepare_lane=False, **options)]
+    results += [simulate_schedule(workload, policy, **options) for policy in args.policies]
+    print(json.dumps({
+        'jobs': len(workload),
+        'total_bytes': format_rate(sum(spec['size'] for spec in workload)).replace('/s', ''),
+        'results': results,
+    }, ensure_ascii=False, indent=2))
+    return 0
+
+
+def bench_node(store_path, server_url, work_dir, download_path, node, workers, lease):
+    """bench --nodes의 작업자 프로세스 함수: 공유 저장소의 작업이 모두 끝날 때까지 실행합니다."""
+    engine = standin_engine(work_dir, server_url, workers, download_path)
+    store = SharedJobStore(store_path, lease=lease)
+    worker = ClusterWorker(engine, store, node).start()
+    while not worker.idle():
+        time.sleep(ClusterWorker.POLL_INTERVAL)
+    worker.stop()
+    engine.http.close()
+    store.close()
+
+
+def run_cluster_bench(args):
+    """bench --nodes를 실행합니다.
+    
+    임시 공유 작업 저장소에 가짜 영상을 등록하고, 작업자 프로세스를 여러 개 띄워 같은
+    저장소에서 작업을 나눠 받게 합니다. 모든 작업자는 같은 다운로드 폴더를 씁니다.
+    --kill-after를 지정하면 그 시간 뒤 첫 작업자를 강제 종료해, 그 작업자가 가져간 작업이
+    임대가 끝난 뒤 다른 작업자에게 넘어가는지 확인합니다. 작업자 수를 바꿔 실행하면
+    작업자 수에 따른 처리량 변화를 비교할 수 있습니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    import tempfile
+    server = StandInServer(fail_rate=args.fail_rate, seed=args.seed, latency=args.latency,
+                           conn_rate=parse_rate(args.conn_rate), segments=args.segments,
+                           segment_size=int(parse_rate(args.segment_size)),
+                           file_size=int(parse_rate(args.file_size)), stream=args.stream).start()
+    lease = parse_duration(args.lease)
+    # Windows와 같은 방식으로 새 인터프리터에서 시작 (부모의 스레드와 연결을 물려받지 않음)
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store_path = os.path.join(temp_dir, 'store.db')
+        download_path = os.path.join(temp_dir, 'downloads')
+        store = SharedJobStore(store_path, lease=lease)
+        options = dict(DEFAULT_JOB_OPTIONS, language='모든 언어', resolution='1080p')
+        store.add([f"{server.url}/watch?v=bench{index:06d}" for index in range(args.jobs)], options)
+        started = time.monotonic()
+        nodes = []
+        for index in range(args.nodes):
+            work_dir = os.path.join(temp_dir, f"node{index}")
+            os.makedirs(work_dir)
+            process = context.Process(target=bench_node, args=(store_path, server.url, work_dir, download_path,
+                                                               f"node{index}", args.workers, lease))
+            process.start()
+            nodes.append(process)
+        killed = None
+        if args.kill_after is not None:
+            nodes[0].join(args.kill_after)
+            if nodes[0].is_alive():
+                nodes[0].terminate()
+                killed = 'node0'
+        for process in nodes:
+            process.join()
+        elapsed = time.monotonic() - started
+        stats = store.stats()
+        files = [name for name in os.listdir(download_path) if name.endswith('.mp4')]
+        store.close()
+    server.stop()
+    done = stats['jobs'].get('done', 0)
+    result = {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'params': {key: getattr(args, key) for key in ('jobs', 'nodes', 'workers', 'stream', 'file_size',
+                                                        'latency', 'conn_rate', 'fail_rate', 'lease',
+                                                        'kill_after', 'seed')},
+        'results': {
+            'elapsed': round(elapsed, 3),
+            'jobs': stats['jobs'],
+            'jobs_per_min': round(done * 60 / elapsed, 2),
+            'nodes': stats['nodes'],
+            'killed': killed,
+            'exit_codes': [process.exitcode for process in nodes],
+            'retried': stats['retried'],
+            'files': len(files),
+            'exactly_once': done == args.jobs == len(files),
+        },
+    }
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    print(text)
+    return 0 if result['results']['exactly_once'] else 1
+
+
+def run_bench(args):
+    """bench 명령을 실행합니다.
+    
+    대체 서버, 가짜 추출기(StandInIE), 가짜 자막 제공자(StandInTranscriptApi)로
+    네트워크 없이 제목 조회부터 자막, 크기 예상, 영상 다운로드, 해시 기록까지 엔진의
+    전체 과정을 실행하고 결과를 JSON으로 출력합니다. 사용자 설정 대신 기본 설정을
+    사용하므로 커밋 사이의 결과를 그대로 비교할 수 있습니다.
+    
+    UI 스레드 지연은 화면이 있으면 실제 창(YouTubeDownloader)을 띄워 Tk 메인 루프에서
+    pump_events()가 예정보다 늦게 실행된 시간과 실행에 걸린 시간으로 측정합니다.
+    화면이 없으면 같은 간격으로 이벤트를 모아 처리하는 보조 스레드로 흉내 내며,
+    결과의 ui_source가 'emulated'이면 Tk 메인 루프를 측정한 값이 아닙니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    if args.nodes:
+        return run_cluster_bench(args)
+    import tempfile
+    import subprocess
+    server = StandInServer(fail_rate=args.fail_rate, seed=args.seed, latency=args.latency,
+                           conn_rate=parse_rate(args.conn_rate), segments=args.segments,
+                           segment_size=int(parse_rate(args.segment_size)),
+                           file_size=int(parse_rate(args.file_size)), stream=args.stream).start()
+    phases = []
+    running_at, first_byte = {}, {}
+    
+    def listen(event):
+        now = time.monotonic()
+        if event['type'] == 'job' and event['state'] == 'running':
+            running_at.setdefault(event['job_id'], now)
+        elif event['type'] == 'progress' and event['stage'] != 'caption':
+            first_byte.setdefault(event['job_id'], now)
+        elif event['type'] == 'phase':
+            phases.append(event)
+    
+    interval = YouTubeDownloader.PUMP_INTERVAL / 1000
+    lags, pumps = [], []
+    
+    def run_window(app, work):
+        """Tk 메인 루프를 돌리며 pump_events()를 측정하고, work는 다른 스레드에서 실행합니다."""
+        pump = app.pump_events
+        due = [time.monotonic() + interval]
+        
+        def timed_pump():
+            begun = time.monotonic()
+            lags.append(max(0.0, begun - due[0]))
+            pump()
+            pumps.append(time.monotonic() - begun)
+            due[0] = time.monotonic() + interval
+        
+        # pump_events()는 self.pump_events로 다음 실행을 예약하므로 인스턴스 속성으로 바꿔 끼움
+        app.pump_events = timed_pump
+        done = threading.Event()
+        result = {}
+        
+        def target():
+            try:
+                result['value'] = work()
+            finally:
+                done.set()
+        
+        def poll():
+            if done.is_set():
+                app.quit()
+            else:
+                app.after(50, poll)
+        
+        threading.Thread(target=target, daemon=True).start()
+        app.after(50, poll)
+        app.mainloop()
+        app.destroy()
+        return result['value']
+    
+    def run_emulated(engine, work):
+        """화면이 없을 때 PUMP_INTERVAL마다 이벤트를 모아 처리하는 스레드로 지연을 흉내 냅니다."""
+        events = queue.Queue()
+        engine.add_listener(events.put)
+        stop = threading.Event()
+        
+        def ui_loop():
+            due = time.monotonic() + interval
+            while not stop.wait(max(0.0, due - time.monotonic())):
+                begun = time.monotonic()
+                lags.append(begun - due)
+                progress = {}
+                while True:
+                    try:
+                        event = events.get_nowait()
+                    except queue.Empty:
+                        break
+                    if event['type'] == 'progress':
+                        progress[(event['job_id'], event['stage'])] = event['percent']
+                pumps.append(time.monotonic() - begun)
+                due = time.monotonic() + interval
+        
+        ui = threading.Thread(target=ui_loop, daemon=True)
+        ui.start()
+        engine.start()
+        try:
+            return work()
+        finally:
+            stop.set()
+            ui.join()
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = standin_engine(temp_dir, server.url, args.workers)
+        engine.add_listener(listen)
+        
+        options = dict(DEFAULT_JOB_OPTIONS, language='모든 언어', resolution='1080p',
+                       download_path=engine.config['download_path'])
+        urls = [f"{server.url}/watch?v=bench{index:06d}" for index in range(args.jobs)]
+        
+        def work():
+            jobs = engine.submit_batch(urls, options)
+            engine.wait()
+            return jobs
+        
+        started = time.monotonic()
+        try:
+            # 창을 만들면서 엔진도 시작됨
+            app = YouTubeDownloader(engine=engine)
+        except tk.TclError:
+            app = None
+        ui_source = 'tk' if app else 'emulated'
+        jobs = run_window(app, work) if app else run_emulated(engine, work)
+        elapsed = time.monotonic() - started
+        
+        states = Counter(job.state for job in jobs)
+        downloaded = engine.metrics.snapshot()[('downloaded_bytes_total', ())]
+        ttfb = [first_byte[job_id] - running_at[job_id] for job_id in first_byte if job_id in running_at]
+        engine.http.close()
+    server.stop()
+    
+    def spread(values, digits=3):
+        if not values:
+            return None
+        return {'p50': round(percentile(values, 50), digits), 'p95': round(percentile(values, 95), digits),
+                'max': round(max(values), digits)}
+    
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    result = {
+        'commit': commit,
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'yt_dlp': yt_dlp.version.__version__,
+        'params': {key: getattr(args, key) for key in ('jobs', 'workers', 'stream', 'file_size', 'segments',
+                                                        'segment_size', 'latency', 'conn_rate', 'fail_rate',
+                                                        'seed')},
+        'results': {
+            'elapsed': round(elapsed, 3),
+            'jobs': dict(states),
+            'jobs_per_min': round(states['done'] * 60 / elapsed, 2),
+            'bytes': int(downloaded),
+            'bytes_per_sec': round(downloaded / elapsed),
+            'throughput': format_rate(downloaded / elapsed),
+            'ttfb': spread(ttfb),
+            'ui_source': ui_source,
+            'ui_lag': spread(lags, 4),
+            'ui_pump': spread(pumps, 4),
+            'phases': PhaseLog.summarize(phases),
+            'server_statuses': {str(key): value for key, value in server.counts.items()},
+            'governor': engine.governor.snapshot(),
+        },
+    }
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            base = json.load(f)['results']
+        result['compare'] = {
+            key: {'before': base.get(key), 'after': result['results'][key],
+                  'ratio': round(result['results'][key] / base[key], 3) if base.get(key) else None}
+            for key in ('elapsed', 'jobs_per_min', 'bytes_per_sec')
+        }
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    print(text)
+    return 0 if states['done'] == len(jobs) else 1
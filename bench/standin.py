@@ -0,0 +1,510 @@
+"""대체 서버와 가짜 추출기, 가짜 자막 제공자
+
+네트워크 없이 제목 조회, 자막, 영상 다운로드(progressive, DASH), 요청 오류와 속도 제한을
+흉내 내는 로컬 HTTP 서버와, 그 서버의 가짜 영상을 받는 엔진을 만드는 함수를 제공합니다.
+standin 명령, 벤치마크(bench.runner), 테스트에서 사용합니다.
+"""
+import copy
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import yt_dlp
+from yt_dlp.extractor.common import InfoExtractor
+
+from youtube_downloader import (DEFAULT_CONFIG, DownloadEngine, DownloadLogger, FragmentConcurrencyController,
+                                JobJournal, MetadataCache, PooledSession, RequestGovernor, SegmentedDownloader,
+                                extract_video_id, format_rate, load_config, parse_duration, parse_rate)
+
+
+# 대체 서버가 제공하는 DASH 매니페스트 (세그먼트 길이 2초)
+STANDIN_MPD = """<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static" minBufferTime="PT2S"
+     mediaPresentationDuration="PT{duration}S" profiles="urn:mpeg:dash:profile:isoff-live:2011">
+  <Period>
+    <AdaptationSet mimeType="video/mp4" contentType="video">
+      <Representation id="video" bandwidth="{bandwidth}" width="1920" height="1080" codecs="avc1.640028">
+        <SegmentTemplate timescale="1" duration="2" startNumber="1"
+                         initialization="init.mp4" media="seg-$Number$.m4s"/>
+      </Representation>
+    </AdaptationSet>
+  </Period>
+</MPD>
+"""
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """StandInServer의 요청 처리 클래스
+    
+    /dash/ 아래 경로에는 DASH 매니페스트와 세그먼트를, /info/ID와 /oembed에는 가짜 영상의
+    메타데이터를, 그 밖의 GET 요청에는 oEmbed 형식의 JSON을 응답합니다. 서버 설정에 따라 응답 전에 지연을 두고,
+    연결별 전송 속도를 제한하며, 일부 요청에는 429/5xx 오류를 주입합니다.
+    """
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        """GET 요청을 처리합니다."""
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        path = urlparse(self.path).path
+        if path == '/dash/manifest.mpd':
+            # 매니페스트 오류는 추출 단계 전체를 실패시키므로 오류를 주입하지 않음
+            self.send_body(server.dash_manifest().encode('utf-8'), 'application/dash+xml')
+            return
+        status = server.pick_fault()
+        if status:
+            self.send_response(status)
+            if server.retry_after is not None:
+                self.send_header('Retry-After', str(server.retry_after))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if path.startswith('/dash/'):
+            self.send_body(bytes(server.segment_size), 'video/mp4')
+        elif path == '/progressive.mp4':
+            self.send_range(server.file_bytes(), 'video/mp4')
+        elif path.startswith('/info/') or path == '/oembed':
+            query = parse_qs(urlparse(self.path).query)
+            video_id = extract_video_id(query['url'][0]) if 'url' in query else path.rsplit('/', 1)[-1]
+            self.send_body(json.dumps(server.video_info(video_id)).encode('utf-8'), 'application/json')
+        else:
+            self.send_body(json.dumps({'title': f"Stand-in {self.path}"}).encode('utf-8'),
+                           'application/json')
+    
+    def send_range(self, data, content_type):
+        """Range 헤더가 있으면 해당 범위를 206으로, 없으면 전체를 200으로 보냅니다.
+        
+        Args:
+            data (bytes): 파일 전체 내용
+            content_type (str): Content-Type 헤더 값
+        """
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+        if not match:
+            self.send_body(data, content_type)
+            return
+        start = int(match.group(1))
+        end = min(int(match.group(2) or len(data) - 1), len(data) - 1)
+        self.send_body(memoryview(data)[start:end + 1], content_type, status=206,
+                       headers={'Content-Range': f"bytes {start}-{end}/{len(data)}",
+                                'Accept-Ranges': 'bytes'})
+    
+    def send_body(self, body, content_type, status=200, headers=None):
+        """연결별 전송 속도 제한을 지키며 응답을 보냅니다.
+        
+        Args:
+            body (bytes): 응답 본문
+            content_type (str): Content-Type 헤더 값
+            status (int): 상태 코드
+            headers (dict): 추가 응답 헤더
+        """
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        rate = self.server.conn_rate
+        if not rate:
+            self.wfile.write(body)
+            return
+        chunk = max(1, int(rate / 10))
+        view = memoryview(body)
+        for offset in range(0, len(body), chunk):
+            self.wfile.write(view[offset:offset + chunk])
+            time.sleep(0.1)
+    
+    def log_message(self, format, *args):
+        """요청마다 출력되는 로그를 끕니다."""
+
+
+class StandInServer(ThreadingHTTPServer):
+    """오류를 주입하는 로컬 HTTP 대체 서버 클래스
+    
+    네트워크 없이 재시도, 백오프, 서킷 브레이커 동작을 확인할 때 사용합니다.
+    
+    Attributes:
+        counts (Counter): 응답한 상태 코드별 횟수
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, port=0, fail_rate=0.0, fail_statuses=(429, 503), fail_first=0,
+                 retry_after=None, seed=None, latency=0.0, conn_rate=0,
+                 segments=30, segment_size=256 * 1024, file_size=32 * 1024 * 1024, stream='progressive'):
+        """
+        Args:
+            port (int): 사용할 포트 (0이면 임의의 빈 포트)
+            fail_rate (float): 오류를 주입할 요청의 비율 (0-1)
+            fail_statuses (tuple): 주입할 상태 코드 목록
+            fail_first (int): 처음 N개의 요청은 항상 오류로 응답
+            retry_after (int): 오류 응답에 붙일 Retry-After 값 (초)
+            seed (int): 오류 주입 난수 시드
+            latency (float): 응답 전 지연 시간 (초)
+            conn_rate (float): 연결별 전송 속도 제한 (초당 바이트, 0이면 무제한)
+            segments (int): DASH 세그먼트 수
+            segment_size (int): DASH 세그먼트 크기 (바이트)
+            file_size (int): /progressive.mp4 파일 크기 (바이트)
+            stream (str): 가짜 영상이 제공하는 형식 ('progressive', 'dash', 'mixed')
+        """
+        super().__init__(('127.0.0.1', port), StandInHandler)
+        self.fail_rate = fail_rate
+        self.fail_statuses = tuple(fail_statuses)
+        self.fail_first = fail_first
+        self.retry_after = retry_after
+        self.latency = latency
+        self.conn_rate = conn_rate
+        self.segments = segments
+        self.segment_size = segment_size
+        self.file_size = file_size
+        self.stream = stream
+        self._file_bytes = None
+        self.counts = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    @property
+    def url(self):
+        """서버의 기본 URL"""
+        return f"http://127.0.0.1:{self.server_port}"
+    
+    def dash_manifest(self):
+        """DASH 매니페스트를 만듭니다.
+        
+        Returns:
+            str: MPD XML
+        """
+        return STANDIN_MPD.format(duration=self.segments * 2,
+                                  bandwidth=self.segment_size * 8 // 2)
+    
+    def video_info(self, video_id):
+        """가짜 영상의 메타데이터를 만듭니다 (StandInIE가 사용).
+        
+        Args:
+            video_id (str): 영상 ID
+            
+        Returns:
+            dict: 제목, 길이, 단일 파일 크기, 제공하는 형식
+        """
+        return {'title': f"Stand-in {video_id}", 'duration': self.segments * 2,
+                'file_size': self.file_size, 'stream': self.stream}
+    
+    def file_bytes(self):
+        """/progressive.mp4로 제공할 결정적인 파일 내용을 반환합니다.
+        
+        Returns:
+            bytes: 파일 내용
+        """
+        if self._file_bytes is None:
+            pattern = bytes(range(256))
+            self._file_bytes = (pattern * (self.file_size // len(pattern) + 1))[:self.file_size]
+        return self._file_bytes
+    
+    def pick_fault(self):
+        """이번 요청에 주입할 오류 상태 코드를 고릅니다.
+        
+        Returns:
+            int: 주입할 상태 코드 (정상 응답이면 None)
+        """
+        with self._lock:
+            served = sum(self.counts.values())
+            status = None
+            if served < self.fail_first or self._random.random() < self.fail_rate:
+                status = self._random.choice(self.fail_statuses)
+            self.counts[status or 200] += 1
+            return status
+    
+    def start(self):
+        """백그라운드 스레드에서 서버를 시작합니다.
+        
+        Returns:
+            StandInServer: 자기 자신
+        """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+    
+    def stop(self):
+        """서버를 중지합니다."""
+        self.shutdown()
+        self.server_close()
+
+
+class StandInIE(InfoExtractor):
+    """대체 서버의 가짜 영상 페이지를 처리하는 yt-dlp 추출기 클래스
+    
+    http://127.0.0.1:PORT/watch?v=ID 형식의 URL에서 /info/ID로 제목과 크기를 조회하고,
+    서버의 stream 설정에 따라 단일 파일(/progressive.mp4), DASH(/dash/manifest.mpd)
+    형식 또는 둘 다를 형식 목록으로 반환합니다. 벤치마크에서 엔진의 extractors에
+    추가해 네트워크 없이 전체 다운로드 과정을 실행할 때 사용합니다.
+    """
+    
+    IE_NAME = 'standin'
+    _VALID_URL = r'https?://127\.0\.0\.1:\d+/watch\?v=(?P<id>[\w-]{11})'
+    
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        base = url.split('/watch', 1)[0]
+        meta = self._download_json(f"{base}/info/{video_id}", video_id)
+        formats = []
+        if meta['stream'] in ('progressive', 'mixed'):
+            formats.append({
+                'format_id': '18',
+                'url': f"{base}/progressive.mp4",
+                'ext': 'mp4',
+                'protocol': 'http',
+                'width': 640,
+                'height': 360,
+                'vcodec': 'avc1.42001E',
+                'acodec': 'mp4a.40.2',
+                'filesize': meta['file_size'],
+            })
+        if meta['stream'] in ('dash', 'mixed'):
+            formats += self._extract_mpd_formats(f"{base}/dash/manifest.mpd", video_id, mpd_id='dash')
+        return {
+            'id': video_id,
+            'title': meta['title'],
+            'duration': meta['duration'],
+            'formats': formats,
+        }
+
+
+class StandInTranscript:
+    """StandInTranscriptApi가 돌려주는 언어별 자막 (youtube-transcript-api의 Transcript 대신 사용)"""
+    
+    def __init__(self, api, video_id, language_code):
+        self.api = api
+        self.video_id = video_id
+        self.language_code = language_code
+        self.is_generated = False
+    
+    def fetch(self):
+        """대체 서버에 자막 본문을 요청합니다 (지연과 오류 주입이 적용됨)."""
+        self.api.session.get(f"{self.api.base_url}/timedtext/{self.video_id}",
+                             params={'lang': self.language_code}).raise_for_status()
+        return self
+    
+    def to_raw_data(self):
+        """자막 줄 목록을 반환합니다."""
+        return [{'text': f"[{self.language_code}] {self.video_id} #{index}",
+                 'start': index * 2.0, 'duration': 2.0}
+                for index in range(self.api.lines)]
+
+
+class StandInTranscriptList:
+    """StandInTranscriptApi.list()가 돌려주는 자막 목록 (한국어와 영어 자막이 있음)"""
+    
+    LANGUAGES = ('ko', 'en')
+    
+    def __init__(self, api, video_id):
+        self.api = api
+        self.video_id = video_id
+    
+    def find_transcript(self, language_codes):
+        """요청한 언어 중 처음으로 있는 자막을 반환합니다."""
+        for code in language_codes:
+            if code in self.LANGUAGES:
+                return StandInTranscript(self.api, self.video_id, code)
+        raise LookupError(f"자막이 없습니다: {language_codes}")
+    
+    def __iter__(self):
+        """모든 자막을 차례로 돌려줍니다."""
+        return iter([StandInTranscript(self.api, self.video_id, code) for code in self.LANGUAGES])
+    
+    def find_generated_transcript(self, language_codes):
+        """자동 생성 자막은 없습니다."""
+        raise LookupError(f"자동 생성 자막이 없습니다: {language_codes}")
+
+
+class StandInTranscriptApi:
+    """대체 서버로 YouTubeTranscriptApi를 흉내 내는 자막 제공 클래스
+    
+    엔진의 transcript_api 대신 사용합니다. 목록 조회와 본문 요청은 엔진의 공유 세션으로
+    대체 서버에 보내므로 지연, 오류 주입, 재시도가 실제와 같이 적용됩니다.
+    """
+    
+    def __init__(self, session, base_url, lines=600):
+        """
+        Args:
+            session (PooledSession): 공유 HTTP 세션
+            base_url (str): 대체 서버 URL
+            lines (int): 자막 하나의 줄 수
+        """
+        self.session = session
+        self.base_url = base_url
+        self.lines = lines
+    
+    def list(self, video_id):
+        """영상의 자막 목록을 조회합니다."""
+        self.session.get(f"{self.base_url}/timedtext/{video_id}").raise_for_status()
+        return StandInTranscriptList(self, video_id)
+
+
+def run_standin(args):
+    """standin 명령을 실행합니다.
+    
+    --probe를 지정하면 서버를 띄운 뒤 요청 관리자를 거쳐 요청을 보내고
+    결과 요약을 JSON으로 출력합니다. 지정하지 않으면 중지할 때까지 서버를 실행합니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    server = StandInServer(port=args.port, fail_rate=args.fail_rate,
+                           fail_statuses=args.fail_status, fail_first=args.fail_first,
+                           retry_after=args.retry_after, seed=args.seed,
+                           latency=args.latency, conn_rate=parse_rate(args.conn_rate),
+                           segments=args.segments,
+                           segment_size=int(parse_rate(args.segment_size)),
+                           file_size=int(parse_rate(args.file_size))).start()
+    if args.dash_probe:
+        return probe_dash(server, args.dash_probe)
+    if args.segmented_probe:
+        return probe_segmented(server, args.segmented_probe)
+    if not args.probe:
+        print(f"대체 서버 실행 중: {server.url} (Ctrl+C로 종료)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.stop()
+        return 0
+    
+    config = load_config()
+    governor = RequestGovernor.from_config(config, on_pause=lambda seconds: print(
+        f"서킷 브레이커 열림: {seconds:.0f}초 대기"))
+    session = PooledSession.from_config(config, governor=governor)
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        statuses = Counter(pool.map(
+            lambda i: session.get(f"{server.url}/item/{i}").status_code, range(args.probe)))
+    summary = {
+        'elapsed': round(time.monotonic() - started, 3),
+        'client_statuses': dict(statuses),
+        'server_statuses': dict(server.counts),
+        'governor': governor.snapshot(),
+    }
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    session.close()
+    server.stop()
+    return 0
+
+
+def probe_dash(server, jobs):
+    """대체 서버의 DASH 스트림을 여러 번 받아 동시 조각 수 조정 과정을 출력합니다.
+    
+    Args:
+        server (StandInServer): 실행 중인 대체 서버
+        jobs (int): 차례로 실행할 다운로드 작업 수
+    """
+    import tempfile
+    config = load_config()
+    controller = FragmentConcurrencyController.from_config(config)
+    manifest_url = f"{server.url}/dash/manifest.mpd"
+    host = urlparse(manifest_url).hostname
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for index in range(jobs):
+            job_id = f"probe-{index}"
+            concurrent_fragments = controller.start(job_id, host)
+            ydl_opts = {
+                'outtmpl': os.path.join(temp_dir, f"{job_id}.%(ext)s"),
+                'progress_hooks': [lambda d, job_id=job_id: controller.observe(job_id, d)],
+                'concurrent_fragment_downloads': concurrent_fragments,
+                'logger': DownloadLogger(on_retry=lambda job_id=job_id: controller.report_retry(job_id)),
+                'noprogress': True,
+                'quiet': True,
+            }
+            started = time.monotonic()
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                controller.bind(job_id, ydl.params)
+                ydl.download([manifest_url])
+            elapsed = time.monotonic() - started
+            controller.finish(job_id)
+            results.append({
+                'job': job_id,
+                'concurrent_fragments': concurrent_fragments,
+                'elapsed': round(elapsed, 3),
+                'throughput': format_rate(server.segments * server.segment_size / elapsed),
+            })
+    print(json.dumps({'jobs': results, 'hosts': controller.snapshot(),
+                      'server_statuses': dict(server.counts)}, ensure_ascii=False, indent=2))
+    server.stop()
+    return 0
+
+
+def probe_segmented(server, connections):
+    """대체 서버의 단일 파일을 연결 1개와 여러 개로 받아 처리량을 비교합니다.
+    
+    Args:
+        server (StandInServer): 실행 중인 대체 서버
+        connections (int): 비교할 연결 수
+    """
+    import tempfile
+    session = PooledSession(pool_size=max(connections, 1))
+    file_url = f"{server.url}/progressive.mp4"
+    expected = hashlib.sha256(server.file_bytes()).hexdigest()
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for count in sorted({1, connections}):
+            filename = os.path.join(temp_dir, f"segmented-{count}.mp4")
+            downloader = SegmentedDownloader(session, connections=count, min_segment=1024 * 1024)
+            started = time.monotonic()
+            downloader.download(file_url, filename)
+            elapsed = time.monotonic() - started
+            digest = hashlib.sha256()
+            with open(filename, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+            checksum_ok = digest.hexdigest() == expected
+            results.append({
+                'connections': count,
+                'elapsed': round(elapsed, 3),
+                'throughput': format_rate(server.file_size / elapsed),
+                'checksum_ok': checksum_ok,
+            })
+    print(json.dumps({'results': results, 'server_statuses': dict(server.counts)},
+                     ensure_ascii=False, indent=2))
+    session.close()
+    server.stop()
+    return 0
+
+
+def standin_engine(work_dir, server_url, workers, download_path=None):
+    """대체 서버의 가짜 영상을 받는 벤치마크용 엔진을 만듭니다.
+    
+    사용자 설정 대신 기본 설정을 쓰고, 저널과 메타데이터 캐시는 work_dir에 둡니다.
+    
+    Args:
+        work_dir (str): 저널, 캐시, 다운로드 폴더를 만들 폴더
+        server_url (str): 대체 서버 URL
+        workers (int): 동시에 실행할 작업 수
+        download_path (str): 저장 폴더 (None이면 work_dir/downloads)
+        
+    Returns:
+        DownloadEngine: 시작하지 않은 엔진
+    """
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config.update({
+        'download_path': download_path or os.path.join(work_dir, 'downloads'),
+        'max_workers': workers,
+        'phase_log': '',
+        'media_store': '',
+        'metrics_port': 0,
+    })
+    os.makedirs(config['download_path'], exist_ok=True)
+    engine = DownloadEngine(config, journal=JobJournal(os.path.join(work_dir, 'jobs.db')))
+    engine.metadata.close()
+    engine.metadata = MetadataCache(os.path.join(work_dir, 'metadata.db'),
+                                    ttl=parse_duration(config['metadata_cache_ttl']))
+    engine.extractors = [StandInIE]
+    engine.transcript_api = StandInTranscriptApi(engine.http, server_url)
+    engine.oembed_url = f"{server_url}/oembed"
+    return engine
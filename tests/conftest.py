@@ -0,0 +1,44 @@
+"""테스트 공통 설정
+
+다운로더 모듈은 bench 패키지가 경로로 불러와 'youtube_downloader'로 등록하고, 대체 서버도
+bench 패키지에서 가져옵니다. 설정, 작업 기록, 캐시 파일은 작업 디렉터리에 만들어지므로
+테스트마다 임시 디렉터리에서 실행합니다.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench import load_downloader  # noqa: E402
+from bench.standin import StandInServer  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def ytd():
+    """다운로더 모듈"""
+    return load_downloader()
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """테스트마다 임시 디렉터리를 작업 디렉터리로 사용합니다."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def standin():
+    """옵션을 받아 대체 서버를 시작하고 테스트가 끝나면 중지하는 함수"""
+    servers = []
+    
+    def start(**options):
+        server = StandInServer(**options).start()
+        servers.append(server)
+        return server
+    
+    yield start
+    for server in servers:
+        server.stop()
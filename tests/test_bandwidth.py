@@ -0,0 +1,51 @@
+"""BandwidthScheduler의 시간대별 제한과 작업별 토큰 버킷 테스트"""
+from datetime import datetime, time
+
+import pytest
+
+
+def make_scheduler(ytd, **overrides):
+    config = dict(ytd.DEFAULT_CONFIG)
+    config.update(overrides)
+    return ytd.BandwidthScheduler(config)
+
+
+def test_parse_clock_accepts_single_digit_hour(ytd):
+    assert ytd.parse_clock('9:00') == time(9, 0)
+    assert ytd.parse_clock('23:59') == time(23, 59)
+    for value in ('24:00', '9', '9:0', '09:60', 'noon'):
+        with pytest.raises(ValueError):
+            ytd.parse_clock(value)
+
+
+def test_schedule_windows_compare_as_times(ytd):
+    scheduler = make_scheduler(ytd, bandwidth_limit='4M', bandwidth_schedule=[
+        {'start': '9:00', 'end': '18:00', 'limit': '1M'},
+        {'start': '22:00', 'end': '6:00', 'limit': '2M'},
+    ])
+    mb = 1024 * 1024
+    
+    assert scheduler.global_limit(datetime(2024, 1, 1, 10, 0)) == 1 * mb
+    assert scheduler.global_limit(datetime(2024, 1, 1, 18, 0)) == 4 * mb
+    assert scheduler.global_limit(datetime(2024, 1, 1, 23, 30)) == 2 * mb
+    assert scheduler.global_limit(datetime(2024, 1, 1, 5, 59)) == 2 * mb
+
+
+def test_invalid_schedule_in_config_file_is_ignored(ytd, workdir):
+    (workdir / ytd.CONFIG_FILE).write_text(
+        '{"bandwidth_schedule": [{"start": "9", "end": "18:00", "limit": "1M"}]}', encoding='utf-8')
+    
+    assert ytd.load_config()['bandwidth_schedule'] == []
+
+
+def test_jobs_for_same_video_have_separate_buckets(ytd):
+    scheduler = make_scheduler(ytd, job_bandwidth_limits={'dQw4w9WgXcQ': '1M'})
+    scheduler.register('clip', 'dQw4w9WgXcQ')
+    scheduler.register('full', 'dQw4w9WgXcQ')
+    
+    scheduler.consume_progress('clip', {'downloaded_bytes': 1024, 'filename': 'clip.mp4'})
+    scheduler.consume_progress('full', {'downloaded_bytes': 1024, 'filename': 'full.mp4'})
+    scheduler.unregister('clip')
+    
+    # 한 작업이 끝나도 같은 영상의 다른 작업은 계속 제한됨
+    assert scheduler.job_rates() == {'full': 1024 * 1024}
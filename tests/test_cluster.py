@@ -0,0 +1,109 @@
+"""공유 작업 저장소와 여러 작업자 프로세스 테스트"""
+import os
+import subprocess
+import sys
+import time
+
+from bench.standin import standin_engine
+from conftest import ROOT
+
+# 작업자 프로세스: bench 패키지에서 bench_node를 실행
+NODE_SCRIPT = (
+    "import sys\n"
+    "sys.path.insert(0, sys.argv[1])\n"
+    "from bench.runner import bench_node\n"
+    "bench_node(*sys.argv[2:7], int(sys.argv[7]), float(sys.argv[8]))\n"
+)
+
+
+def start_node(store_path, server_url, work_dir, download_path, node, lease):
+    os.makedirs(work_dir)
+    return subprocess.Popen([sys.executable, '-c', NODE_SCRIPT, ROOT, store_path, server_url, work_dir,
+                             download_path, node, '1', str(lease)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def test_same_video_with_other_options_is_added(ytd, tmp_path):
+    store = ytd.SharedJobStore(str(tmp_path / 'store.db'))
+    url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+    options = dict(ytd.DEFAULT_JOB_OPTIONS, resolution='1080p')
+    assert len(store.add([url], options)[0]) == 1
+    assert store.add([url], dict(options)) == ([], [url])
+    added, skipped = store.add([url], dict(options, resolution='720p'))
+    assert len(added) == 1 and skipped == []
+    assert store.pending() == 2
+    store.close()
+
+
+def test_killed_worker_jobs_are_reassigned_once(ytd, tmp_path, standin):
+    server = standin(file_size=2 * 1024 * 1024, conn_rate=1024 * 1024)
+    lease = 1.0
+    store_path = str(tmp_path / 'store.db')
+    download_path = str(tmp_path / 'downloads')
+    store = ytd.SharedJobStore(store_path, lease=lease)
+    options = dict(ytd.DEFAULT_JOB_OPTIONS, language='모든 언어', resolution='1080p')
+    jobs = 4
+    store.add([f"{server.url}/watch?v=test{index:07d}" for index in range(jobs)], options)
+
+    victim = start_node(store_path, server.url, str(tmp_path / 'node0'), download_path, 'node0', lease)
+    deadline = time.monotonic() + 30
+    held = []
+    while not held and time.monotonic() < deadline:
+        time.sleep(0.1)
+        held = [job_id for job_id, in store._execute(
+            "SELECT job_id FROM shared_jobs WHERE node = 'node0' AND state = 'running'")]
+    victim.kill()
+    victim.wait()
+    assert held, "node0이 작업을 가져가지 못했습니다."
+
+    nodes = [start_node(store_path, server.url, str(tmp_path / f"node{index}"), download_path,
+                        f"node{index}", lease) for index in (1, 2)]
+    try:
+        for process in nodes:
+            assert process.wait(timeout=120) == 0
+    finally:
+        for process in nodes:
+            process.kill()
+
+    stats = store.stats()
+    assert stats['jobs'] == {'done': jobs}
+    assert 'node0' not in stats['nodes']
+    for job_id in held:
+        node, attempts = store._execute('SELECT node, attempts FROM shared_jobs WHERE job_id = ?', (job_id,))[0]
+        # 임대가 끝난 뒤 다른 작업자가 다시 가져가 완료
+        assert node in ('node1', 'node2')
+        assert attempts == 2
+    files = [name for name in os.listdir(download_path) if name.endswith('.mp4')]
+    assert len(files) == jobs
+    store.close()
+
+
+def test_worker_start_keeps_local_journal_jobs(ytd, tmp_path, standin):
+    server = standin(file_size=256 * 1024)
+    work_dir = str(tmp_path / 'node')
+    os.makedirs(work_dir)
+    options = dict(ytd.DEFAULT_JOB_OPTIONS, language='모든 언어', resolution='1080p',
+                   download_path=str(tmp_path / 'downloads'))
+    os.makedirs(options['download_path'])
+    store = ytd.SharedJobStore(str(tmp_path / 'store.db'), lease=300.0)
+    (shared_id,), _ = store.add([f"{server.url}/watch?v=shared00001"], options)
+    # 다른 작업자가 임대 중인 공유 작업과, 창에서 추가한 로컬 작업이 저널에 남아 있음
+    assert store.claim('other') == [(shared_id, f"{server.url}/watch?v=shared00001", options)]
+    journal = ytd.JobJournal(os.path.join(work_dir, 'jobs.db'))
+    journal.add_job(ytd.DownloadJob(f"{server.url}/watch?v=shared00001", options, job_id=shared_id))
+    local = ytd.DownloadJob(f"{server.url}/watch?v=local000001", options)
+    journal.add_job(local)
+    
+    engine = standin_engine(work_dir, server.url, 1)
+    worker = ytd.ClusterWorker(engine, store, 'node1').start()
+    
+    assert engine.journal.get_job(shared_id)['state'] == 'cancelled'
+    assert shared_id not in engine.job_ids()
+    assert worker.claimed == set()
+    deadline = time.monotonic() + 30
+    while engine.journal.get_job(local.job_id)['state'] != 'done' and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert engine.journal.get_job(local.job_id)['state'] == 'done'
+    worker.stop()
+    engine.http.close()
+    store.close()
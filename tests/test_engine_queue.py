@@ -0,0 +1,47 @@
+"""DownloadEngine 대기열의 일시 정지/재개 테스트"""
+import pytest
+
+
+@pytest.fixture
+def engine(ytd):
+    config = ytd.load_config()
+    return ytd.DownloadEngine(config, journal=ytd.JobJournal(':memory:'))
+
+
+def drain_prepare(engine):
+    """준비 대기열의 항목을 모두 꺼내 준비 작업자처럼 처리합니다."""
+    while not engine._prepare_queue.empty():
+        job, generation = engine._prepare_queue.get()
+        engine._guarded(job, engine.prepare_job, generation)
+        engine._prepare_queue.task_done()
+
+
+def test_pause_resume_does_not_prepare_twice(ytd, engine, monkeypatch):
+    prepared = []
+    monkeypatch.setattr(engine, 'prepare_job', prepared.append)
+    job = engine.submit('https://www.youtube.com/watch?v=dQw4w9WgXcQ', {})
+    
+    assert engine.pause(job.job_id) == 1
+    assert engine.resume(job.job_id) == 1
+    drain_prepare(engine)
+    
+    assert prepared == [job]
+
+
+def test_job_queue_drops_entries_from_before_pause(ytd):
+    job_queue = ytd.JobQueue('fifo')
+    first = ytd.DownloadJob('https://www.youtube.com/watch?v=dQw4w9WgXcQ', {})
+    second = ytd.DownloadJob('https://www.youtube.com/watch?v=9bZkp7q19f0', {})
+    job_queue.put(first)
+    job_queue.put(second)
+    
+    first.generation += 1
+    job_queue.put(first)
+    
+    assert len(job_queue) == 2
+    assert job_queue.get() is second
+    assert job_queue.get() is first
+    job_queue.task_done()
+    job_queue.task_done()
+    # 버린 항목도 끝난 것으로 세므로 join()이 돌아옴
+    job_queue.join()
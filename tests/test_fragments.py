@@ -0,0 +1,92 @@
+"""FragmentConcurrencyController의 예산과 동시 조각 수 조정 테스트"""
+import threading
+
+
+def finish_stream(controller, job_id, rate, fragments=10, errors=0):
+    """조각 스트림 하나를 받은 것처럼 진행률을 보냅니다 (1초 동안 rate 바이트)."""
+    for _ in range(errors):
+        controller.report_retry(job_id)
+    controller.observe(job_id, {'status': 'downloading', 'fragment_index': 1, 'fragment_count': fragments})
+    controller.observe(job_id, {'status': 'finished', 'downloaded_bytes': rate, 'elapsed': 1.0})
+
+
+def test_grants_never_exceed_budget(ytd):
+    controller = ytd.FragmentConcurrencyController(budget=5, initial=3, maximum=8)
+    
+    assert controller.start('a', 'host') == 3
+    assert controller.start('b', 'host') == 2
+    
+    started = threading.Event()
+    granted = []
+    
+    def third():
+        started.set()
+        granted.append(controller.start('c', 'host'))
+    
+    worker = threading.Thread(target=third)
+    worker.start()
+    assert started.wait(5)
+    # 예산이 모두 쓰이고 있으므로 세 번째 작업은 기다림
+    worker.join(0.2)
+    assert worker.is_alive()
+    
+    controller.finish('a')
+    worker.join(5)
+    assert granted == [3]
+
+
+def test_increases_while_throughput_improves_and_reverts_otherwise(ytd):
+    controller = ytd.FragmentConcurrencyController(budget=16, initial=2, maximum=8)
+    params = {}
+    controller.start('job', 'host')
+    controller.bind('job', params)
+    
+    finish_stream(controller, 'job', rate=100)
+    assert params['concurrent_fragment_downloads'] == 3
+    finish_stream(controller, 'job', rate=150)
+    assert params['concurrent_fragment_downloads'] == 4
+    # 늘렸는데 빨라지지 않으면 최고 기록을 냈던 값으로 되돌림
+    finish_stream(controller, 'job', rate=150)
+    assert params['concurrent_fragment_downloads'] == 3
+    
+    # 같은 호스트의 다음 작업은 조정한 값에서 시작
+    controller.finish('job')
+    assert controller.start('next', 'host') == 3
+
+
+def test_halves_on_fragment_retries(ytd):
+    controller = ytd.FragmentConcurrencyController(budget=16, initial=6, maximum=8)
+    params = {}
+    controller.start('job', 'host')
+    controller.bind('job', params)
+    
+    finish_stream(controller, 'job', rate=100, fragments=10, errors=2)
+    
+    assert params['concurrent_fragment_downloads'] == 3
+    assert controller.snapshot()['host']['target'] == 3
+
+
+def test_adapts_against_standin_dash_stream(ytd, standin, tmp_path):
+    server = standin(stream='dash', segments=8, segment_size=64 * 1024)
+    controller = ytd.FragmentConcurrencyController(budget=4, initial=1, maximum=4)
+    manifest_url = f"{server.url}/dash/manifest.mpd"
+    granted = []
+    
+    for index in range(3):
+        job_id = f"job-{index}"
+        granted.append(controller.start(job_id, '127.0.0.1'))
+        ydl_opts = {
+            'outtmpl': str(tmp_path / f"{job_id}.%(ext)s"),
+            'progress_hooks': [lambda d, job_id=job_id: controller.observe(job_id, d)],
+            'concurrent_fragment_downloads': granted[-1],
+            'logger': ytd.DownloadLogger(on_retry=lambda job_id=job_id: controller.report_retry(job_id)),
+            'noprogress': True,
+            'quiet': True,
+        }
+        with ytd.yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            controller.bind(job_id, ydl.params)
+            ydl.download([manifest_url])
+        controller.finish(job_id)
+    
+    assert all(1 <= n <= 4 for n in granted)
+    assert controller.snapshot()['127.0.0.1']['best_rate'] > 0
@@ -0,0 +1,119 @@
+"""RequestGovernor의 재시도, Retry-After, 서킷 브레이커 테스트"""
+import threading
+import time
+
+import requests
+
+
+def make_session(ytd, **options):
+    options.setdefault('base_delay', 0.01)
+    options.setdefault('max_delay', 0.05)
+    governor = ytd.RequestGovernor(**options)
+    return governor, ytd.PooledSession(governor=governor)
+
+
+def test_retries_until_success(ytd, standin):
+    server = standin(fail_first=2, fail_statuses=(429,))
+    governor, session = make_session(ytd)
+    
+    response = session.get(f"{server.url}/item/1")
+    
+    assert response.status_code == 200
+    assert server.counts == {429: 2, 200: 1}
+    stats = governor.snapshot()
+    assert stats['requests'] == 3
+    assert stats['retries'] == 2
+    assert stats['error_429'] == 2
+    assert 'gave_up' not in stats
+
+
+def test_gives_up_after_max_retries(ytd, standin):
+    server = standin(fail_rate=1.0, fail_statuses=(503,))
+    governor, session = make_session(ytd, max_retries=2, window=100)
+    
+    response = session.get(f"{server.url}/item/1")
+    
+    assert response.status_code == 503
+    assert server.counts[503] == 3
+    stats = governor.snapshot()
+    assert stats['retries'] == 2
+    assert stats['gave_up'] == 1
+
+
+def test_retry_after_header_is_honoured(ytd, standin):
+    server = standin(fail_first=1, fail_statuses=(429,), retry_after=1)
+    governor, session = make_session(ytd, max_delay=5.0)
+    
+    started = time.monotonic()
+    response = session.get(f"{server.url}/item/1")
+    
+    assert response.status_code == 200
+    assert time.monotonic() - started >= 1.0
+    assert governor.backoff_delay(0, retry_after=120) == 5.0
+
+
+def test_breaker_opens_on_high_error_rate(ytd, standin):
+    server = standin(fail_rate=1.0, fail_statuses=(429,))
+    pauses = []
+    governor, session = make_session(ytd, max_retries=0, window=10, error_rate=0.5,
+                                     cooldown=0.3, on_pause=pauses.append)
+    
+    for i in range(5):
+        session.get(f"{server.url}/item/{i}")
+    
+    assert governor.snapshot()['circuit_opened'] == 1
+    assert pauses == [0.3]
+    # 서킷이 열려 있는 동안 다음 요청은 쿨다운이 끝날 때까지 기다림
+    started = time.monotonic()
+    session.get(f"{server.url}/item/5")
+    assert time.monotonic() - started >= 0.2
+
+
+def test_transfer_does_not_hold_host_slot(ytd):
+    governor = ytd.RequestGovernor(host_concurrency=1)
+    transferring = threading.Event()
+    release = threading.Event()
+    
+    def long_transfer():
+        transferring.set()
+        release.wait(5)
+        return 'done'
+    
+    worker = threading.Thread(target=governor.transfer, args=(long_transfer, ytd.classify_ydl_error))
+    worker.start()
+    try:
+        assert transferring.wait(5)
+        # 전송이 진행 중이어도 같은 호스트의 짧은 요청은 바로 실행됨
+        result = governor.call('example.com', lambda: 'title', ytd.classify_ydl_error)
+        assert result == 'title'
+        assert not release.is_set()
+    finally:
+        release.set()
+        worker.join(5)
+    assert governor.snapshot()['transfers'] == 1
+
+
+def test_stats_are_consistent_under_concurrency(ytd):
+    governor = ytd.RequestGovernor(host_concurrency=8)
+    threads = [threading.Thread(target=lambda: [
+        governor.call('example.com', lambda: None, ytd.classify_ydl_error) for _ in range(200)])
+        for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert governor.snapshot()['requests'] == 1600
+
+
+def test_transfers_are_exported_as_metric(ytd):
+    engine = ytd.DownloadEngine(ytd.load_config(), journal=ytd.JobJournal(':memory:'))
+    engine.governor.transfer(lambda: None, lambda result, error: (False, None))
+    server = ytd.MetricsServer(engine, 0).start()
+    try:
+        text = requests.get(server.url).text
+    finally:
+        server.stop()
+    
+    assert '# TYPE ytdl_transfers_total counter' in text
+    assert 'ytdl_transfers_total 1' in text.splitlines()
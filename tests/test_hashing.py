@@ -0,0 +1,140 @@
+"""받는 동안 계산한 해시와 HashingMover, HashIndex 테스트"""
+import hashlib
+import os
+
+import pytest
+
+FILE_SIZE = 3 * 1024 * 1024
+
+
+class CountingFile:
+    """읽은 바이트 수를 경로별로 세는 파일 객체"""
+    
+    def __init__(self, file, path, reads):
+        self._file = file
+        self._path = path
+        self._reads = reads
+    
+    def read(self, *args):
+        data = self._file.read(*args)
+        self._reads[self._path] = self._reads.get(self._path, 0) + len(data)
+        return data
+    
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self._file.close()
+
+
+@pytest.fixture
+def reads(ytd, monkeypatch):
+    """다운로더 모듈이 읽기 모드로 연 파일에서 읽은 바이트 수 (절대 경로 -> 바이트)"""
+    counted = {}
+    
+    def counting_open(path, mode='r', *args, **kwargs):
+        file = open(path, mode, *args, **kwargs)
+        if 'r' in mode and '+' not in mode:
+            return CountingFile(file, os.path.abspath(path), counted)
+        return file
+    monkeypatch.setattr(ytd, 'open', counting_open, raising=False)
+    return counted
+
+
+def video_reads(reads):
+    """영상 파일 (.part 포함)에서 읽은 바이트 수 (해시 목록 파일 제외)"""
+    return sum(count for path, count in reads.items() if os.path.basename(path).startswith('video.'))
+
+
+def download(ytd, url, folder, hasher, temp=None):
+    ydl_opts = {
+        'outtmpl': 'video.%(ext)s',
+        'paths': {'home': str(folder), 'temp': str(temp or folder)},
+        'progress_hooks': [hasher.hook],
+        'logger': ytd.DownloadLogger(),
+        'noprogress': True,
+        'quiet': True,
+    }
+    with ytd.yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        ydl.add_post_processor(ytd.HashingMover(ydl, hasher=hasher), when='post_process')
+        ydl.download([url])
+
+
+def test_hash_is_computed_while_downloading(ytd, standin, tmp_path, reads):
+    server = standin(file_size=FILE_SIZE)
+    hasher = ytd.StreamHasher()
+    
+    download(ytd, f"{server.url}/progressive.mp4", tmp_path, hasher)
+    
+    entry = ytd.HashIndex.load(str(tmp_path))['video.mp4']
+    assert entry['sha256'] == hashlib.sha256(server.file_bytes()).hexdigest()
+    assert entry['size'] == FILE_SIZE
+    # yt-dlp 훅은 .part에 새로 쓴 부분만 한 번씩 읽고, 완성된 파일은 다시 읽지 않음
+    assert reads.get(str(tmp_path / 'video.mp4'), 0) == 0
+    assert video_reads(reads) == FILE_SIZE
+
+
+def test_rename_from_staging_does_not_reread(ytd, standin, tmp_path, reads):
+    server = standin(file_size=FILE_SIZE)
+    staging = tmp_path / 'staging'
+    final = tmp_path / 'final'
+    hasher = ytd.StreamHasher()
+    
+    download(ytd, f"{server.url}/progressive.mp4", final, hasher, temp=staging)
+    
+    assert os.path.exists(final / 'video.mp4')
+    assert reads.get(str(staging / 'video.mp4'), 0) == 0
+    assert reads.get(str(final / 'video.mp4'), 0) == 0
+    assert video_reads(reads) == FILE_SIZE
+    assert ytd.HashIndex.verify(str(final)) == [('video.mp4', 'ok')]
+
+
+@pytest.mark.parametrize('connections', [1, 4])
+def test_segmented_download_hashes_whole_file(ytd, standin, tmp_path, reads, connections):
+    server = standin(file_size=FILE_SIZE)
+    hasher = ytd.StreamHasher()
+    downloader = ytd.SegmentedDownloader(ytd.PooledSession(pool_size=4), connections=connections,
+                                         min_segment=256 * 1024)
+    filename = str(tmp_path / 'video.mp4')
+    
+    downloader.download(f"{server.url}/progressive.mp4", filename, hasher=hasher)
+    
+    assert hasher.result(filename) == (hashlib.sha256(server.file_bytes()).hexdigest(), FILE_SIZE)
+    # 앞에서부터 이어지는 블록은 메모리에서 계산하고, 먼저 받은 뒤쪽 범위만 읽음
+    read = video_reads(reads)
+    assert read == 0 if connections == 1 else read < FILE_SIZE
+
+
+def test_result_is_ignored_when_file_changed(ytd, tmp_path):
+    path = tmp_path / 'audio.m4a'
+    path.write_bytes(b'a' * 100)
+    hasher = ytd.StreamHasher()
+    hasher.advance(str(path))
+    hasher.finish(str(path), str(path))
+    
+    path.write_bytes(b'b' * 50)
+    
+    assert hasher.result(str(path)) is None
+
+
+def test_store_ignores_index_entry_of_overwritten_file(ytd, tmp_path):
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(b'a' * 100)
+    ytd.HashIndex.record(str(path), *ytd.hash_file(str(path)))
+    # 이름과 크기는 같고 내용과 수정 시각만 다른 파일로 덮어씀
+    path.write_bytes(b'b' * 100)
+    later = os.path.getmtime(path) + 10
+    os.utime(path, (later, later))
+    store = ytd.MediaStore(str(tmp_path / 'store'))
+    job = ytd.DownloadJob('https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+                          dict(ytd.DEFAULT_JOB_OPTIONS, resolution='1080p'))
+    
+    store.ingest(job, 'video', str(path))
+    
+    digest = hashlib.sha256(b'b' * 100).hexdigest()
+    assert os.path.exists(store.blob_path(digest, 'mp4'))
+    assert store.lookup(job.video_id, 'video', '1080p')[0] == digest
+    store.close()
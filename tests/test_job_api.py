@@ -0,0 +1,50 @@
+"""작업 API 서버의 요청 검사 테스트"""
+import threading
+
+import pytest
+import requests
+
+
+@pytest.fixture
+def api(ytd):
+    config = ytd.load_config()
+    config['api_token'] = ''
+    engine = ytd.DownloadEngine(config, journal=ytd.JobJournal(':memory:'))
+    server = ytd.JobApiServer(engine, 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_json_post_is_accepted(api):
+    response = requests.post(f"{api.url}/control", json={'action': 'pause'})
+    
+    assert response.status_code == 200
+    assert response.json() == {'count': 0}
+
+
+def test_cross_site_text_plain_post_is_rejected(api):
+    # 브라우저가 사전 요청 없이 다른 사이트로 보낼 수 있는 형식
+    response = requests.post(f"{api.url}/control", data='{"action": "cancel"}',
+                             headers={'Content-Type': 'text/plain'})
+    
+    assert response.status_code == 415
+
+
+def test_foreign_origin_is_rejected(api):
+    response = requests.post(f"{api.url}/jobs", json={'urls': ['https://youtu.be/dQw4w9WgXcQ']},
+                             headers={'Origin': 'https://evil.example'})
+    
+    assert response.status_code == 403
+    assert requests.get(f"{api.url}/health", headers={'Origin': 'https://evil.example'}).status_code == 403
+    assert requests.get(f"{api.url}/health", headers={'Origin': api.url}).status_code == 200
+
+
+def test_token_is_required_when_configured(api):
+    api.engine.config['api_token'] = 'secret'
+    
+    assert requests.get(f"{api.url}/health").status_code == 401
+    assert requests.get(f"{api.url}/health", headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert requests.get(f"{api.url}/health", headers={'Authorization': 'Bearer secret'}).status_code == 200
+    assert requests.get(f"{api.url}/health?token=secret").status_code == 200
@@ -0,0 +1,79 @@
+"""SegmentedDownloader의 나눠 받기와 이어받기 테스트"""
+import hashlib
+import json
+import os
+
+import pytest
+
+FILE_SIZE = 4 * 1024 * 1024
+
+
+class Interrupted(Exception):
+    pass
+
+
+def sha256_of(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def make_downloader(ytd, connections=2):
+    return ytd.SegmentedDownloader(ytd.PooledSession(pool_size=connections),
+                                   connections=connections, min_segment=256 * 1024)
+
+
+def test_downloads_whole_file(ytd, standin, tmp_path):
+    server = standin(file_size=FILE_SIZE)
+    filename = str(tmp_path / 'video.mp4')
+    
+    assert make_downloader(ytd, connections=4).download(f"{server.url}/progressive.mp4", filename)
+    
+    assert sha256_of(filename) == hashlib.sha256(server.file_bytes()).hexdigest()
+    assert not os.path.exists(filename + '.seg.json')
+
+
+def test_resumes_after_interruption(ytd, standin, tmp_path):
+    server = standin(file_size=FILE_SIZE, conn_rate=8 * 1024 * 1024)
+    url = f"{server.url}/progressive.mp4"
+    filename = str(tmp_path / 'video.mp4')
+    
+    def interrupt(d):
+        if d['downloaded_bytes'] >= FILE_SIZE // 2:
+            raise Interrupted()
+    
+    with pytest.raises(Interrupted):
+        make_downloader(ytd).download(url, filename, progress_hook=interrupt)
+    
+    with open(filename + '.seg.json', encoding='utf-8') as f:
+        state = json.load(f)
+    saved = sum(r['end'] - r['start'] + 1 for r in state['ranges'] if r['done'])
+    assert 0 < saved < FILE_SIZE
+    
+    fetched = []
+    make_downloader(ytd).download(url, filename, progress_hook=lambda d: fetched.append(d['downloaded_bytes']))
+    
+    # 완료된 범위는 다시 받지 않고, 합친 파일은 원본과 같음
+    assert fetched[0] > saved
+    assert fetched[-1] == FILE_SIZE
+    assert sha256_of(filename) == hashlib.sha256(server.file_bytes()).hexdigest()
+    assert not os.path.exists(filename + '.seg.json')
+
+
+def test_refetches_range_with_bad_checksum(ytd, standin, tmp_path):
+    server = standin(file_size=FILE_SIZE)
+    url = f"{server.url}/progressive.mp4"
+    filename = str(tmp_path / 'video.mp4')
+    
+    def interrupt(d):
+        if d['downloaded_bytes'] >= FILE_SIZE // 2:
+            raise Interrupted()
+    
+    with pytest.raises(Interrupted):
+        make_downloader(ytd, connections=1).download(url, filename, progress_hook=interrupt)
+    
+    # 완료로 기록된 첫 범위를 망가뜨리면 이어받을 때 체크섬이 맞지 않아 다시 받음
+    with open(filename + '.seg.part', 'r+b') as f:
+        f.write(b'\xff' * 16)
+    make_downloader(ytd, connections=1).download(url, filename)
+    
+    assert sha256_of(filename) == hashlib.sha256(server.file_bytes()).hexdigest()
@@ -0,0 +1,70 @@
+"""구독 URL 판단과 채널 동기화 테스트"""
+import pytest
+from yt_dlp.extractor.common import InfoExtractor
+
+
+class FeedIE(InfoExtractor):
+    """ENTRIES의 영상 ID를 순서대로 주는 가짜 목록 추출기 (읽은 항목 수를 READ에 기록)"""
+    _VALID_URL = r'https?://feed\.test/(?P<id>\w+)'
+    ENTRIES = []
+    READ = []
+
+    def _real_extract(self, url):
+        def entries():
+            for video_id in self.ENTRIES:
+                self.READ.append(video_id)
+                yield {'_type': 'url', 'id': video_id, 'url': f"https://www.youtube.com/watch?v={video_id}"}
+        return {'_type': 'playlist', 'id': self._match_id(url), 'entries': entries()}
+
+
+@pytest.fixture
+def sync(ytd, tmp_path):
+    store = ytd.SubscriptionStore(str(tmp_path / 'subscriptions.db'))
+    yield ytd.ChannelSync(store, ytd.load_config(), extractors=[FeedIE])
+    store.close()
+
+
+def listed(sync, entries):
+    FeedIE.ENTRIES, FeedIE.READ = entries, []
+    result = sync.list_new(sync.store.subscriptions()[0])
+    sync.store.mark_seen(result['url'], [video_id for video_id, _ in result['new']] + result['skipped'],
+                         result['cursor'], len(result['new']))
+    return [video_id for video_id, _ in result['new']], list(FeedIE.READ)
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://www.youtube.com/@channel', ('https://www.youtube.com/@channel/videos', True)),
+    ('https://www.youtube.com/@channel/videos', ('https://www.youtube.com/@channel/videos', True)),
+    ('https://www.youtube.com/channel/UC123/streams', ('https://www.youtube.com/channel/UC123/streams', True)),
+    ('https://www.youtube.com/@channel/playlists', ('https://www.youtube.com/@channel/playlists', False)),
+    ('https://www.youtube.com/@channel/featured', ('https://www.youtube.com/@channel/featured', False)),
+    ('https://www.youtube.com/playlist?list=UU123', ('https://www.youtube.com/playlist?list=UU123', True)),
+    ('https://www.youtube.com/playlist?list=PL123', ('https://www.youtube.com/playlist?list=PL123', False)),
+])
+def test_subscription_url(ytd, url, expected):
+    assert ytd.subscription_url(url) == expected
+
+
+def test_newest_first_stops_at_cursor(sync):
+    sync.store.add('https://feed.test/uploads', {}, newest_first=True)
+    ids = [f"v{index:02d}" for index in range(10)]
+    assert listed(sync, ids) == (ids, ids)
+    # 새 영상 두 개 뒤의 cursor(v00)에서 멈추고 나머지 목록은 읽지 않음
+    assert listed(sync, ['n1', 'n2'] + ids) == (['n1', 'n2'], ['n1', 'n2', 'v00'])
+    assert sync.store.subscriptions()[0]['cursor'] == 'n1'
+
+
+def test_cursor_removed_falls_back_to_known_run(sync):
+    sync.store.add('https://feed.test/uploads', {}, newest_first=True)
+    ids = [f"v{index:02d}" for index in range(10)]
+    listed(sync, ids)
+    new, read = listed(sync, ['n1'] + ids[1:])
+    assert new == ['n1']
+    assert len(read) == 1 + sync.KNOWN_STOP
+
+
+def test_unordered_feed_reads_everything(sync):
+    sync.store.add('https://feed.test/playlist', {}, newest_first=False)
+    ids = [f"v{index:02d}" for index in range(10)]
+    listed(sync, ids)
+    assert listed(sync, ids + ['n1']) == (['n1'], ids + ['n1'])
@@ -17,9 +17,9 @@ GNU General Public License v3.0에 따라 배포됩니다.
 
 사용된 외부 라이브러리:
 -------------------
-1. pytube (MIT License)
-   - YouTube 영상 정보 추출
-   - https://github.com/pytube/pytube
+1. requests (Apache License 2.0)
+   - keep-alive 연결 풀을 공유하는 HTTP 세션 (영상 제목, 자막 요청)
+   - https://github.com/psf/requests
    
 2. youtube_transcript_api (MIT License)
    - YouTube 자막 추출
@@ -52,13 +52,40 @@ import re
 import sys
 import os
 import json
+import copy
+import time
+import hashlib
+import hmac
+import uuid
+import queue
+import random
+import sqlite3
+import argparse
+import glob
+import io
+import logging
+import contextlib
+import cProfile
+import pstats
+import shutil
+import socket
+from logging.handlers import RotatingFileHandler
+import itertools
 import threading
+import zlib
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
 import tkinter as tk
 from tkinter import ttk, filedialog
-from pytube import YouTube
+import requests
+from requests.adapters import HTTPAdapter
 from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound
 import yt_dlp
-from datetime import datetime
+from yt_dlp.postprocessor import FFmpegPostProcessor, PostProcessor
+from datetime import datetime, time as clock_time
 
 # ctypes 모듈 import
 if sys.platform == 'win32':
@@ -76,6 +103,6152 @@ except Exception:
 # 설정 파일 경로 정의
 CONFIG_FILE = 'youtube_downloader_config.json'
 
+# 작업 저널 파일 경로 정의
+JOURNAL_FILE = 'youtube_downloader_jobs.db'
+
+# 메타데이터 캐시 파일 경로 정의
+METADATA_CACHE_FILE = 'youtube_downloader_metadata.db'
+
+# 채널/재생목록 구독 저장소 파일 경로 정의
+SUBSCRIPTION_FILE = 'youtube_downloader_subscriptions.db'
+
+# 단계별 소요 시간 로그 파일 경로 정의
+PHASE_LOG_FILE = 'youtube_downloader_phases.log'
+
+# 다운로드 폴더마다 받은 파일의 해시를 기록하는 목록 파일 이름
+HASH_INDEX_FILE = 'youtube_downloader_hashes.json'
+
+# 설정 파일에 값이 없을 때 사용하는 기본 설정
+DEFAULT_CONFIG = {
+    'download_path': os.path.expanduser("~/Downloads"),
+    'staging_path': '',           # 받는 중인 임시 파일과 병합을 처리할 폴더 (비어 있으면 download_path)
+    'disk_preflight': False,      # 받기 전에 예상 크기로 디스크 여유 공간을 확인할지 여부 (형식 정보를 한 번 더 조회)
+    'disk_overhead_factor': 2.0,  # 병합/변환하는 단계가 최종 크기의 몇 배까지 공간을 쓰는지
+    'disk_reserve': '512M',       # 각 볼륨에 항상 남겨 둘 여유 공간
+    'integrity_hashes': False,    # 받으면서 SHA-256을 계산해 저장 폴더의 해시 목록(HASH_INDEX_FILE)에 기록할지 여부
+    'media_store': '',            # 받은 파일을 한 벌만 보관할 저장소 폴더 (비어 있으면 사용 안 함)
+    'media_store_link': 'hardlink',  # 저장 폴더의 파일 이름을 만드는 방법 (hardlink/symlink)
+    'max_workers': 2,             # 동시에 실행할 다운로드 작업 수
+    'keep_partial_on_cancel': False,  # 취소한 작업의 .part 파일을 남길지 여부
+    'prepare_workers': 2,         # 자막과 크기 예상을 먼저 처리하는 준비 스레드 수
+    'schedule_policy': 'sjf',     # 영상/음성 대기열 정책 (fifo/priority/sjf/fair)
+    'sjf_aging': '1M',            # sjf/fair에서 기다린 1초마다 예상 크기를 줄여 보는 양
+    'auto_resolution_deadline': '1h',  # 자동 해상도에서 마감을 정하지 않은 작업의 기본 마감
+    'assumed_throughput': '2M',   # 아직 측정한 속도가 없을 때 가정하는 회선 속도
+    'phase_log': '',              # 단계별 소요 시간을 JSON 줄로 기록할 파일 (예: PHASE_LOG_FILE, 비어 있으면 기록 안 함)
+    'phase_log_max_size': '5M',   # 로그 파일을 바꿔 쓰는 크기
+    'phase_log_backups': 3,       # 보관할 이전 로그 파일 수
+    'metrics_port': 0,            # Prometheus 형식 지표를 제공할 포트 (0이면 사용 안 함)
+    'metrics_host': '127.0.0.1',  # 지표 서버가 받을 주소
+    'api_host': '127.0.0.1',      # 작업 API 서버(serve 명령)가 받을 주소
+    'api_port': 8765,             # 작업 API 서버 포트
+    'api_token': '',              # 작업 API 인증 토큰 (비어 있으면 인증 안 함, 서버와 클라이언트가 함께 사용)
+    'api_url': '',                # 창에서 사용할 작업 API 서버 URL (비어 있으면 창 안에서 엔진 실행)
+    'job_store': '',              # 여러 컴퓨터가 함께 쓰는 공유 작업 저장소 파일 (enqueue/worker 명령)
+    'node_id': '',                # 공유 저장소에서 이 작업자의 이름 (비어 있으면 컴퓨터 이름)
+    'job_lease': '30s',           # 작업자가 갱신하지 않으면 다른 작업자가 작업을 가져가는 시간
+    'job_max_attempts': 3,        # 공유 저장소 작업의 최대 시도 횟수 (실패와 임대 만료 포함)
+    'response_archive': '',       # 메타데이터/제목/자막 응답을 기록하거나 재생할 파일 (비어 있으면 사용 안 함)
+    'response_archive_mode': 'replay',  # record: 실제 응답을 기록, replay: 네트워크 없이 기록을 재생
+    'replay_delay': 0.0,          # 재생할 때 기록한 응답 시간에 곱해 기다릴 배율 (0이면 기다리지 않음)
+    'metadata_cache_ttl': '1h',   # 형식/자막 목록 캐시 유지 시간 (형식 URL이 만료되기 전, 0이면 사용 안 함)
+    'merge_cost_factor': 1.0,     # 영상/음성 병합 비용 (병합 결과 크기의 몇 배를 받는 것과 같은지)
+    'http_pool_size': 8,          # 호스트별로 유지할 keep-alive 연결 수
+    'http_connect_timeout': 5,    # 연결 제한 시간 (초)
+    'http_read_timeout': 20,      # 응답 대기 제한 시간 (초)
+    'http_proxy': '',             # 예: "http://127.0.0.1:8080" (비어 있으면 사용 안 함)
+    'host_concurrency': 4,        # 호스트별 동시 요청 수
+    'max_retries': 4,             # 429/403/5xx 응답에 대한 최대 재시도 횟수
+    'retry_base_delay': 1.0,      # 지수 백오프의 기본 대기 시간 (초)
+    'retry_max_delay': 60.0,      # 백오프 대기 시간의 상한 (초)
+    'breaker_error_rate': 0.5,    # 이 비율 이상 실패하면 대기열을 일시 중지
+    'breaker_window': 20,         # 오류율을 계산할 최근 요청 수
+    'breaker_cooldown': 30.0,     # 대기열 일시 중지 시간 (초)
+    'bandwidth_limit': '',        # 전체 다운로드 속도 제한 (예: "10M", 비어 있으면 무제한)
+    'job_bandwidth_limit': '',    # 작업별 기본 속도 제한
+    'job_bandwidth_limits': {},   # 영상 ID별 속도 제한 (예: {"dQw4w9WgXcQ": "1M"})
+    'bandwidth_schedule': [],     # 시간대별 전체 제한 (예: [{"start": "09:00", "end": "18:00", "limit": "2M"}])
+    'fragment_worker_budget': 16, # 모든 작업이 함께 쓰는 조각 다운로드 스레드 수
+    'fragment_concurrency_initial': 2,  # 처음 보는 호스트의 작업별 동시 조각 수
+    'fragment_concurrency_max': 8,      # 작업별 동시 조각 수 상한
+    'segmented_connections': 4,   # 단일 파일 형식을 나눠 받을 연결 수
+    'segmented_min_segment': '4M',# 바이트 범위 하나의 최소 크기
+}
+
+# 재시도 대상 HTTP 상태 코드 (요청 제한, 일시적 차단, 서버 오류)
+RETRYABLE_STATUS = {403, 429, 500, 502, 503, 504}
+
+# 영상 제목 조회에 사용하는 oEmbed 엔드포인트
+OEMBED_URL = 'https://www.youtube.com/oembed'
+
+
+def load_config():
+    """설정 파일을 읽어 기본 설정과 병합한 결과를 반환합니다.
+    
+    Returns:
+        dict: 기본값이 채워진 설정 딕셔너리
+    """
+    config = dict(DEFAULT_CONFIG)
+    try:
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                config.update(json.load(f))
+    except Exception as e:
+        print(f"설정 파일 로드 중 오류 발생: {e}")
+    try:
+        parse_schedule(config['bandwidth_schedule'])
+    except (TypeError, KeyError, ValueError) as e:
+        print(f"시간대별 속도 제한을 무시합니다: {e}")
+        config['bandwidth_schedule'] = []
+    return config
+
+
+def save_config(config):
+    """설정 딕셔너리를 설정 파일에 저장합니다.
+    
+    Args:
+        config (dict): 저장할 설정
+    """
+    try:
+        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        print(f"설정 파일 저장 중 오류 발생: {e}")
+
+
+def parse_retry_after(value):
+    """Retry-After 헤더 값을 대기 시간(초)으로 변환합니다.
+    
+    Args:
+        value (str): 초 단위 숫자 또는 HTTP 날짜 형식의 헤더 값
+        
+    Returns:
+        float: 대기 시간 (초), 해석할 수 없으면 None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_response(result, error):
+    """HTTP 요청 결과가 재시도 대상인지 판단합니다.
+    
+    Args:
+        result (requests.Response): 응답 (예외 발생 시 None)
+        error (Exception): 발생한 예외 (성공 시 None)
+        
+    Returns:
+        tuple: (재시도 여부, Retry-After 대기 시간)
+    """
+    if error is not None:
+        return isinstance(error, (requests.ConnectionError, requests.Timeout)), None
+    if result.status_code in RETRYABLE_STATUS:
+        return True, parse_retry_after(result.headers.get('Retry-After'))
+    return False, None
+
+
+def classify_ydl_error(result, error):
+    """다운로드 단계 예외가 재시도 대상인지 판단합니다.
+    
+    yt-dlp의 DownloadError에 담긴 원인 예외 또는 requests 예외의 응답에서
+    HTTP 상태 코드와 Retry-After 헤더를 찾고, 없으면 오류 메시지의
+    "HTTP Error 429" 형식에서 상태 코드를 추출합니다.
+    
+    Args:
+        result: 사용하지 않음
+        error (Exception): 발생한 예외 (성공 시 None)
+        
+    Returns:
+        tuple: (재시도 여부, Retry-After 대기 시간)
+    """
+    if error is None:
+        return False, None
+    exc_info = getattr(error, 'exc_info', None)
+    cause = exc_info[1] if exc_info else error
+    status = getattr(cause, 'status', None)
+    retry_after = None
+    response = getattr(cause, 'response', None)
+    if response is not None:
+        status = status or getattr(response, 'status', None) or getattr(response, 'status_code', None)
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+    if status is None:
+        match = re.search(r'HTTP Error (\d{3})', str(error))
+        status = int(match.group(1)) if match else None
+    return status in RETRYABLE_STATUS, retry_after
+
+
+class RequestGovernor:
+    """요청 제한에 대응하는 중앙 요청 관리 클래스
+    
+    모든 HTTP 요청과 메타데이터 조회는 이 클래스를 거쳐 실행됩니다.
+    호스트별 동시 실행 수를 제한하고, 429/403/5xx 응답은 지터가 있는 지수 백오프
+    (Retry-After 헤더가 있으면 그 값)로 재시도합니다. 최근 요청의 오류율이 임계값을
+    넘으면 서킷 브레이커가 열려 일정 시간 동안 새 요청을 보내지 않습니다.
+    
+    몇 분씩 걸리는 미디어 전송은 호스트 슬롯을 잡지 않고 서킷 브레이커만 따르므로
+    (transfer), 같은 호스트의 짧은 요청이 긴 다운로드 뒤에서 기다리지 않습니다.
+    
+    Attributes:
+        stats (Counter): 요청, 재시도, 오류, 서킷 열림 횟수
+    """
+    
+    def __init__(self, host_concurrency=4, max_retries=4, base_delay=1.0, max_delay=60.0,
+                 error_rate=0.5, window=20, cooldown=30.0, on_pause=None):
+        """
+        Args:
+            host_concurrency (int): 호스트별 동시 실행 수
+            max_retries (int): 최대 재시도 횟수
+            base_delay (float): 지수 백오프의 기본 대기 시간 (초)
+            max_delay (float): 대기 시간의 상한 (초)
+            error_rate (float): 서킷 브레이커가 열리는 오류율 (0-1)
+            window (int): 오류율을 계산할 최근 요청 수
+            cooldown (float): 서킷 브레이커가 열려 있는 시간 (초)
+            on_pause (callable): 서킷이 열릴 때 대기 시간(초)을 인자로 호출되는 함수
+        """
+        self.host_concurrency = host_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self.on_pause = on_pause
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._held = threading.local()
+        self._outcomes = deque(maxlen=window)
+        self._open_until = 0.0
+    
+    @classmethod
+    def from_config(cls, config, on_pause=None):
+        """설정 딕셔너리로부터 요청 관리자를 생성합니다.
+        
+        Args:
+            config (dict): load_config()가 반환한 설정
+            on_pause (callable): 서킷이 열릴 때 호출되는 함수
+            
+        Returns:
+            RequestGovernor: 생성된 요청 관리자
+        """
+        return cls(
+            host_concurrency=int(config['host_concurrency']),
+            max_retries=int(config['max_retries']),
+            base_delay=float(config['retry_base_delay']),
+            max_delay=float(config['retry_max_delay']),
+            error_rate=float(config['breaker_error_rate']),
+            window=int(config['breaker_window']),
+            cooldown=float(config['breaker_cooldown']),
+            on_pause=on_pause,
+        )
+    
+    def _acquire_host(self, host):
+        """호스트 슬롯을 얻습니다. 이미 슬롯을 가진 스레드는 다시 기다리지 않습니다.
+        
+        Returns:
+            bool: 새로 슬롯을 얻었으면 True
+        """
+        held = getattr(self._held, 'hosts', None)
+        if held is None:
+            held = self._held.hosts = set()
+        if host in held:
+            return False
+        with self._lock:
+            slot = self._slots.get(host)
+            if slot is None:
+                slot = self._slots[host] = threading.BoundedSemaphore(self.host_concurrency)
+        slot.acquire()
+        held.add(host)
+        return True
+    
+    def _release_host(self, host):
+        """_acquire_host()로 얻은 호스트 슬롯을 반납합니다."""
+        self._held.hosts.discard(host)
+        self._slots[host].release()
+    
+    def snapshot(self):
+        """여러 스레드가 갱신하는 통계를 일관된 사본으로 반환합니다.
+        
+        Returns:
+            dict: stats의 사본
+        """
+        with self._lock:
+            return dict(self.stats)
+    
+    def backoff_delay(self, attempt, retry_after=None):
+        """재시도 전 대기 시간을 계산합니다.
+        
+        Retry-After 값이 있으면 그대로 따르고, 없으면 full jitter 방식의
+        지수 백오프 값을 사용합니다.
+        
+        Args:
+            attempt (int): 지금까지의 재시도 횟수
+            retry_after (float): 서버가 지정한 대기 시간 (초)
+            
+        Returns:
+            float: 대기 시간 (초)
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+    
+    def wait_until_closed(self):
+        """서킷 브레이커가 열려 있으면 닫힐 때까지 기다립니다."""
+        while True:
+            remaining = self._open_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, 1.0))
+    
+    def record(self, ok):
+        """요청 결과를 기록하고 오류율이 높으면 서킷 브레이커를 엽니다.
+        
+        Args:
+            ok (bool): 요청 성공 여부 (재시도 대상 오류가 아니면 성공으로 간주)
+        """
+        with self._lock:
+            self._outcomes.append(ok)
+            if ok or len(self._outcomes) < max(5, self._outcomes.maxlen // 2):
+                return
+            failures = self._outcomes.count(False)
+            if failures / len(self._outcomes) < self.error_rate:
+                return
+            self._outcomes.clear()
+            self._open_until = time.monotonic() + self.cooldown
+            self.stats['circuit_opened'] += 1
+        if self.on_pause:
+            self.on_pause(self.cooldown)
+    
+    def call(self, host, func, classify):
+        """호스트 슬롯 안에서 함수를 실행하고 필요하면 재시도합니다.
+        
+        Args:
+            host (str): 요청 대상 호스트
+            func (callable): 실행할 함수 (인자 없음)
+            classify (callable): (결과, 예외)를 받아 (재시도 여부, Retry-After)를 반환하는 함수
+            
+        Returns:
+            func의 반환값 (재시도를 모두 소진하면 마지막 결과)
+        """
+        attempt = 0
+        while True:
+            self.wait_until_closed()
+            acquired = self._acquire_host(host)
+            try:
+                result, error = func(), None
+            except Exception as e:
+                result, error = None, e
+            finally:
+                if acquired:
+                    self._release_host(host)
+            retry, retry_after = classify(result, error)
+            with self._lock:
+                self.stats['requests'] += 1
+                if retry and attempt >= self.max_retries:
+                    self.stats['gave_up'] += 1
+            self.record(not retry)
+            if not retry or attempt >= self.max_retries:
+                if error is not None:
+                    raise error
+                return result
+            status = getattr(result, 'status_code', None) or type(error).__name__
+            with self._lock:
+                self.stats['retries'] += 1
+                self.stats[f'error_{status}'] += 1
+            if hasattr(result, 'close'):
+                result.close()
+            time.sleep(self.backoff_delay(attempt, retry_after))
+            attempt += 1
+    
+    def transfer(self, func, classify):
+        """미디어 전송을 서킷 브레이커만 적용해 한 번 실행합니다.
+        
+        호스트 슬롯을 잡지 않고 재시도하지도 않습니다. 전송 중 끊긴 연결은 yt-dlp가
+        .part 파일과 조각 단위로 이어받으므로 전체 다운로드를 처음부터 다시 하지 않습니다.
+        결과는 오류율에 반영되어 429가 이어지면 서킷 브레이커가 열립니다.
+        
+        Args:
+            func (callable): 실행할 함수 (인자 없음)
+            classify (callable): (결과, 예외)를 받아 (재시도 대상 오류 여부, Retry-After)를 반환하는 함수
+            
+        Returns:
+            func의 반환값
+        """
+        self.wait_until_closed()
+        try:
+            result, error = func(), None
+        except Exception as e:
+            result, error = None, e
+        failed, _ = classify(result, error)
+        with self._lock:
+            self.stats['transfers'] += 1
+            if failed:
+                status = getattr(result, 'status_code', None) or type(error).__name__
+                self.stats[f'error_{status}'] += 1
+        self.record(not failed)
+        if error is not None:
+            raise error
+        return result
+
+
+class PooledSession(requests.Session):
+    """keep-alive 연결 풀을 공유하는 HTTP 세션 클래스
+    
+    영상 제목 조회와 자막 목록/본문 요청처럼 yt-dlp를 거치지 않는 모든 HTTP 요청이
+    이 세션 하나를 공유합니다. 같은 호스트에 대한 연결을 재사용하므로
+    작업마다 TLS 핸드셰이크를 반복하지 않습니다.
+    
+    Attributes:
+        timeout (tuple): 요청에 기본으로 적용되는 (연결, 응답) 제한 시간
+        governor (RequestGovernor): 동시 실행 수 제한과 재시도를 담당하는 요청 관리자
+    """
+    
+    def __init__(self, pool_size=8, timeout=(5, 20), proxy='', governor=None):
+        """
+        Args:
+            pool_size (int): 호스트별로 유지할 연결 수 (동시 작업 수 이상으로 설정)
+            timeout (tuple): (연결, 응답) 제한 시간 (초)
+            proxy (str): 모든 요청에 사용할 프록시 URL
+            governor (RequestGovernor): 요청 관리자 (없으면 재시도 없이 바로 요청)
+        """
+        super().__init__()
+        self.governor = governor
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+        self.timeout = timeout
+        if proxy:
+            self.proxies.update({'http': proxy, 'https': proxy})
+    
+    @classmethod
+    def from_config(cls, config, governor=None):
+        """설정 딕셔너리로부터 세션을 생성합니다.
+        
+        Args:
+            config (dict): load_config()가 반환한 설정
+            governor (RequestGovernor): 요청 관리자
+            
+        Returns:
+            PooledSession: 생성된 세션
+        """
+        return cls(
+            pool_size=int(config['http_pool_size']),
+            timeout=(float(config['http_connect_timeout']), float(config['http_read_timeout'])),
+            proxy=config['http_proxy'],
+            governor=governor,
+        )
+    
+    def request(self, method, url, **kwargs):
+        """기본 제한 시간을 적용하고 요청 관리자를 거쳐 요청합니다."""
+        kwargs.setdefault('timeout', self.timeout)
+        send = lambda: super(PooledSession, self).request(method, url, **kwargs)
+        if self.governor is None:
+            return send()
+        return self.governor.call(urlparse(url).hostname, send, classify_response)
+
+
+def fetch_video_title(session, url, endpoint=OEMBED_URL):
+    """oEmbed 엔드포인트로 영상 제목을 조회합니다.
+    
+    Args:
+        session (PooledSession): 공유 HTTP 세션
+        url (str): YouTube 영상 URL
+        endpoint (str): oEmbed 엔드포인트 URL
+        
+    Returns:
+        str: 영상 제목
+    """
+    response = session.get(endpoint, params={'url': url, 'format': 'json'})
+    response.raise_for_status()
+    return response.json()['title']
+
+
+def parse_rate(value):
+    """속도 제한 문자열을 초당 바이트 수로 변환합니다.
+    
+    "500K", "2M", "1.5G"처럼 단위(1024 기준)를 붙이거나 숫자만 입력할 수 있습니다.
+    
+    Args:
+        value (str | int | float): 속도 제한 값 (비어 있거나 0이면 무제한)
+        
+    Returns:
+        float: 초당 바이트 수 (무제한이면 0)
+        
+    Raises:
+        ValueError: 형식이 올바르지 않은 경우
+    """
+    if value in (None, '', '무제한'):
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMG]?)i?B?(?:/s)?\s*', value, re.IGNORECASE)
+    if not match:
+        raise ValueError(f"잘못된 속도 제한 값: {value}")
+    units = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    return float(match.group(1)) * units[match.group(2).upper()]
+
+
+def format_rate(rate):
+    """초당 바이트 수를 읽기 쉬운 문자열로 변환합니다.
+    
+    Args:
+        rate (float): 초당 바이트 수 (0이면 무제한)
+        
+    Returns:
+        str: 변환된 문자열 (예: "2.0MB/s")
+    """
+    if not rate:
+        return "무제한"
+    for unit in ('B', 'KB', 'MB'):
+        if rate < 1024:
+            return f"{rate:.1f}{unit}/s"
+        rate /= 1024
+    return f"{rate:.1f}GB/s"
+
+
+def parse_duration(value):
+    """시간 문자열을 초 단위로 변환합니다.
+    
+    "90", "45s", "30m", "1h", "1h30m"처럼 입력할 수 있습니다.
+    
+    Args:
+        value (str | int | float): 시간 값 (비어 있으면 0)
+        
+    Returns:
+        float: 초
+        
+    Raises:
+        ValueError: 형식이 올바르지 않은 경우
+    """
+    if value in (None, ''):
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.fullmatch(r'\s*(?:([\d.]+)h)?\s*(?:([\d.]+)m)?\s*(?:([\d.]+)s?)?\s*', value, re.IGNORECASE)
+    if not match or not any(match.groups()):
+        raise ValueError(f"잘못된 시간 값: {value}")
+    hours, minutes, seconds = (float(group or 0) for group in match.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def parse_clock(value):
+    """"HH:MM" 형식의 시각 문자열을 시각으로 변환합니다.
+    
+    "9:00"처럼 시를 한 자리로 입력해도 됩니다.
+    
+    Args:
+        value (str): 시각 문자열
+        
+    Returns:
+        datetime.time: 변환된 시각
+        
+    Raises:
+        ValueError: 형식이 올바르지 않은 경우
+    """
+    match = re.fullmatch(r'\s*(\d{1,2}):(\d{2})\s*', str(value))
+    if not match or int(match.group(1)) > 23 or int(match.group(2)) > 59:
+        raise ValueError(f"잘못된 시각: {value} (HH:MM 형식)")
+    return clock_time(int(match.group(1)), int(match.group(2)))
+
+
+def parse_schedule(windows):
+    """시간대별 속도 제한 목록을 검증하고 변환합니다.
+    
+    Args:
+        windows (list): {'start': "HH:MM", 'end': "HH:MM", 'limit': 속도} 딕셔너리 목록
+        
+    Returns:
+        list: (시작 시각, 끝 시각, 초당 바이트 수) 튜플 목록
+        
+    Raises:
+        ValueError: 시각이나 속도 형식이 올바르지 않은 경우
+    """
+    return [(parse_clock(window['start']), parse_clock(window['end']), parse_rate(window['limit']))
+            for window in windows]
+
+
+def fair_shares(total, caps):
+    """전체 대역폭을 작업별 상한을 고려해 공평하게 나눕니다 (max-min fairness).
+    
+    상한이 공평한 몫보다 작은 작업은 상한만큼만 받고, 남는 대역폭은
+    나머지 작업이 똑같이 나눠 가집니다.
+    
+    Args:
+        total (float): 전체 대역폭 (초당 바이트, 0이면 무제한)
+        caps (dict): 작업 ID별 상한 (0이면 상한 없음)
+        
+    Returns:
+        dict: 작업 ID별 할당 속도 (0이면 무제한)
+    """
+    if not total:
+        return dict(caps)
+    shares = {}
+    remaining = total
+    pending = sorted(caps, key=lambda job_id: caps[job_id] or float('inf'))
+    while pending:
+        equal = remaining / len(pending)
+        cap = caps[pending[0]] or float('inf')
+        if cap >= equal:
+            shares.update((job_id, equal) for job_id in pending)
+            break
+        shares[pending.pop(0)] = cap
+        remaining -= cap
+    return shares
+
+
+class BandwidthScheduler:
+    """모든 다운로드가 공유하는 토큰 버킷 대역폭 스케줄러 클래스
+    
+    yt-dlp의 진행률 콜백에서 받은 바이트 수만큼 작업별 토큰 버킷의 토큰을 소비하고,
+    토큰이 모자라면 다운로드 스레드를 잠시 멈춰 속도를 제한합니다.
+    작업별 속도는 전체 제한(또는 현재 시간대의 제한)을 최근에 데이터를 받은 작업들이
+    공평하게 나눈 값과 작업별 상한 중 작은 값입니다. 제한 값은 콜백이 호출될 때마다
+    다시 계산되므로 진행 중인 다운로드에도 즉시 적용됩니다.
+    
+    설정 파일이 바뀌면 (예: limit 명령) 1초 이내에 다시 읽어 반영합니다.
+    모든 작업이 받은 바이트 수를 합산해 최근 MEASURE_WINDOW 동안의 회선 속도도 측정합니다.
+    
+    Attributes:
+        config (dict): 공유 설정 딕셔너리 (설정 파일을 다시 읽으면 갱신됨)
+    """
+    
+    # 이 시간(초) 동안 데이터를 받지 않은 작업은 공평 분배 대상에서 제외
+    ACTIVE_WINDOW = 2.0
+    # 회선 속도를 측정하는 구간 (초)
+    MEASURE_WINDOW = 10.0
+    # 제한 값 변경이 반영되도록 한 번에 기다리는 최대 시간 (초)
+    MAX_SLEEP = 0.5
+    
+    def __init__(self, config):
+        """
+        Args:
+            config (dict): load_config()가 반환한 설정 (같은 객체를 계속 갱신함)
+        """
+        self.config = config
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._seen = {}
+        self._received = deque()
+        self._measured = 0.0
+        self._config_mtime = self._read_mtime()
+        self._next_reload_check = 0.0
+        self._schedule = (None, [])
+    
+    def _read_mtime(self):
+        """설정 파일의 수정 시각을 반환합니다."""
+        try:
+            return os.stat(CONFIG_FILE).st_mtime
+        except OSError:
+            return None
+    
+    def reload_if_changed(self):
+        """설정 파일이 바뀌었으면 다시 읽어 공유 설정을 갱신합니다."""
+        now = time.monotonic()
+        if now < self._next_reload_check:
+            return
+        self._next_reload_check = now + 1.0
+        mtime = self._read_mtime()
+        if mtime != self._config_mtime:
+            self._config_mtime = mtime
+            self.config.update(load_config())
+    
+    def set_global_limit(self, value):
+        """전체 속도 제한을 변경합니다.
+        
+        Args:
+            value (str): 속도 제한 값 (예: "10M", 비어 있으면 무제한)
+        """
+        parse_rate(value)
+        self.config['bandwidth_limit'] = value
+    
+    def set_job_limit(self, video_id, value):
+        """특정 영상의 작업들에 적용할 속도 제한을 변경합니다.
+        
+        Args:
+            video_id (str): 영상 ID
+            value (str): 속도 제한 값 (비어 있으면 작업별 제한 해제)
+        """
+        parse_rate(value)
+        limits = dict(self.config['job_bandwidth_limits'])
+        if value:
+            limits[video_id] = value
+        else:
+            limits.pop(video_id, None)
+        self.config['job_bandwidth_limits'] = limits
+    
+    def global_limit(self, now=None):
+        """현재 시각에 적용되는 전체 속도 제한을 반환합니다.
+        
+        Args:
+            now (datetime): 기준 시각 (None이면 현재 시각)
+            
+        Returns:
+            float: 초당 바이트 수 (0이면 무제한)
+        """
+        clock = (now or datetime.now()).time().replace(second=0, microsecond=0)
+        for start, end, limit in self.schedule():
+            inside = start <= clock < end if start <= end else (clock >= start or clock < end)
+            if inside:
+                return limit
+        return parse_rate(self.config['bandwidth_limit'])
+    
+    def schedule(self):
+        """변환한 시간대별 제한 목록을 반환합니다 (설정이 바뀔 때만 다시 변환).
+        
+        Returns:
+            list: (시작 시각, 끝 시각, 초당 바이트 수) 튜플 목록
+        """
+        source, parsed = self._schedule
+        windows = self.config['bandwidth_schedule']
+        if windows != source:
+            parsed = parse_schedule(windows)
+            self._schedule = (copy.deepcopy(windows), parsed)
+        return parsed
+    
+    def _job_cap(self, job_id):
+        """작업별 상한을 반환합니다 (0이면 상한 없음). 작업별 제한은 영상 ID로 설정합니다."""
+        limits = self.config['job_bandwidth_limits']
+        video_id = self._jobs[job_id]['video_id']
+        return parse_rate(limits.get(video_id, self.config['job_bandwidth_limit']))
+    
+    def job_rates(self):
+        """최근 활동한 작업별 현재 할당 속도를 계산합니다.
+        
+        Returns:
+            dict: 작업 ID별 초당 바이트 수 (0이면 무제한)
+        """
+        now = time.monotonic()
+        active = [job_id for job_id, job in self._jobs.items()
+                  if now - job['last_active'] < self.ACTIVE_WINDOW]
+        return fair_shares(self.global_limit(), {job_id: self._job_cap(job_id) for job_id in active})
+    
+    def register(self, job_id, video_id=None):
+        """다운로드를 시작하는 작업을 등록합니다.
+        
+        같은 영상을 받는 작업이 여럿이어도(예: 구간과 전체 영상) 토큰 버킷은 작업마다 따로 둡니다.
+        
+        Args:
+            job_id (str): 작업 ID
+            video_id (str): 작업별 제한(job_bandwidth_limits)을 찾을 영상 ID
+        """
+        with self._lock:
+            self._jobs[job_id] = {'tokens': 0.0, 'stamp': time.monotonic(),
+                                  'last_active': time.monotonic(), 'video_id': video_id}
+    
+    def unregister(self, job_id):
+        """작업을 해제해 그 몫의 대역폭을 다른 작업에 돌려줍니다.
+        
+        Args:
+            job_id (str): 작업 ID
+        """
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            for key in [key for key in self._seen if key[0] == job_id]:
+                del self._seen[key]
+    
+    def consume_progress(self, job_id, d):
+        """yt-dlp 진행률 정보에서 새로 받은 바이트 수를 계산해 속도를 제한합니다.
+        
+        Args:
+            job_id (str): 작업 ID
+            d (dict): yt-dlp 진행률 콜백 인자
+            
+        Returns:
+            int: 새로 받은 바이트 수
+        """
+        downloaded = d.get('downloaded_bytes') or 0
+        key = (job_id, d.get('tmpfilename') or d.get('filename'))
+        with self._lock:
+            last = self._seen.get(key, 0)
+            self._seen[key] = downloaded
+            nbytes = downloaded - last if downloaded >= last else downloaded
+            if nbytes > 0:
+                self._received.append((time.monotonic(), nbytes, job_id))
+        self.throttle(job_id, nbytes)
+        return nbytes
+    
+    def measured_rate(self):
+        """최근 MEASURE_WINDOW 동안 모든 작업이 받은 전체 속도를 반환합니다.
+        
+        최근에 받은 데이터가 없으면 마지막으로 측정한 속도를 반환합니다.
+        
+        Returns:
+            float: 초당 바이트 수 (아직 측정한 적이 없으면 0)
+        """
+        with self._lock:
+            self._expire_received()
+            if self._received:
+                span = max(1.0, time.monotonic() - self._received[0][0])
+                self._measured = sum(nbytes for _, nbytes, _ in self._received) / span
+            return self._measured
+    
+    def _expire_received(self):
+        """MEASURE_WINDOW보다 오래된 수신 기록을 버립니다 (잠금을 잡은 상태에서 호출)."""
+        now = time.monotonic()
+        while self._received and now - self._received[0][0] > self.MEASURE_WINDOW:
+            self._received.popleft()
+    
+    def job_measured_rates(self):
+        """최근 MEASURE_WINDOW 동안 작업별로 받은 속도를 반환합니다.
+        
+        Returns:
+            dict: 작업 ID별 초당 바이트 수 (최근에 받은 데이터가 있는 작업만)
+        """
+        with self._lock:
+            self._expire_received()
+            if not self._received:
+                return {}
+            span = max(1.0, time.monotonic() - self._received[0][0])
+            totals = Counter()
+            for _, nbytes, job_id in self._received:
+                totals[job_id] += nbytes
+            return {job_id: total / span for job_id, total in totals.items()}
+    
+    def throttle(self, job_id, nbytes):
+        """작업의 토큰을 nbytes만큼 소비하고, 부족하면 채워질 때까지 기다립니다.
+        
+        Args:
+            job_id (str): 작업 ID
+            nbytes (int): 새로 받은 바이트 수
+        """
+        if nbytes <= 0:
+            return
+        self.reload_if_changed()
+        while True:
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return
+                now = time.monotonic()
+                job['last_active'] = now
+                rate = self.job_rates().get(job_id, 0)
+                if not rate:
+                    job['tokens'], job['stamp'] = 0.0, now
+                    return
+                job['tokens'] = min(rate, job['tokens'] + (now - job['stamp']) * rate) - nbytes
+                job['stamp'] = now
+                nbytes = 0
+                if job['tokens'] >= 0:
+                    return
+                wait = -job['tokens'] / rate
+            time.sleep(min(wait, self.MAX_SLEEP))
+
+
+class FragmentConcurrencyController:
+    """측정한 처리량으로 작업별 동시 조각 다운로드 수를 조절하는 클래스
+    
+    DASH/HLS 조각 다운로드는 yt-dlp의 concurrent_fragment_downloads 값만큼 동시에
+    받습니다. yt-dlp는 스트림(영상/음성 형식) 다운로드를 시작할 때 이 값을 읽으므로,
+    스트림이 끝날 때마다 그 스트림의 처리량과 조각 재시도 비율을 보고 다음 스트림의
+    값을 정합니다.
+    
+    - 재시도 비율이 높으면 절반으로 줄입니다.
+    - 처리량이 지금까지의 최고 기록보다 10% 이상 좋아지면 하나 늘려 봅니다.
+    - 늘렸는데 빨라지지 않았으면 최고 기록을 냈던 값으로 되돌립니다.
+    
+    조정한 값은 호스트별로 기억해 같은 호스트의 다음 작업이 이어서 사용하며,
+    모든 작업의 동시 조각 수 합계는 전체 스레드 예산을 넘지 않습니다. 예산이 모두
+    쓰이고 있으면 새 작업은 다른 작업이 끝나 예산이 돌아올 때까지 기다립니다.
+    """
+    
+    # 이 비율 이상 조각 재시도가 발생하면 동시 조각 수를 줄임
+    ERROR_RATE = 0.05
+    # 이전 최고 처리량을 조금씩 낮춰 네트워크 상태 변화에 다시 적응하도록 함
+    DECAY = 0.9
+    
+    def __init__(self, budget=16, initial=2, maximum=8):
+        """
+        Args:
+            budget (int): 모든 작업이 함께 쓰는 조각 다운로드 스레드 수
+            initial (int): 처음 보는 호스트의 작업별 동시 조각 수
+            maximum (int): 작업별 동시 조각 수 상한
+        """
+        self.budget = max(1, budget)
+        self.initial = initial
+        self.maximum = maximum
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._jobs = {}
+        self._hosts = {}
+    
+    @classmethod
+    def from_config(cls, config):
+        """설정 딕셔너리로부터 컨트롤러를 생성합니다.
+        
+        Args:
+            config (dict): load_config()가 반환한 설정
+            
+        Returns:
+            FragmentConcurrencyController: 생성된 컨트롤러
+        """
+        return cls(budget=int(config['fragment_worker_budget']),
+                   initial=int(config['fragment_concurrency_initial']),
+                   maximum=int(config['fragment_concurrency_max']))
+    
+    def _available(self, job_id=None):
+        """다른 작업이 쓰고 있지 않은 예산을 반환합니다 (잠금을 잡은 상태에서 호출)."""
+        return self.budget - sum(job['n'] for other, job in self._jobs.items() if other != job_id)
+    
+    def _grant(self, job_id, wanted):
+        """전체 예산 안에서 작업에 동시 조각 수를 할당합니다.
+        
+        start()가 남은 예산이 있을 때만 작업을 등록하므로 실행 중인 작업에는
+        항상 1 이상이 남아 있습니다.
+        """
+        return max(1, min(wanted, self.maximum, self._available(job_id)))
+    
+    def start(self, job_id, host):
+        """다운로드 단계를 시작하는 작업에 동시 조각 수를 할당합니다.
+        
+        예산이 모두 쓰이고 있으면 다른 작업이 끝나거나 동시 조각 수를 줄일 때까지 기다립니다.
+        
+        Args:
+            job_id (str): 작업 ID
+            host (str): 요청 대상 호스트
+            
+        Returns:
+            int: yt-dlp의 concurrent_fragment_downloads에 사용할 값
+        """
+        with self._lock:
+            tuning = self._hosts.setdefault(
+                host, {'target': self.initial, 'best_rate': 0.0, 'best_n': self.initial})
+            self._released.wait_for(lambda: self._available(job_id) >= 1)
+            self._jobs[job_id] = {'host': host, 'n': 0, 'params': None, 'errors': 0,
+                                  'fragments': 0, 'fragmented': False}
+            n = self._jobs[job_id]['n'] = self._grant(job_id, tuning['target'])
+            return n
+    
+    def bind(self, job_id, params):
+        """조정한 값을 바로 반영할 yt-dlp 파라미터 딕셔너리를 연결합니다.
+        
+        Args:
+            job_id (str): 작업 ID
+            params (dict): YoutubeDL.params
+        """
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id]['params'] = params
+    
+    def report_retry(self, job_id):
+        """조각 또는 HTTP 요청 재시도를 기록합니다.
+        
+        Args:
+            job_id (str): 작업 ID
+        """
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id]['errors'] += 1
+    
+    def observe(self, job_id, d):
+        """yt-dlp 진행률 정보를 받아 스트림이 끝나면 동시 조각 수를 조정합니다.
+        
+        Args:
+            job_id (str): 작업 ID
+            d (dict): yt-dlp 진행률 콜백 인자
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            if d['status'] == 'downloading' and d.get('fragment_index') is not None:
+                job['fragmented'] = True
+                job['fragments'] = max(job['fragments'], d.get('fragment_count') or 0)
+            elif d['status'] == 'finished' and job['fragmented'] and d.get('elapsed'):
+                self._adapt(job_id, job, (d.get('downloaded_bytes') or 0) / d['elapsed'])
+    
+    def _adapt(self, job_id, job, rate):
+        """끝난 스트림의 처리량과 재시도 비율로 다음 스트림의 동시 조각 수를 정합니다."""
+        tuning = self._hosts[job['host']]
+        n = job['n']
+        error_rate = job['errors'] / max(job['fragments'], 1)
+        if error_rate >= self.ERROR_RATE:
+            target = max(1, n // 2)
+        elif rate > tuning['best_rate'] * 1.1:
+            tuning['best_rate'], tuning['best_n'] = rate, n
+            target = n + 1
+        else:
+            tuning['best_rate'] *= self.DECAY
+            target = min(n, tuning['best_n'])
+        tuning['target'] = max(1, min(target, self.maximum))
+        job.update(errors=0, fragments=0, fragmented=False)
+        job['n'] = self._grant(job_id, tuning['target'])
+        if job['params'] is not None:
+            job['params']['concurrent_fragment_downloads'] = job['n']
+        self._released.notify_all()
+    
+    def finish(self, job_id):
+        """작업의 할당을 해제해 예산을 돌려줍니다.
+        
+        Args:
+            job_id (str): 작업 ID
+        """
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._released.notify_all()
+    
+    def snapshot(self):
+        """호스트별 조정 상태를 반환합니다.
+        
+        Returns:
+            dict: 호스트별 목표 동시 조각 수와 최고 처리량
+        """
+        with self._lock:
+            return {host: dict(tuning) for host, tuning in self._hosts.items()}
+
+
+class SegmentedDownloader:
+    """바이트 범위를 여러 연결로 나눠 받는 단일 파일 다운로더 클래스
+    
+    파일을 여러 바이트 범위로 나누고, 공유 HTTP 세션의 연결 풀에서 여러 연결로
+    동시에 받습니다. 각 범위는 미리 할당한 파일의 해당 위치에 바로 기록(pwrite)하므로
+    버퍼를 이어 붙이거나 복사하지 않습니다.
+    
+    범위별 완료 여부와 SHA-256은 "<파일명>.seg.json"에 기록되어, 중단 후 다시 받으면
+    완료된 범위의 체크섬을 확인한 뒤 나머지 범위만 받습니다. StreamHasher를 넘기면
+    앞에서부터 빈틈없이 받은 부분까지 파일 전체의 SHA-256도 받는 동안 계산합니다.
+    """
+    
+    CHUNK_SIZE = 256 * 1024
+    # 범위 하나를 받을 때의 최대 시도 횟수 (받은 위치부터 이어받음)
+    RANGE_ATTEMPTS = 3
+    
+    def __init__(self, session, connections=4, min_segment=4 * 1024 * 1024):
+        """
+        Args:
+            session (PooledSession): 공유 HTTP 세션
+            connections (int): 동시에 사용할 연결 수
+            min_segment (int): 바이트 범위 하나의 최소 크기
+        """
+        self.session = session
+        self.connections = connections
+        self.min_segment = min_segment
+    
+    @classmethod
+    def from_config(cls, session, config):
+        """설정 딕셔너리로부터 다운로더를 생성합니다.
+        
+        Args:
+            session (PooledSession): 공유 HTTP 세션
+            config (dict): load_config()가 반환한 설정
+            
+        Returns:
+            SegmentedDownloader: 생성된 다운로더
+        """
+        return cls(session, connections=int(config['segmented_connections']),
+                   min_segment=int(parse_rate(config['segmented_min_segment'])))
+    
+    @staticmethod
+    def supports(info):
+        """yt-dlp가 선택한 형식을 이 다운로더로 받을 수 있는지 확인합니다.
+        
+        영상/음성을 따로 받아 합치는 형식이나 조각(DASH/HLS) 형식은 제외하고,
+        http(s)로 받는 단일 파일 형식만 대상으로 합니다.
+        
+        Args:
+            info (dict): extract_info(download=False)가 반환한 정보
+            
+        Returns:
+            bool: 지원 여부
+        """
+        return (info.get('requested_formats') is None
+                and info.get('protocol') in ('http', 'https')
+                and bool(info.get('url')))
+    
+    def probe(self, url, headers=None):
+        """Range 요청 지원 여부와 파일 크기를 확인합니다.
+        
+        Args:
+            url (str): 파일 URL
+            headers (dict): 요청 헤더
+            
+        Returns:
+            int: 파일 크기 (Range 요청을 지원하지 않으면 None)
+        """
+        with self.session.get(url, headers={**(headers or {}), 'Range': 'bytes=0-0'},
+                              stream=True) as response:
+            response.raise_for_status()
+            content_range = response.headers.get('Content-Range', '')
+            match = re.fullmatch(r'bytes 0-0/(\d+)', content_range)
+            if response.status_code != 206 or not match:
+                return None
+            return int(match.group(1))
+    
+    def plan(self, size):
+        """파일을 바이트 범위로 나눕니다.
+        
+        연결마다 여러 범위가 돌아가도록 나눠, 느린 범위가 있어도 다른 연결이
+        남은 범위를 가져갈 수 있게 합니다.
+        
+        Args:
+            size (int): 파일 크기
+            
+        Returns:
+            list: {'start', 'end', 'done', 'sha256'} 딕셔너리 목록 (end 포함)
+        """
+        segment = max(self.min_segment, -(-size // (self.connections * 4)))
+        return [{'start': start, 'end': min(start + segment, size) - 1, 'done': False, 'sha256': None}
+                for start in range(0, size, segment)]
+    
+    @staticmethod
+    def _write_at(file, data, offset):
+        """파일의 지정한 위치에 데이터를 기록합니다.
+        
+        os.pwrite가 있으면 파일 위치를 바꾸지 않는 위치 지정 쓰기를 사용하고,
+        없으면 (Windows) 스레드마다 따로 연 파일 핸들에서 seek 후 기록합니다.
+        """
+        if hasattr(os, 'pwrite'):
+            view = memoryview(data)
+            while view:
+                written = os.pwrite(file.fileno(), view, offset)
+                view = view[written:]
+                offset += written
+        else:
+            file.seek(offset)
+            file.write(data)
+    
+    @staticmethod
+    def _range_digest(part_path, rng):
+        """기록된 범위의 SHA-256을 계산합니다."""
+        digest = hashlib.sha256()
+        with open(part_path, 'rb') as file:
+            file.seek(rng['start'])
+            remaining = rng['end'] - rng['start'] + 1
+            while remaining:
+                data = file.read(min(remaining, 1024 * 1024))
+                if not data:
+                    break
+                digest.update(data)
+                remaining -= len(data)
+        return digest.hexdigest()
+    
+    def _load_state(self, state_path, part_path, size):
+        """이어받기 상태를 읽고 완료된 범위의 체크섬을 확인합니다.
+        
+        Returns:
+            list: 범위 목록 (이어받을 수 없으면 None)
+        """
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('size') != size or not os.path.exists(part_path):
+            return None
+        ranges = state['ranges']
+        for rng in ranges:
+            if rng['done'] and self._range_digest(part_path, rng) != rng['sha256']:
+                rng.update(done=False, sha256=None)
+        return ranges
+    
+    @staticmethod
+    def _save_state(state_path, size, ranges):
+        """이어받기 상태를 원자적으로 저장합니다."""
+        temp_path = state_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'size': size, 'ranges': ranges}, f)
+        os.replace(temp_path, state_path)
+    
+    def _fetch_range(self, url, headers, part_path, rng, advance):
+        """바이트 범위 하나를 받아 파일의 해당 위치에 기록합니다.
+        
+        연결이 끊기면 이미 기록한 위치부터 다시 요청합니다.
+        """
+        digest = hashlib.sha256()
+        offset = rng['start']
+        with open(part_path, 'r+b') as file:
+            for attempt in range(self.RANGE_ATTEMPTS):
+                try:
+                    range_headers = {**(headers or {}), 'Range': f"bytes={offset}-{rng['end']}"}
+                    with self.session.get(url, headers=range_headers, stream=True) as response:
+                        if response.status_code != 206:
+                            response.raise_for_status()
+                            raise IOError(f"Range 요청이 거부되었습니다: {response.status_code}")
+                        for chunk in response.iter_content(self.CHUNK_SIZE):
+                            self._write_at(file, chunk, offset)
+                            digest.update(chunk)
+                            # 받은 위치(frontier)에 보이기 전에 넘겨 이어지는 블록은 메모리에서 해시
+                            advance(offset, chunk)
+                            offset += len(chunk)
+                            rng['offset'] = offset
+                    if offset > rng['end']:
+                        break
+                except (requests.ConnectionError, requests.Timeout):
+                    if attempt == self.RANGE_ATTEMPTS - 1:
+                        raise
+            if offset <= rng['end']:
+                raise IOError(f"바이트 범위를 끝까지 받지 못했습니다: {rng['start']}-{rng['end']}")
+        rng.pop('offset', None)
+        rng['sha256'] = digest.hexdigest()
+        rng['done'] = True
+    
+    def _split_range(self, part_path, ranges, rng):
+        """중단된 범위에서 이미 기록한 앞부분을 완료된 범위로 떼어 냅니다.
+        
+        나머지는 새 범위로 추가되어 다음에 받을 때 기록한 위치부터 이어받습니다.
+        """
+        offset = rng.pop('offset', rng['start'])
+        if rng['done'] or offset <= rng['start']:
+            return
+        ranges.append({'start': offset, 'end': rng['end'], 'done': False, 'sha256': None})
+        rng['end'] = offset - 1
+        rng['sha256'] = self._range_digest(part_path, rng)
+        rng['done'] = True
+    
+    @staticmethod
+    def _frontier(ranges):
+        """앞에서부터 빈틈없이 받은 위치를 반환합니다 (잠금을 잡은 상태에서 호출)."""
+        frontier = 0
+        for rng in sorted(ranges, key=lambda rng: rng['start']):
+            if not rng['done']:
+                return rng.get('offset', rng['start'])
+            frontier = rng['end'] + 1
+        return frontier
+    
+    def download(self, url, filename, headers=None, progress_hook=None, hasher=None):
+        """파일을 여러 연결로 나눠 받습니다.
+        
+        Args:
+            url (str): 파일 URL
+            filename (str): 저장할 파일 경로
+            headers (dict): 요청 헤더 (yt-dlp 형식 정보의 http_headers)
+            progress_hook (callable): yt-dlp progress_hooks와 같은 형식의 진행률 콜백
+            hasher (StreamHasher): 받는 동안 파일 전체의 SHA-256을 계산할 객체
+            
+        Returns:
+            bool: 받았으면 True, Range 요청을 지원하지 않아 받지 않았으면 False
+        """
+        size = self.probe(url, headers)
+        if not size:
+            return False
+        part_path = filename + '.seg.part'
+        state_path = filename + '.seg.json'
+        ranges = self._load_state(state_path, part_path, size)
+        if ranges is None:
+            ranges = self.plan(size)
+            with open(part_path, 'wb') as file:
+                if hasattr(os, 'posix_fallocate'):
+                    os.posix_fallocate(file.fileno(), 0, size)
+                else:
+                    file.truncate(size)
+            self._save_state(state_path, size, ranges)
+        
+        lock = threading.Lock()
+        started = time.monotonic()
+        progress = {'downloaded': sum(r['end'] - r['start'] + 1 for r in ranges if r['done'])}
+        
+        def report(status):
+            if progress_hook is None:
+                return
+            elapsed = time.monotonic() - started
+            progress_hook({
+                'status': status,
+                'filename': filename,
+                'tmpfilename': part_path,
+                'downloaded_bytes': progress['downloaded'],
+                'total_bytes': size,
+                'elapsed': elapsed,
+                '_percent_str': f"{progress['downloaded'] * 100 / size:.1f}%",
+            })
+        
+        def advance(offset, chunk):
+            # 누적 값의 순서가 뒤바뀌지 않도록 진행률 콜백(속도 제한 포함)을 잠금 안에서 호출
+            with lock:
+                progress['downloaded'] += len(chunk)
+                report('downloading')
+                frontier = self._frontier(ranges)
+            if hasher:
+                hasher.update(part_path, offset, chunk)
+                hasher.advance(part_path, frontier)
+        
+        def fetch(rng):
+            try:
+                self._fetch_range(url, headers, part_path, rng, advance)
+            except Exception:
+                with lock:
+                    self._split_range(part_path, ranges, rng)
+                raise
+            finally:
+                with lock:
+                    self._save_state(state_path, size, ranges)
+        
+        pending = [rng for rng in ranges if not rng['done']]
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.connections, len(pending))) as pool:
+                futures = [pool.submit(fetch, rng) for rng in pending]
+                wait(futures, return_when=FIRST_EXCEPTION)
+                # 한 범위가 실패하거나 작업이 중단되면 아직 시작하지 않은 범위는 받지 않음
+                for future in futures:
+                    future.cancel()
+                for future in futures:
+                    if not future.cancelled():
+                        future.result()
+        
+        if hasher:
+            hasher.finish(part_path, filename)
+        os.replace(part_path, filename)
+        os.remove(state_path)
+        report('finished')
+        return True
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """파일을 읽어 SHA-256과 크기를 계산합니다.
+    
+    Args:
+        path (str): 파일 경로
+        chunk_size (int): 한 번에 읽을 크기
+        
+    Returns:
+        tuple: (SHA-256 16진수 문자열, 크기)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+            size += len(block)
+    return digest.hexdigest(), size
+
+
+def copy_with_hash(source, destination, chunk_size=1024 * 1024):
+    """파일을 복사하면서 SHA-256을 계산합니다.
+    
+    원본을 한 번만 읽어 복사와 해시 계산에 함께 사용합니다.
+    
+    Args:
+        source (str): 원본 파일 경로
+        destination (str): 복사할 경로
+        chunk_size (int): 한 번에 읽을 크기
+        
+    Returns:
+        tuple: (SHA-256 16진수 문자열, 크기)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        for block in iter(lambda: src.read(chunk_size), b''):
+            digest.update(block)
+            dst.write(block)
+            size += len(block)
+    shutil.copystat(source, destination)
+    return digest.hexdigest(), size
+
+
+class StreamHasher:
+    """받는 중인 파일의 SHA-256을 쓰는 동안 이어서 계산하는 클래스
+    
+    파일별로 해시를 계산한 위치를 기억하고 그 뒤를 이어서 계산하므로, 다운로드가 끝나면
+    해시도 끝나 있어 옮길 때 파일 전체를 다시 읽을 필요가 없습니다.
+    
+    SegmentedDownloader는 받은 블록을 update()로 넘기므로 앞에서부터 이어지는 블록은
+    메모리에서 바로 계산하고, 앞 범위보다 먼저 받은 뒤쪽 범위만 앞 범위가 끝난 뒤
+    advance()가 파일에서 읽습니다. yt-dlp의 진행률 콜백(hook)은 데이터를 넘겨주지 않으므로
+    .part 파일에서 새로 쓴 부분만 읽습니다 (방금 쓴 부분이라 보통 페이지 캐시에서 읽힘).
+    
+    잠금은 파일마다 따로 있어 한 작업의 파일 읽기가 다른 작업의 진행률 콜백을 막지 않고,
+    같은 파일을 다른 스레드가 읽는 중이면 advance()는 기다리지 않고 돌아갑니다
+    (나머지는 다음 호출이나 finish()에서 이어서 계산).
+    """
+    
+    CHUNK_SIZE = 1024 * 1024
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 경로 -> [파일별 잠금, 해시 객체, 계산한 위치]
+        self._files = {}
+        self._finals = {}
+        self._done = {}
+    
+    def _entry(self, path):
+        """파일의 계산 상태를 반환합니다 (없으면 새로 만듦)."""
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is None:
+                entry = self._files[path] = [threading.Lock(), hashlib.sha256(), 0]
+            return entry
+    
+    def update(self, path, offset, data):
+        """받은 블록이 계산한 위치에 이어지면 파일을 읽지 않고 해시에 더합니다.
+        
+        이어지지 않는 블록은 무시하며, 그 부분은 나중에 advance()가 파일에서 읽습니다.
+        
+        Args:
+            path (str): 쓰는 중인 파일 경로
+            offset (int): 블록을 쓴 위치 (바이트)
+            data (bytes): 쓴 블록
+        """
+        entry = self._entry(path)
+        with entry[0]:
+            skip = entry[2] - offset
+            if 0 <= skip < len(data):
+                entry[1].update(memoryview(data)[skip:])
+                entry[2] = offset + len(data)
+    
+    def advance(self, path, upto=None, block=False):
+        """파일의 upto 위치(None이면 현재 크기)까지 아직 계산하지 않은 부분을 읽어 계산합니다.
+        
+        Args:
+            path (str): 쓰는 중인 파일 경로
+            upto (int): 앞에서부터 다 쓴 위치 (바이트)
+            block (bool): 다른 스레드가 같은 파일을 계산 중이면 기다릴지 여부
+        """
+        entry = self._entry(path)
+        if not entry[0].acquire(blocking=block):
+            return
+        try:
+            digest, offset = entry[1], entry[2]
+            try:
+                if upto is None:
+                    upto = os.path.getsize(path)
+                if upto > offset:
+                    with open(path, 'rb') as f:
+                        f.seek(offset)
+                        while offset < upto:
+                            data = f.read(min(self.CHUNK_SIZE, upto - offset))
+                            if not data:
+                                break
+                            digest.update(data)
+                            offset += len(data)
+            except OSError:
+                pass
+            entry[2] = offset
+        finally:
+            entry[0].release()
+    
+    def finish(self, path, final_path):
+        """쓰기가 끝난 파일의 나머지를 계산하고 최종 경로의 결과로 기록합니다.
+        
+        Args:
+            path (str): 쓰는 중이던 파일 경로 (.part 등)
+            final_path (str): 이름을 바꾼 최종 경로
+        """
+        with self._lock:
+            # 이미 이름을 바꿨으면 나머지는 최종 경로에서 이어서 읽음
+            if path != final_path and path in self._files and not os.path.exists(path):
+                self._files[final_path] = self._files.pop(path)
+                path = final_path
+        self.advance(path, block=True)
+        with self._lock:
+            entry = self._files.pop(path, None)
+        if entry is not None:
+            with entry[0]:
+                found = (entry[1].hexdigest(), entry[2])
+            with self._lock:
+                self._done[os.path.abspath(final_path)] = found
+    
+    def result(self, path):
+        """다 쓴 파일의 해시를 반환합니다.
+        
+        크기가 달라졌으면(후처리가 파일을 고쳐 씀) 계산한 해시를 쓰지 않습니다.
+        
+        Args:
+            path (str): 파일 경로
+            
+        Returns:
+            tuple: (SHA-256 16진수 문자열, 크기), 모르면 None
+        """
+        with self._lock:
+            found = self._done.get(os.path.abspath(path))
+        if found is None or not os.path.exists(path) or os.path.getsize(path) != found[1]:
+            return None
+        return found
+    
+    def hook(self, d):
+        """yt-dlp progress_hooks에 넣어 순서대로 쓰는 다운로드의 해시를 계산합니다.
+        
+        'finished' 콜백에는 .part 경로가 없으므로 'downloading' 콜백에서 본 경로를 기억해 둡니다.
+        """
+        filename = d.get('filename')
+        if d['status'] == 'downloading' and d.get('tmpfilename') not in (None, '-'):
+            with self._lock:
+                self._finals[filename] = d['tmpfilename']
+            self.advance(d['tmpfilename'])
+        elif d['status'] == 'finished':
+            with self._lock:
+                tmpfilename = self._finals.pop(filename, None)
+            if tmpfilename:
+                self.finish(tmpfilename, filename)
+
+
+class HashIndex:
+    """다운로드 폴더의 해시 목록 파일(HASH_INDEX_FILE)을 관리하는 클래스
+    
+    목록은 파일 이름 -> {'sha256', 'size', 'mtime'} JSON입니다. 해시는 파일을 쓰거나
+    저장 폴더로 옮기는 동안 계산해 기록하므로, 확인할 때 파일을 다시 읽지 않아도
+    크기와 수정 시각으로 빠르게 확인할 수 있습니다. 파일 내용까지 확인하려면
+    deep=True로 다시 읽어 해시를 비교합니다.
+    """
+    
+    _lock = threading.Lock()
+    # 이 시간(초)보다 오래된 잠금 파일은 무시
+    LOCK_STALE = 30.0
+    
+    @staticmethod
+    def index_path(folder):
+        """폴더의 해시 목록 파일 경로를 반환합니다."""
+        return os.path.join(folder, HASH_INDEX_FILE)
+    
+    @classmethod
+    def load(cls, folder):
+        """폴더의 해시 목록을 읽습니다 (없으면 빈 목록).
+        
+        Args:
+            folder (str): 다운로드 폴더
+            
+        Returns:
+            dict: 파일 이름 -> 해시 정보
+        """
+        try:
+            with open(cls.index_path(folder), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    @classmethod
+    @contextlib.contextmanager
+    def _file_lock(cls, folder):
+        """다른 프로세스(공유 폴더를 쓰는 다른 작업자)와 해시 목록을 함께 고치지 않도록 잠금 파일을 만듭니다.
+        
+        LOCK_STALE초보다 오래된 잠금 파일은 비정상 종료한 프로세스가 남긴 것으로 보고 지웁니다.
+        """
+        lock_path = cls.index_path(folder) + '.lock'
+        while True:
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > cls.LOCK_STALE:
+                        os.remove(lock_path)
+                except OSError:
+                    pass
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            os.remove(lock_path)
+    
+    @classmethod
+    def _update(cls, folder, func):
+        """해시 목록을 읽어 func로 고친 뒤 임시 파일을 거쳐 바꿔 씁니다."""
+        with cls._lock, cls._file_lock(folder):
+            entries = cls.load(folder)
+            func(entries)
+            temp_path = f"{cls.index_path(folder)}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, cls.index_path(folder))
+    
+    @classmethod
+    def record(cls, path, digest, size):
+        """파일의 해시를 같은 폴더의 해시 목록에 기록합니다.
+        
+        Args:
+            path (str): 파일 경로
+            digest (str): SHA-256 16진수 문자열
+            size (int): 파일 크기
+        """
+        entry = {'sha256': digest, 'size': size, 'mtime': os.path.getmtime(path)}
+        cls._update(os.path.dirname(os.path.abspath(path)),
+                    lambda entries: entries.__setitem__(os.path.basename(path), entry))
+    
+    @classmethod
+    def discard(cls, path):
+        """해시 목록에서 파일을 뺍니다 (후처리로 지운 중간 파일 등)."""
+        cls._update(os.path.dirname(os.path.abspath(path)),
+                    lambda entries: entries.pop(os.path.basename(path), None))
+    
+    @classmethod
+    def lookup(cls, path):
+        """기록한 뒤 바뀌지 않은 파일의 해시를 반환합니다.
+        
+        verify()의 기본 확인과 같이 크기와 수정 시각이 모두 기록과 같을 때만 기록을 믿습니다.
+        
+        Args:
+            path (str): 파일 경로
+            
+        Returns:
+            tuple: (SHA-256 16진수 문자열, 크기), 기록이 없거나 파일이 바뀌었으면 None
+        """
+        entry = cls.load(os.path.dirname(os.path.abspath(path))).get(os.path.basename(path))
+        if (entry is None or os.path.getsize(path) != entry['size']
+                or abs(os.path.getmtime(path) - entry['mtime']) > 1):
+            return None
+        return entry['sha256'], entry['size']
+    
+    @classmethod
+    def verify(cls, folder, deep=False):
+        """해시 목록의 파일을 확인합니다.
+        
+        기본 확인은 크기와 수정 시각만 비교하며, 수정 시각만 다르면 'modified'로
+        표시합니다. deep=True이면 파일을 다시 읽어 해시를 비교합니다.
+        
+        Args:
+            folder (str): 다운로드 폴더
+            deep (bool): 해시까지 비교할지 여부
+            
+        Returns:
+            list: (파일 이름, 결과) 목록 (결과: 'ok', 'missing', 'size', 'modified', 'hash')
+        """
+        results = []
+        for name, entry in sorted(cls.load(folder).items()):
+            path = os.path.join(folder, name)
+            if not os.path.exists(path):
+                result = 'missing'
+            elif os.path.getsize(path) != entry['size']:
+                result = 'size'
+            elif deep:
+                result = 'ok' if hash_file(path)[0] == entry['sha256'] else 'hash'
+            elif abs(os.path.getmtime(path) - entry['mtime']) > 1:
+                result = 'modified'
+            else:
+                result = 'ok'
+            results.append((name, result))
+        return results
+
+
+class NamedPostProcessor:
+    """후처리기 이름으로 클래스 이름을 그대로 쓰게 하는 믹스인 클래스
+    
+    yt-dlp는 클래스 이름 끝의 두 글자('PP')를 떼어 후처리기 이름을 만드므로, 이름이
+    'PP'로 끝나지 않는 이 파일의 후처리기는 후처리 콜백에 잘린 이름이 전달됩니다.
+    """
+    
+    @classmethod
+    def pp_key(cls):
+        return cls.__name__
+
+
+class HashingMover(NamedPostProcessor, PostProcessor):
+    """결과 파일을 저장 폴더로 옮기면서 SHA-256을 계산하는 yt-dlp 후처리기 클래스
+    
+    yt-dlp의 파일 이동(MoveFiles) 바로 앞에서 실행되어 옮길 파일을 직접 옮깁니다.
+    받는 동안 StreamHasher가 계산한 해시가 있으면 그대로 쓰므로, 같은 볼륨에서 이름만
+    바꿀 때 파일을 다시 읽지 않습니다. 임시 폴더가 다른 볼륨이면 복사하면서 해시를
+    계산합니다. ffmpeg가 병합/변환한 파일처럼 받는 동안 해시를 계산할 수 없었던
+    파일만 한 번 읽어 계산합니다. 계산한 해시는 HashIndex에 기록합니다.
+    """
+    
+    def __init__(self, downloader=None, hasher=None):
+        """
+        Args:
+            downloader (yt_dlp.YoutubeDL): 후처리기를 등록할 YoutubeDL
+            hasher (StreamHasher): 받는 동안 해시를 계산한 객체
+        """
+        PostProcessor.__init__(self, downloader)
+        self.hasher = hasher
+    
+    def _digest(self, path):
+        """받는 동안 계산한 해시를 반환하고, 없으면 파일을 읽어 계산합니다."""
+        return (self.hasher and self.hasher.result(path)) or hash_file(path)
+    
+    def run(self, info):
+        """결과 파일을 저장 폴더로 옮기고 해시를 기록합니다.
+        
+        Args:
+            info (dict): yt-dlp 영상 정보 (filepath, __files_to_move, __finaldir 사용)
+            
+        Returns:
+            tuple: (지울 파일 목록, 갱신한 영상 정보)
+        """
+        final_dir = info.get('__finaldir') or os.path.dirname(info['filepath'])
+        moves = dict(info.get('__files_to_move') or {})
+        final_path = os.path.join(final_dir, os.path.basename(info['filepath']))
+        moves[info['filepath']] = final_path
+        for source, destination in moves.items():
+            destination = destination or os.path.join(final_dir, os.path.basename(source))
+            if not os.path.exists(source):
+                continue
+            if os.path.abspath(source) == os.path.abspath(destination):
+                digest, size = self._digest(destination)
+            else:
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                if os.path.exists(destination):
+                    os.remove(destination)
+                if volume_id(os.path.dirname(source)) == volume_id(os.path.dirname(destination)):
+                    digest, size = self._digest(source)
+                    os.replace(source, destination)
+                else:
+                    digest, size = copy_with_hash(source, destination)
+                    os.remove(source)
+                self.to_screen(f'"{source}" 파일을 "{destination}"(으)로 옮겼습니다')
+            HashIndex.record(destination, digest, size)
+        # 옮긴 파일은 yt-dlp의 파일 이동에서 다시 옮기지 않음
+        info['__files_to_move'] = {}
+        info['filepath'] = final_path
+        return [], info
+
+
+class MediaStore:
+    """받은 파일을 내용 해시(SHA-256)로 한 벌만 보관하는 저장소 클래스
+    
+    파일은 objects/<해시 앞 2자리>/<해시>.<확장자>에 보관하고, 저장 폴더에는 사용자가
+    정한 파일명으로 저장소 파일의 하드 링크(다른 볼륨이면 심볼릭 링크)를 만듭니다.
+    영상 ID, 단계, 변형(해상도, mp3/원본 코덱)별로 어떤 파일인지 기록해 두므로 같은
+    영상을 다른 제목으로 다시 요청하면 받지 않고 링크만 만듭니다. 어떤 이름도
+    가리키지 않는 파일은 gc()로 지웁니다.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS artifacts (
+            key TEXT PRIMARY KEY,
+            video_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            variant TEXT NOT NULL,
+            format_id TEXT,
+            sha256 TEXT NOT NULL,
+            ext TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS artifacts_video ON artifacts (video_id, stage);
+        CREATE TABLE IF NOT EXISTS links (
+            path TEXT PRIMARY KEY,
+            sha256 TEXT NOT NULL,
+            ext TEXT NOT NULL
+        );
+    """
+    
+    def __init__(self, root, link='hardlink'):
+        """
+        Args:
+            root (str): 저장소 폴더
+            link (str): 파일 이름을 만드는 방법 ('hardlink' 또는 'symlink')
+        """
+        self.root = root
+        self.link_mode = link
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, 'store.db'), check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(self.SCHEMA)
+    
+    @classmethod
+    def from_config(cls, config):
+        """설정 딕셔너리로 저장소를 생성합니다 (저장소를 쓰지 않으면 None)."""
+        if not config['media_store']:
+            return None
+        return cls(config['media_store'], link=config['media_store_link'])
+    
+    def _execute(self, sql, params=()):
+        """SQL 문을 실행하고 결과 행 목록을 반환합니다."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+    
+    @staticmethod
+    def variant(job, stage):
+        """작업 단계의 결과 파일을 구분하는 변형 이름을 반환합니다.
+        
+        구간만 받거나 챕터별로 나누는 단계는 파일이 여러 개이므로 저장소를 쓰지 않습니다.
+        
+        Args:
+            job (DownloadJob): 대상 작업
+            stage (str): 단계 이름 ('video' 또는 'audio')
+            
+        Returns:
+            str: 변형 이름 (자동 해상도는 '*', 저장소를 쓰지 않으면 None)
+        """
+        if not job.video_id or job.options['clips']:
+            return None
+        if stage == 'video':
+            return '*' if job.options['resolution'] == AUTO_RESOLUTION else job.options['resolution']
+        if job.options['split_chapters']:
+            return None
+        return 'passthrough' if job.options['audio_passthrough'] else 'mp3'
+    
+    def blob_path(self, digest, ext):
+        """해시와 확장자로 저장소 파일 경로를 반환합니다."""
+        return os.path.join(self.root, 'objects', digest[:2], f"{digest}.{ext}")
+    
+    def lookup(self, video_id, stage, variant):
+        """저장소에 있는 결과 파일을 찾습니다.
+        
+        Args:
+            video_id (str): 영상 ID
+            stage (str): 단계 이름
+            variant (str): 변형 이름 ('*'이면 가장 큰 파일)
+            
+        Returns:
+            tuple: (해시, 확장자, 크기) (없으면 None)
+        """
+        if variant == '*':
+            rows = self._execute('SELECT sha256, ext, size FROM artifacts WHERE video_id = ? AND stage = ? '
+                                 'ORDER BY size DESC', (video_id, stage))
+        else:
+            rows = self._execute('SELECT sha256, ext, size FROM artifacts WHERE key = ?',
+                                 (f"{video_id}/{stage}/{variant}",))
+        for digest, ext, size in rows:
+            if os.path.exists(self.blob_path(digest, ext)):
+                return digest, ext, size
+        return None
+    
+    def link(self, digest, ext, path):
+        """저장소 파일을 가리키는 이름을 만듭니다.
+        
+        하드 링크를 만들 수 없으면(다른 볼륨 등) 심볼릭 링크를, 그것도 안 되면 복사합니다.
+        
+        Args:
+            digest (str): 해시
+            ext (str): 확장자
+            path (str): 만들 파일 경로 (이미 있으면 바꿈)
+        """
+        blob = self.blob_path(digest, ext)
+        if os.path.lexists(path):
+            os.remove(path)
+        try:
+            if self.link_mode == 'symlink':
+                raise OSError
+            os.link(blob, path)
+        except OSError:
+            try:
+                os.symlink(os.path.abspath(blob), path)
+            except OSError:
+                shutil.copy2(blob, path)
+        self._execute('INSERT OR REPLACE INTO links (path, sha256, ext) VALUES (?, ?, ?)',
+                      (os.path.abspath(path), digest, ext))
+    
+    def ingest(self, job, stage, path, format_id=None, hasher=None):
+        """받은 파일을 저장소로 옮기고 원래 경로에는 링크를 만듭니다.
+        
+        받는 동안 계산한 해시(StreamHasher)나, 크기와 수정 시각이 그대로인 해시 목록(HashIndex)
+        기록이 있으면 그 해시를 사용하고 없으면 파일을 읽어 계산합니다. 같은 내용의 파일이
+        이미 있으면 받은 파일을 지우고 있는 파일에 연결합니다.
+        
+        Args:
+            job (DownloadJob): 대상 작업
+            stage (str): 단계 이름
+            path (str): 받은 파일 경로
+            format_id (str): 받은 형식 ID
+            hasher (StreamHasher): 받는 동안 해시를 계산한 객체
+        """
+        variant = self.variant(job, stage)
+        if variant == '*':
+            variant = f"{job.options.get('auto_height') or AUTO_MAX_HEIGHT}p"
+        digest, size = ((hasher and hasher.result(path)) or HashIndex.lookup(path)
+                        or hash_file(path))
+        ext = os.path.splitext(path)[1].lstrip('.')
+        blob = self.blob_path(digest, ext)
+        if os.path.exists(blob):
+            os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            shutil.move(path, blob)
+        self.link(digest, ext, path)
+        self._execute(
+            'INSERT OR REPLACE INTO artifacts (key, video_id, stage, variant, format_id, sha256, ext, size, '
+            'created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (f"{job.video_id}/{stage}/{variant}", job.video_id, stage, variant, format_id,
+             digest, ext, size, time.time()))
+    
+    def _linked(self, path, blob):
+        """이름이 아직 저장소 파일을 가리키는지 확인합니다."""
+        try:
+            if os.path.islink(path):
+                return os.path.realpath(path) == os.path.realpath(blob)
+            return os.path.samefile(path, blob)
+        except OSError:
+            return False
+    
+    def gc(self, dry_run=False):
+        """어떤 이름도 가리키지 않는 저장소 파일을 지웁니다.
+        
+        지워지거나 다른 파일로 바뀐 이름의 기록도 함께 정리합니다.
+        
+        Args:
+            dry_run (bool): True면 지우지 않고 결과만 계산
+            
+        Returns:
+            tuple: (지운 파일 수, 지운 바이트 수)
+        """
+        alive = set()
+        for path, digest, ext in self._execute('SELECT path, sha256, ext FROM links'):
+            if self._linked(path, self.blob_path(digest, ext)):
+                alive.add(digest)
+            elif not dry_run:
+                self._execute('DELETE FROM links WHERE path = ?', (path,))
+        removed, reclaimed = 0, 0
+        for folder, _, files in os.walk(os.path.join(self.root, 'objects')):
+            for name in files:
+                digest = name.split('.')[0]
+                if digest in alive:
+                    continue
+                blob = os.path.join(folder, name)
+                removed += 1
+                reclaimed += os.path.getsize(blob)
+                if not dry_run:
+                    os.remove(blob)
+                    self._execute('DELETE FROM artifacts WHERE sha256 = ?', (digest,))
+            if not dry_run and folder != os.path.join(self.root, 'objects') and not os.listdir(folder):
+                os.rmdir(folder)
+        return removed, reclaimed
+    
+    def close(self):
+        """저장소 색인을 닫습니다."""
+        with self._lock:
+            self._conn.close()
+
+
+class MediaStoreIngest(NamedPostProcessor, PostProcessor):
+    """받은 결과 파일을 MediaStore에 넣는 yt-dlp 후처리기 클래스
+    
+    저장 폴더로 옮긴 뒤(after_move) 실행되어 파일을 저장소로 옮기고 원래 이름에는
+    링크를 만듭니다.
+    """
+    
+    def __init__(self, downloader, store, job, stage, hasher=None):
+        """
+        Args:
+            downloader (yt_dlp.YoutubeDL): 후처리기를 등록할 YoutubeDL
+            store (MediaStore): 저장소
+            job (DownloadJob): 대상 작업
+            stage (str): 단계 이름
+            hasher (StreamHasher): 받는 동안 해시를 계산한 객체
+        """
+        PostProcessor.__init__(self, downloader)
+        self.store = store
+        self.job = job
+        self.stage = stage
+        self.hasher = hasher
+    
+    def run(self, info):
+        """결과 파일을 저장소에 넣습니다.
+        
+        Args:
+            info (dict): yt-dlp 영상 정보 (filepath, format_id 사용)
+            
+        Returns:
+            tuple: (지울 파일 목록, 영상 정보)
+        """
+        self.store.ingest(self.job, self.stage, info['filepath'], info.get('format_id'), self.hasher)
+        return [], info
+
+
+class ChapterAudioSplitter(NamedPostProcessor, FFmpegPostProcessor):
+    """챕터별 음성 파일을 ffmpeg 한 번으로 만드는 yt-dlp 후처리기 클래스
+    
+    받은 음성 파일을 한 번만 읽고 디코딩한 뒤, 챕터마다 출력 시작 위치와 길이(-ss/-t)를
+    지정한 여러 출력을 같은 ffmpeg 명령으로 만듭니다. mp3로 변환하더라도 전체 파일을
+    한 번만 인코딩하며, 원본 코덱 그대로 저장하면 다시 인코딩하지 않고 스트림을 복사합니다.
+    챕터 정보는 yt-dlp가 이미 가져온 영상 정보의 chapters를 사용하고, 없으면 전체를
+    파일 하나로 저장합니다.
+    """
+    
+    # 원본 음성 코덱별 저장 확장자
+    CODEC_EXTENSIONS = {'opus': 'opus', 'mp4a': 'm4a', 'aac': 'm4a', 'vorbis': 'ogg',
+                        'mp3': 'mp3', 'flac': 'flac'}
+    
+    def __init__(self, downloader=None, passthrough=False, quality='192', record_hashes=False):
+        """
+        Args:
+            downloader (yt_dlp.YoutubeDL): 후처리기를 등록할 YoutubeDL
+            passthrough (bool): True면 원본 코덱 그대로 스트림 복사, False면 mp3로 인코딩
+            quality (str): mp3 비트레이트 (kbps)
+            record_hashes (bool): 만든 파일의 해시를 HashIndex에 기록할지 여부
+        """
+        FFmpegPostProcessor.__init__(self, downloader)
+        self.passthrough = passthrough
+        self.quality = quality
+        self.record_hashes = record_hashes
+    
+    def output_extension(self, info):
+        """저장할 확장자를 반환합니다."""
+        if not self.passthrough:
+            return 'mp3'
+        codec = (info.get('acodec') or '').split('.')[0]
+        return self.CODEC_EXTENSIONS.get(codec, info['ext'])
+    
+    def run(self, info):
+        """받은 음성 파일을 챕터별 파일로 나눕니다.
+        
+        Args:
+            info (dict): yt-dlp 영상 정보 (filepath, chapters 사용)
+            
+        Returns:
+            tuple: (지울 파일 목록, 갱신한 영상 정보)
+        """
+        in_file = info['filepath']
+        base = os.path.splitext(in_file)[0]
+        ext = self.output_extension(info)
+        if self.passthrough:
+            codec_opts = ['-c:a', 'copy']
+        else:
+            codec_opts = ['-c:a', 'libmp3lame', '-b:a', f"{self.quality}k"]
+        
+        # 구간만 받은 파일은 이미 잘린 파일이므로 나누지 않음
+        chapters = [] if info.get('section_start') is not None else info.get('chapters') or []
+        outputs = []
+        for number, chapter in enumerate(chapters, 1):
+            title = chapter.get('title') or f"Chapter {number}"
+            destination = f"{base} - {number:02d} {yt_dlp.utils.sanitize_filename(title)}.{ext}"
+            outputs.append((destination, [
+                '-map', '0:a', '-vn',
+                '-ss', str(chapter['start_time']), '-t', str(chapter['end_time'] - chapter['start_time']),
+                *codec_opts,
+                '-metadata', f"title={title}", '-metadata', f"track={number}/{len(chapters)}",
+            ]))
+        if not outputs:
+            destination = f"{base}.{ext}"
+            if destination == in_file:
+                return [], info
+            outputs.append((destination, ['-map', '0:a', '-vn', *codec_opts]))
+        
+        self.to_screen(f"{len(outputs)}개 파일로 저장합니다 (ffmpeg 1회 실행)")
+        self.real_run_ffmpeg([(in_file, [])], outputs)
+        info['filepath'], info['ext'] = outputs[0][0], ext
+        info['chapter_files'] = [path for path, _ in outputs]
+        if self.record_hashes:
+            # ffmpeg가 쓴 파일은 받는 동안 해시를 계산할 수 없으므로 한 번 읽어 계산
+            for path in info['chapter_files']:
+                HashIndex.record(path, *hash_file(path))
+            HashIndex.discard(in_file)
+        return [in_file], info
+
+
+class DownloadLogger:
+    """yt-dlp 로그를 받아 전송 오류를 집계하는 로거 클래스
+    
+    quiet 모드와 같이 오류만 표준 오류로 출력하고, 재시도, 전송 오류, 조각 건너뜀
+    메시지가 나오면 on_retry 콜백을 호출합니다. yt-dlp는 조각 재시도와 건너뜀을
+    화면 메시지(debug)로, 조각 안의 HTTP 오류를 오류 메시지로 보내므로
+    모든 경로를 확인합니다.
+    """
+    
+    RETRY_PATTERN = re.compile(r'Retrying|Got error|Skipping fragment')
+    
+    def __init__(self, on_retry=None):
+        """
+        Args:
+            on_retry (callable): 재시도 메시지마다 호출되는 함수 (인자 없음)
+        """
+        self.on_retry = on_retry
+    
+    def _count_retry(self, msg):
+        """재시도 또는 전송 오류 메시지이면 on_retry를 호출합니다."""
+        if self.on_retry and self.RETRY_PATTERN.search(msg):
+            self.on_retry()
+    
+    def debug(self, msg):
+        """화면 메시지는 출력하지 않고 재시도만 집계합니다."""
+        self._count_retry(msg)
+    
+    def info(self, msg):
+        """정보 메시지는 출력하지 않습니다."""
+    
+    def warning(self, msg):
+        """경고는 출력하지 않고 재시도만 집계합니다."""
+        self._count_retry(msg)
+    
+    def error(self, msg):
+        """오류 메시지를 표준 오류로 출력합니다."""
+        self._count_retry(msg)
+        print(msg, file=sys.stderr)
+
+
+class JobInterrupted(yt_dlp.utils.DownloadCancelled):
+    """사용자 요청으로 작업이 중단되었을 때 발생하는 예외의 기본 클래스
+    
+    yt-dlp의 DownloadCancelled를 상속하므로 진행률 콜백이나 후처리 콜백에서 발생시키면
+    yt-dlp가 다운로드 오류로 감싸지 않고 그대로 전달합니다.
+    """
+
+
+class JobPaused(JobInterrupted):
+    """작업이 일시 정지되었을 때 발생하는 예외"""
+
+
+class JobCancelled(JobInterrupted):
+    """작업이 취소되었을 때 발생하는 예외"""
+
+
+# 다운로드 작업의 단계 (실행 순서대로)
+JOB_STAGES = ('caption', 'video', 'audio')
+
+# yt-dlp 후처리기 이름별 phase 이벤트의 세부 단계 이름 (없으면 소문자 이름)
+POSTPROCESSOR_PHASES = {
+    'Merger': 'merge',
+    'ExtractAudio': 'encode',
+    'ChapterAudioSplitter': 'encode',
+    'HashingMover': 'move',
+    'MoveFiles': 'move',
+    'MediaStoreIngest': 'store',
+}
+
+# 측정한 속도와 마감에 맞춰 해상도를 고르는 해상도 옵션 값과 그때의 최대 높이
+AUTO_RESOLUTION = '자동'
+AUTO_MAX_HEIGHT = 2160
+
+# 작업 제어 요청과 그때 발생시키는 예외
+JOB_CONTROLS = {'pause': JobPaused, 'cancel': JobCancelled}
+
+# 이어받기용 임시 파일 접미사 (yt-dlp의 .part/.part-FragN/.ytdl, 나눠 받기의 .seg.part/.seg.json)
+PARTIAL_SUFFIXES = ('.part', '.ytdl', '.seg.part', '.seg.json')
+
+# 단계별 표시 이름
+STAGE_LABELS = {'caption': '자막', 'video': '영상', 'audio': '음성'}
+
+# 작업 옵션의 기본값 (GUI의 체크박스/드롭다운과 같은 의미)
+DEFAULT_JOB_OPTIONS = {
+    'caption': True,
+    'video': True,
+    'audio': False,
+    'srt': False,
+    'language': '한국어',
+    'resolution': '2160p',
+    'title': '',
+    'download_path': '',
+    'priority': 0,                # 높을수록 먼저 실행
+    'deadline': None,             # 배치 전체의 마감 시각 (time.time() 기준, 자동 해상도에서 사용)
+    'job_deadline': '',           # 작업별 마감 (영상 단계 시작부터, 예: "30m")
+    'clips': [],                  # 받을 구간 ("1:02:00-1:04:00") 또는 챕터 이름 목록 (비어 있으면 전체)
+    'accurate_cuts': False,       # 구간 경계를 다시 인코딩해 정확히 자를지 여부 (False면 키프레임 단위)
+    'split_chapters': False,      # 음성을 챕터별 파일로 나눌지 여부
+    'audio_passthrough': False,   # 음성을 mp3로 변환하지 않고 원본 코덱 그대로 저장할지 여부
+    'batch': '',                  # 함께 추가한 작업 묶음 (fair 정책의 공평 분배 단위)
+}
+
+
+def extract_video_id(url):
+    """URL에서 YouTube 영상 ID를 추출합니다.
+    
+    Args:
+        url (str): YouTube 영상 URL
+        
+    Returns:
+        str: 영상 ID
+    """
+    # youtu.be/ID, /shorts/ID, /embed/ID, /live/ID 형식
+    match = re.search(r'(?:youtu\.be/|/shorts/|/embed/|/live/)([\w-]{11})', url)
+    if match:
+        return match.group(1)
+    return url.split("v=")[-1].split("&")[0]
+
+
+def parse_clips(clips):
+    """구간 목록을 시간 구간과 챕터 정규식으로 나눕니다.
+    
+    "1:02:00-1:04:00", "90-120", "-30" (마지막 30초가 아니라 처음부터 30초까지),
+    "1:00:00-" (끝까지)처럼 시작과 끝 사이에 '-'를 넣으면 시간 구간, 그 밖의 값은
+    대소문자를 구분하지 않는 챕터 이름 검색어로 처리합니다.
+    
+    Args:
+        clips (list): 구간 문자열 목록
+        
+    Returns:
+        tuple: ((시작, 끝) 초 목록, 챕터 정규식 목록)
+        
+    Raises:
+        ValueError: 시간 형식이 올바르지 않거나 끝이 시작보다 앞선 경우
+    """
+    ranges, chapters = [], []
+    for clip in clips:
+        clip = clip.strip()
+        match = re.fullmatch(r'([\d:.]*)\s*-\s*([\d:.]*)', clip)
+        if not match or not any(match.groups()):
+            if clip:
+                chapters.append('(?i)' + re.escape(clip))
+            continue
+        start_text, end_text = match.groups()
+        start = yt_dlp.utils.parse_duration(start_text) if start_text else 0
+        end = yt_dlp.utils.parse_duration(end_text) if end_text else float('inf')
+        if start is None or end is None or end <= start:
+            raise ValueError(f"잘못된 구간: {clip}")
+        ranges.append((start, end))
+    return ranges, chapters
+
+
+def clip_fraction(info, clips):
+    """받을 구간이 전체 길이에서 차지하는 비율을 계산합니다.
+    
+    Args:
+        info (dict): yt-dlp가 반환한 영상 정보 (duration, chapters 사용)
+        clips (list): 구간 문자열 목록
+        
+    Returns:
+        float: 0-1 사이 비율 (구간이 없거나 길이를 모르면 1)
+    """
+    duration = info.get('duration')
+    if not clips or not duration:
+        return 1.0
+    ranges, chapters = parse_clips(clips)
+    spans = [(max(start, 0), min(end, duration)) for start, end in ranges]
+    for regex in chapters:
+        spans += [(chapter['start_time'], chapter['end_time']) for chapter in info.get('chapters') or []
+                  if re.search(regex, chapter['title'])]
+    seconds = sum(max(end - start, 0) for start, end in spans)
+    return min(seconds / duration, 1.0) or 1.0
+
+
+def validate_job_options(options):
+    """외부에서 받은 작업 옵션을 확인하고 기본값을 채웁니다.
+    
+    작업 API처럼 신뢰할 수 없는 입력을 받을 때 사용합니다. 저장 경로와 배치는
+    서버가 정하므로 받지 않습니다.
+    
+    Args:
+        options (dict): 작업 옵션 (DEFAULT_JOB_OPTIONS의 일부)
+        
+    Returns:
+        dict: 기본값을 채운 작업 옵션
+        
+    Raises:
+        ValueError: 알 수 없는 옵션이거나 값의 형식이 올바르지 않은 경우
+    """
+    if not isinstance(options, dict):
+        raise ValueError("options는 JSON 객체여야 합니다.")
+    unknown = set(options) - (set(DEFAULT_JOB_OPTIONS) - {'download_path', 'batch'})
+    if unknown:
+        raise ValueError(f"알 수 없는 옵션: {', '.join(sorted(unknown))}")
+    options = {**DEFAULT_JOB_OPTIONS, **options}
+    for key, default in DEFAULT_JOB_OPTIONS.items():
+        value = options[key]
+        if key == 'deadline':
+            valid = value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+        elif key == 'clips':
+            valid = isinstance(value, list) and all(isinstance(clip, str) for clip in value)
+        elif isinstance(default, bool):
+            valid = isinstance(value, bool)
+        elif isinstance(default, int):
+            valid = isinstance(value, int) and not isinstance(value, bool)
+        else:
+            valid = isinstance(value, type(default))
+        if not valid:
+            raise ValueError(f"잘못된 옵션 값: {key}={value!r}")
+    if options['resolution'] not in (AUTO_RESOLUTION, '2160p', '1080p', '720p'):
+        raise ValueError(f"잘못된 해상도: {options['resolution']}")
+    if re.search(r'[\\/:*?"<>|]', options['title']):
+        raise ValueError(f"파일명에 쓸 수 없는 문자가 있습니다: {options['title']}")
+    parse_clips(options['clips'])
+    parse_duration(options['job_deadline'])
+    return options
+
+
+class DownloadJob:
+    """다운로드 작업 하나를 나타내는 클래스
+    
+    Attributes:
+        job_id (str): 작업 ID
+        url (str): YouTube 영상 URL
+        video_id (str): YouTube 영상 ID
+        options (dict): 작업 옵션 (DEFAULT_JOB_OPTIONS 참조)
+        title (str): 저장할 파일명 (처음 실행할 때 정해져 저널에 기록됨)
+        state (str): 작업 상태 (queued/running/paused/done/failed/cancelled)
+        stages (dict): 단계별 상태 (running/done/failed)
+        offsets (dict): 단계별 마지막으로 기록된 (.part 경로, 받은 바이트 수)
+        control (str): 처리 대기 중인 제어 요청 ('pause', 'cancel' 또는 None)
+        partial_files (set): 이어받기용 임시 파일이 생길 수 있는 파일 경로 (.part 제외)
+        estimate (int): 남은 영상/음성 단계의 예상 크기 (바이트, 모르면 None)
+        queued_at (float): 영상/음성 대기열에 넣은 시각 (time.monotonic() 기준)
+        started_at (float): 영상/음성 단계를 시작한 시각 (time.time() 기준)
+        clip_fraction (float): 받을 구간이 전체 길이에서 차지하는 비율
+        generation (int): 대기 중에 일시 정지할 때마다 늘어나는 번호 (대기열에 남은
+            이전 항목을 구분하는 데 사용)
+    """
+    
+    def __init__(self, url, options, job_id=None, video_id=None, title=None,
+                 state='queued', stages=None, offsets=None):
+        """
+        Args:
+            url (str): YouTube 영상 URL
+            options (dict): 작업 옵션 (빠진 값은 기본값 사용)
+            job_id (str): 작업 ID (None이면 새로 생성)
+            video_id (str): 영상 ID (None이면 URL에서 추출)
+            title (str): 저장할 파일명
+            state (str): 작업 상태
+            stages (dict): 단계별 상태
+            offsets (dict): 단계별 .part 경로와 받은 바이트 수
+        """
+        self.job_id = job_id or uuid.uuid4().hex[:12]
+        self.url = url
+        self.video_id = video_id or extract_video_id(url)
+        self.options = {**DEFAULT_JOB_OPTIONS, **options}
+        self.title = title
+        self.state = state
+        self.stages = stages or {}
+        self.offsets = offsets or {}
+        self.control = None
+        self.estimate = None
+        self.queued_at = None
+        self.started_at = None
+        self.clip_fraction = 1.0
+        self.generation = 0
+        self.partial_files = {re.sub(r'(\.seg)?\.part$', '', part_path)
+                              for part_path, _ in self.offsets.values()}
+    
+    def selected_stages(self):
+        """선택된 단계를 실행 순서대로 반환합니다.
+        
+        Returns:
+            list: 단계 이름 목록
+        """
+        return [stage for stage in JOB_STAGES if self.options.get(stage)]
+
+
+class JobJournal:
+    """작업과 단계별 진행 상태를 기록하는 SQLite 선행 기록(write-ahead) 저널 클래스
+    
+    작업을 대기열에 넣거나 단계를 시작/완료하기 전에 먼저 저널에 기록합니다.
+    창을 닫거나 프로그램이 비정상 종료되어도 다시 시작하면 완료되지 않은 작업을
+    불러와 끝난 단계는 건너뛰고 이어서 진행합니다. 진행 중인 단계의 .part 경로와
+    받은 바이트 수도 주기적으로 기록합니다.
+    
+    SQLite의 WAL 모드와 자동 커밋을 사용하므로 기록 하나하나가 바로 디스크에 반영되고,
+    기록 도중 종료되어도 저널이 손상되지 않습니다.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            video_id TEXT NOT NULL,
+            title TEXT,
+            options TEXT NOT NULL,
+            state TEXT NOT NULL,
+            error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS stages (
+            job_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            state TEXT NOT NULL,
+            part_path TEXT,
+            downloaded_bytes INTEGER NOT NULL DEFAULT 0,
+            total_bytes INTEGER,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (job_id, stage)
+        );
+        CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, created_at);
+        CREATE TABLE IF NOT EXISTS controls (
+            target TEXT PRIMARY KEY,
+            action TEXT NOT NULL,
+            requested_at REAL NOT NULL
+        );
+    """
+    
+    # 모든 작업을 대상으로 하는 제어 요청의 target 값
+    ALL_JOBS = '*'
+    
+    def __init__(self, path=JOURNAL_FILE):
+        """
+        Args:
+            path (str): 저널 파일 경로
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self.SCHEMA)
+    
+    def _execute(self, sql, params=()):
+        """SQL 문을 실행하고 결과 행 목록을 반환합니다."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+    
+    def add_job(self, job):
+        """새 작업을 기록합니다.
+        
+        공유 작업 저장소에서 실패한 작업을 같은 작업자가 다시 가져오면 같은 작업 ID가 다시
+        기록되므로, 이미 있는 작업은 새 상태로 되돌리고 단계 기록은 그대로 둡니다.
+        
+        Args:
+            job (DownloadJob): 기록할 작업
+        """
+        now = time.time()
+        self._execute(
+            'INSERT INTO jobs (job_id, url, video_id, title, options, state, created_at, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (job_id) DO UPDATE SET options = excluded.options, state = excluded.state, '
+            'error = NULL, updated_at = excluded.updated_at',
+            (job.job_id, job.url, job.video_id, job.title,
+             json.dumps(job.options, ensure_ascii=False), job.state, now, now))
+    
+    def set_job_state(self, job_id, state, error=None):
+        """작업 상태를 기록합니다.
+        
+        Args:
+            job_id (str): 작업 ID
+            state (str): 작업 상태
+            error (str): 오류 메시지
+        """
+        self._execute('UPDATE jobs SET state = ?, error = ?, updated_at = ? WHERE job_id = ?',
+                      (state, error, time.time(), job_id))
+    
+    def set_title(self, job_id, title):
+        """작업의 파일명을 기록합니다. 이어받을 때 같은 .part 파일을 찾는 데 사용됩니다.
+        
+        Args:
+            job_id (str): 작업 ID
+            title (str): 파일명
+        """
+        self._execute('UPDATE jobs SET title = ?, updated_at = ? WHERE job_id = ?',
+                      (title, time.time(), job_id))
+    
+    def set_options(self, job_id, options):
+        """작업 옵션을 기록합니다. 자동으로 고른 해상도처럼 이어받을 때 필요한 값을 남깁니다.
+        
+        Args:
+            job_id (str): 작업 ID
+            options (dict): 작업 옵션
+        """
+        self._execute('UPDATE jobs SET options = ?, updated_at = ? WHERE job_id = ?',
+                      (json.dumps(options, ensure_ascii=False), time.time(), job_id))
+    
+    def set_stage(self, job_id, stage, state):
+        """단계 상태를 기록합니다.
+        
+        Args:
+            job_id (str): 작업 ID
+            stage (str): 단계 이름
+            state (str): 단계 상태 (running/done/failed)
+        """
+        self._execute(
+            'INSERT INTO stages (job_id, stage, state, updated_at) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (job_id, stage) DO UPDATE SET state = excluded.state, '
+            'updated_at = excluded.updated_at',
+            (job_id, stage, state, time.time()))
+    
+    def record_offset(self, job_id, stage, part_path, downloaded, total):
+        """진행 중인 단계의 .part 경로와 받은 바이트 수를 기록합니다.
+        
+        Args:
+            job_id (str): 작업 ID
+            stage (str): 단계 이름
+            part_path (str): .part 파일 경로
+            downloaded (int): 받은 바이트 수
+            total (int): 전체 바이트 수 (모르면 None)
+        """
+        self._execute(
+            'UPDATE stages SET part_path = ?, downloaded_bytes = ?, total_bytes = ?, updated_at = ? '
+            'WHERE job_id = ? AND stage = ?',
+            (part_path, downloaded or 0, total, time.time(), job_id, stage))
+    
+    def incomplete_jobs(self):
+        """완료되지 않은 (대기 중, 실행 중이던, 일시 정지된) 작업을 등록 순서대로 불러옵니다.
+        
+        실행 중이던 작업은 대기 중(queued) 상태로 불러옵니다.
+        
+        Returns:
+            list: DownloadJob 목록
+        """
+        rows = self._execute(
+            "SELECT job_id, url, video_id, title, options, state FROM jobs "
+            "WHERE state IN ('queued', 'running', 'paused') ORDER BY created_at")
+        jobs = []
+        for job_id, url, video_id, title, options, state in rows:
+            stages, offsets = {}, {}
+            for stage, state, part_path, downloaded in self._execute(
+                    'SELECT stage, state, part_path, downloaded_bytes FROM stages WHERE job_id = ?',
+                    (job_id,)):
+                stages[stage] = state
+                if part_path:
+                    offsets[stage] = (part_path, downloaded)
+            jobs.append(DownloadJob(url, json.loads(options), job_id=job_id, video_id=video_id,
+                                    title=title, state='paused' if state == 'paused' else 'queued',
+                                    stages=stages, offsets=offsets))
+        return jobs
+    
+    def list_jobs(self, limit=50):
+        """최근 작업 목록을 불러옵니다.
+        
+        Args:
+            limit (int): 최대 작업 수
+            
+        Returns:
+            list: (작업 ID, 상태, 파일명, URL) 튜플 목록 (최근 등록 순)
+        """
+        return self._execute('SELECT job_id, state, title, url FROM jobs '
+                             'ORDER BY created_at DESC LIMIT ?', (limit,))
+    
+    def get_job(self, job_id):
+        """작업 하나의 기록과 단계별 상태를 불러옵니다.
+        
+        Args:
+            job_id (str): 작업 ID
+            
+        Returns:
+            dict: 작업 정보 ('stages'는 단계 이름 -> {'state', 'downloaded_bytes', 'total_bytes'},
+            없으면 None)
+        """
+        rows = self._execute('SELECT job_id, url, video_id, title, options, state, error, created_at, '
+                             'updated_at FROM jobs WHERE job_id = ?', (job_id,))
+        if not rows:
+            return None
+        keys = ('job_id', 'url', 'video_id', 'title', 'options', 'state', 'error', 'created_at', 'updated_at')
+        job = dict(zip(keys, rows[0]))
+        job['options'] = json.loads(job['options'])
+        job['stages'] = {stage: {'state': state, 'downloaded_bytes': downloaded, 'total_bytes': total}
+                         for stage, state, downloaded, total in self._execute(
+                             'SELECT stage, state, downloaded_bytes, total_bytes FROM stages '
+                             'WHERE job_id = ?', (job_id,))}
+        return job
+    
+    def request_control(self, action, job_id=None):
+        """다른 프로세스에서 실행 중인 엔진에 제어 요청을 남깁니다.
+        
+        같은 대상에 대한 이전 요청은 새 요청으로 바뀝니다.
+        
+        Args:
+            action (str): 'pause', 'resume' 또는 'cancel'
+            job_id (str): 대상 작업 ID (None이면 모든 작업)
+        """
+        self._execute('INSERT OR REPLACE INTO controls (target, action, requested_at) VALUES (?, ?, ?)',
+                      (job_id or self.ALL_JOBS, action, time.time()))
+    
+    def take_controls(self):
+        """남아 있는 제어 요청을 요청 순서대로 꺼내고 지웁니다.
+        
+        Returns:
+            list: (작업 ID 또는 None, 동작) 튜플 목록
+        """
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                rows = self._conn.execute(
+                    'SELECT target, action FROM controls ORDER BY requested_at').fetchall()
+                self._conn.execute('DELETE FROM controls')
+            finally:
+                self._conn.execute('COMMIT')
+        return [(None if target == self.ALL_JOBS else target, action) for target, action in rows]
+    
+    def close(self):
+        """저널 파일을 닫습니다."""
+        with self._lock:
+            self._conn.close()
+
+
+class SharedJobStore:
+    """여러 컴퓨터의 작업자(worker 명령)가 함께 쓰는 SQLite 공유 작업 저장소 클래스
+    
+    공유 볼륨에 있는 파일 하나를 여러 작업자가 열고, 각 작업자는 작업을 임대(lease)로
+    가져갑니다. 가져간 작업자는 임대 시간이 끝나기 전에 계속 갱신(heartbeat)해야 하며,
+    작업자가 멈추거나 연결이 끊겨 임대가 끝나면 다른 작업자가 그 작업을 다시 가져갑니다.
+    실패한 작업도 max_attempts번까지 다른 작업자가 다시 시도합니다.
+    
+    같은 영상은 같은 옵션으로 한 번만 등록되고 (옵션이 다르면 따로 등록), 완료 기록은
+    현재 임대를 가진 작업자만 남길 수 있으므로 임대를 잃은 작업자의 늦은 완료는 무시됩니다.
+    임대를 잃은 작업자는 갱신할 때 이를 알고 작업을 취소합니다.
+    
+    네트워크 파일 시스템에서는 WAL 모드의 공유 메모리를 쓸 수 없으므로 기본 롤백 저널을
+    사용하고, 가져가기와 완료 기록은 BEGIN IMMEDIATE 트랜잭션으로 처리합니다.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS shared_jobs (
+            job_id TEXT PRIMARY KEY,
+            video_id TEXT NOT NULL,
+            job_key TEXT NOT NULL UNIQUE,
+            url TEXT NOT NULL,
+            options TEXT NOT NULL,
+            state TEXT NOT NULL,
+            node TEXT,
+            lease_until REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS shared_jobs_state ON shared_jobs (state, created_at);
+    """
+    
+    def __init__(self, path, lease=30.0, max_attempts=3):
+        """
+        Args:
+            path (str): 공유 저장소 파일 경로
+            lease (float): 임대 시간 (초)
+            max_attempts (int): 작업별 최대 시도 횟수 (임대가 끝난 경우 포함)
+        """
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(self.SCHEMA)
+    
+    @classmethod
+    def from_config(cls, config):
+        """설정 딕셔너리로 저장소를 생성합니다 (job_store가 비어 있으면 None)."""
+        if not config['job_store']:
+            return None
+        return cls(config['job_store'], lease=parse_duration(config['job_lease']),
+                   max_attempts=int(config['job_max_attempts']))
+    
+    def _execute(self, sql, params=()):
+        """SQL 문을 실행하고 결과 행 목록을 반환합니다."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+    
+    @contextlib.contextmanager
+    def _transaction(self):
+        """쓰기 잠금을 먼저 잡는 트랜잭션을 엽니다."""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+    
+    @staticmethod
+    def job_key(video_id, options):
+        """중복 등록을 가리는 작업 키 (영상 ID와 옵션 해시)를 만듭니다."""
+        digest = hashlib.sha256(json.dumps(options, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+        return f"{video_id}:{digest.hexdigest()[:16]}"
+    
+    def add(self, urls, options):
+        """작업을 등록합니다. 같은 옵션으로 이미 등록된 영상은 건너뜁니다.
+        
+        Args:
+            urls (list): YouTube 영상 URL 목록
+            options (dict): 작업 옵션 (저장 경로가 비어 있으면 작업자의 설정값 사용)
+            
+        Returns:
+            tuple: (등록한 작업 ID 목록, 이미 등록되어 건너뛴 URL 목록)
+        """
+        added, skipped = [], []
+        now = time.time()
+        with self._transaction() as conn:
+            for url in urls:
+                job_id = uuid.uuid4().hex[:12]
+                video_id = extract_video_id(url)
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO shared_jobs (job_id, video_id, job_key, url, options, state, '
+                    "created_at, updated_at) VALUES (?, ?, ?, ?, ?, 'queued', ?, ?)",
+                    (job_id, video_id, self.job_key(video_id, options), url,
+                     json.dumps(options, ensure_ascii=False), now, now))
+                if cursor.rowcount:
+                    added.append(job_id)
+                else:
+                    skipped.append(url)
+        return added, skipped
+    
+    def claim(self, node, limit=1):
+        """대기 중이거나 임대가 끝난 작업을 등록 순서대로 가져갑니다.
+        
+        임대가 끝났고 시도 횟수를 다 쓴 작업은 실패로 기록합니다.
+        
+        Args:
+            node (str): 가져가는 작업자 이름
+            limit (int): 가져갈 최대 작업 수
+            
+        Returns:
+            list: (작업 ID, URL, 작업 옵션) 튜플 목록
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE shared_jobs SET state = 'failed', error = ?, updated_at = ? "
+                "WHERE state = 'running' AND lease_until < ? AND attempts >= ?",
+                (f"{self.max_attempts}번 시도하는 동안 임대가 끝났습니다.", now, now, self.max_attempts))
+            rows = conn.execute(
+                "SELECT job_id, url, options FROM shared_jobs "
+                "WHERE state = 'queued' OR (state = 'running' AND lease_until < ?) "
+                "ORDER BY created_at LIMIT ?", (now, limit)).fetchall()
+            for job_id, _, _ in rows:
+                conn.execute(
+                    "UPDATE shared_jobs SET state = 'running', node = ?, lease_until = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                    (node, now + self.lease, now, job_id))
+        return [(job_id, url, json.loads(options)) for job_id, url, options in rows]
+    
+    def reclaim(self, node, job_id):
+        """작업자를 다시 시작했을 때 이전에 가져간 작업을 계속 진행할 수 있는지 확인하고 임대를 다시 받습니다.
+        
+        Args:
+            node (str): 작업자 이름
+            job_id (str): 작업 ID
+            
+        Returns:
+            bool: 이 작업자가 계속 진행해도 되면 True (다른 작업자가 가져갔거나 끝난 작업이면 False)
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE shared_jobs SET state = 'running', node = ?, lease_until = ?, updated_at = ? "
+                "WHERE job_id = ? AND (state = 'queued' OR (state = 'running' AND (node = ? OR lease_until < ?)))",
+                (node, now + self.lease, now, job_id, node, now))
+            return cursor.rowcount > 0
+    
+    def known(self, job_ids):
+        """저장소에 있는 작업 ID만 골라 반환합니다.
+        
+        Args:
+            job_ids (list): 작업 ID 목록
+            
+        Returns:
+            set: 공유 저장소의 작업 ID
+        """
+        job_ids = list(job_ids)
+        if not job_ids:
+            return set()
+        rows = self._execute(f"SELECT job_id FROM shared_jobs WHERE job_id IN ({', '.join('?' * len(job_ids))})",
+                             job_ids)
+        return {job_id for job_id, in rows}
+    
+    def renew(self, node, job_ids):
+        """가져간 작업의 임대를 연장합니다.
+        
+        Args:
+            node (str): 작업자 이름
+            job_ids (list): 작업 ID 목록
+            
+        Returns:
+            set: 임대를 잃은 (다른 작업자가 가져갔거나 끝난) 작업 ID
+        """
+        now = time.time()
+        lost = set()
+        with self._transaction() as conn:
+            for job_id in job_ids:
+                cursor = conn.execute(
+                    "UPDATE shared_jobs SET lease_until = ?, updated_at = ? "
+                    "WHERE job_id = ? AND node = ? AND state = 'running'",
+                    (now + self.lease, now, job_id, node))
+                if not cursor.rowcount:
+                    lost.add(job_id)
+        return lost
+    
+    def finish(self, node, job_id, state, error=None):
+        """작업 결과를 기록합니다. 현재 임대를 가진 작업자의 기록만 반영됩니다.
+        
+        실패한 작업은 시도 횟수가 남아 있으면 다른 작업자가 가져가도록 대기 상태로 돌립니다.
+        
+        Args:
+            node (str): 작업자 이름
+            job_id (str): 작업 ID
+            state (str): 결과 상태 (done/failed/cancelled)
+            error (str): 오류 메시지
+            
+        Returns:
+            bool: 기록했으면 True (임대를 잃은 경우 False)
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE shared_jobs SET state = CASE WHEN ? = 'failed' AND attempts < ? THEN 'queued' ELSE ? END, "
+                "lease_until = NULL, error = ?, updated_at = ? "
+                "WHERE job_id = ? AND node = ? AND state = 'running'",
+                (state, self.max_attempts, state, error, now, job_id, node))
+            return cursor.rowcount > 0
+    
+    def pending(self):
+        """아직 끝나지 않은 (대기 중이거나 진행 중인) 작업 수를 반환합니다."""
+        return self._execute("SELECT COUNT(*) FROM shared_jobs WHERE state IN ('queued', 'running')")[0][0]
+    
+    def stats(self):
+        """상태별 작업 수, 작업자별 완료 수, 여러 번 시도한 작업 수를 반환합니다.
+        
+        Returns:
+            dict: {'jobs': {상태: 수}, 'nodes': {작업자: 완료 수}, 'retried': 수}
+        """
+        return {
+            'jobs': dict(self._execute('SELECT state, COUNT(*) FROM shared_jobs GROUP BY state')),
+            'nodes': dict(self._execute("SELECT node, COUNT(*) FROM shared_jobs WHERE state = 'done' "
+                                        "GROUP BY node")),
+            'retried': self._execute('SELECT COUNT(*) FROM shared_jobs WHERE attempts > 1')[0][0],
+        }
+    
+    def close(self):
+        """저장소 파일을 닫습니다."""
+        with self._lock:
+            self._conn.close()
+
+
+class ClusterWorker:
+    """공유 작업 저장소(SharedJobStore)에서 작업을 가져와 이 컴퓨터의 엔진으로 실행하는 클래스
+    
+    엔진의 빈자리(capacity)에 PREFETCH개를 더한 만큼만 작업을 가져가므로, 작업자를 늘린 만큼
+    남은 작업이 여러 컴퓨터에 고르게 나뉩니다. 가져간 작업은 저장소의 작업 ID를 그대로
+    엔진 작업 ID로 쓰므로, 작업자를 다시 시작하면 저널에 남은 공유 작업 중 임대를 다시 받은
+    작업만 이어서 진행하고 나머지 공유 작업은 취소합니다.
+    """
+    
+    # 엔진 작업자 수보다 더 가져가 둘 작업 수 (자막과 크기 예상을 미리 처리)
+    PREFETCH = 1
+    # 새 작업을 확인하는 간격 (초)
+    POLL_INTERVAL = 1.0
+    
+    def __init__(self, engine, store, node=None):
+        """
+        Args:
+            engine (DownloadEngine): 작업을 실행할 엔진
+            store (SharedJobStore): 공유 작업 저장소
+            node (str): 작업자 이름 (None이면 설정값 또는 컴퓨터 이름)
+        """
+        self.engine = engine
+        self.store = store
+        self.node = node or engine.config['node_id'] or socket.gethostname()
+        self.claimed = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        engine.add_listener(self.handle)
+    
+    def start(self, workers=None):
+        """저널에 남은 공유 작업의 임대를 확인하고 엔진과 작업을 가져오는 스레드를 시작합니다.
+        
+        임대를 다시 받지 못한 공유 작업은 엔진이 이어받기 전에 저널에 취소로 기록합니다.
+        공유 저장소에 없는 작업(창이나 download 명령으로 추가한 작업)은 그대로 이어받습니다.
+        """
+        journal = self.engine.journal
+        for job_id in self.store.known(job.job_id for job in journal.incomplete_jobs()):
+            if self.store.reclaim(self.node, job_id):
+                with self._lock:
+                    self.claimed.add(job_id)
+            else:
+                journal.set_job_state(job_id, 'cancelled', "다른 작업자가 가져간 공유 작업입니다.")
+        self.engine.start(workers=workers)
+        threading.Thread(target=self._loop, daemon=True).start()
+        return self
+    
+    def stop(self):
+        """작업을 더 가져오지 않습니다. 가져간 작업의 임대는 끝날 때 다른 작업자에게 넘어갑니다."""
+        self._stop.set()
+    
+    def idle(self):
+        """이 작업자가 진행 중인 작업이 없고 저장소에도 남은 작업이 없으면 True를 반환합니다."""
+        with self._lock:
+            if self.claimed:
+                return False
+        return self.store.pending() == 0
+    
+    def handle(self, event):
+        """엔진 이벤트 리스너: 가져간 작업이 끝나면 결과를 저장소에 기록합니다."""
+        if event['type'] != 'job' or event['state'] not in ('done', 'failed', 'cancelled'):
+            return
+        with self._lock:
+            if event['job_id'] not in self.claimed:
+                return
+            self.claimed.discard(event['job_id'])
+        job = self.engine.journal.get_job(event['job_id'])
+        if not self.store.finish(self.node, event['job_id'], event['state'], job and job['error']):
+            self.engine.update_status(event['job_id'], "임대를 잃은 작업이므로 결과를 기록하지 않았습니다.")
+    
+    def _loop(self):
+        """임대를 갱신하고 빈자리만큼 작업을 가져오는 스레드 함수"""
+        renew_interval = self.store.lease / 3
+        next_renew = 0.0
+        while not self._stop.wait(min(self.POLL_INTERVAL, renew_interval)):
+            try:
+                if time.monotonic() >= next_renew:
+                    next_renew = time.monotonic() + renew_interval
+                    with self._lock:
+                        claimed = list(self.claimed)
+                    for job_id in self.store.renew(self.node, claimed):
+                        with self._lock:
+                            self.claimed.discard(job_id)
+                        self.engine.update_status(job_id, "다른 작업자가 가져간 작업이므로 취소합니다.")
+                        self.engine.cancel(job_id)
+                free = self.engine.capacity(self.PREFETCH)
+                if free <= 0:
+                    continue
+                for job_id, url, options in self.store.claim(self.node, free):
+                    with self._lock:
+                        self.claimed.add(job_id)
+                    self.engine.submit(url, options, job_id=job_id)
+            except sqlite3.Error as e:
+                # 공유 볼륨이 잠시 응답하지 않으면 다음 주기에 다시 시도 (임대가 끝나기 전이면 유지됨)
+                self.engine.update_status(None, f"공유 작업 저장소 오류: {e}")
+
+
+class SubscriptionStore:
+    """채널/재생목록 구독과 구독별로 이미 본 영상 ID를 기록하는 SQLite 저장소 클래스
+    
+    구독마다 마지막으로 본 가장 새 영상 ID(cursor)와 지금까지 대기열에 넣은 영상 ID를
+    기록합니다. sync는 이 기록으로 새 영상만 골라 대기열에 넣습니다.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS subscriptions (
+            url TEXT PRIMARY KEY,
+            options TEXT NOT NULL,
+            newest_first INTEGER NOT NULL,
+            backfill INTEGER,
+            cursor TEXT,
+            last_new INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            added_at REAL NOT NULL,
+            synced_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS seen (
+            url TEXT NOT NULL,
+            video_id TEXT NOT NULL,
+            seen_at REAL NOT NULL,
+            PRIMARY KEY (url, video_id)
+        );
+    """
+    
+    def __init__(self, path=SUBSCRIPTION_FILE):
+        """
+        Args:
+            path (str): 구독 저장소 파일 경로
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(self.SCHEMA)
+    
+    def _execute(self, sql, params=()):
+        """SQL 문을 실행하고 결과 행 목록을 반환합니다."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+    
+    def add(self, url, options, newest_first, backfill=None):
+        """구독을 추가합니다. 이미 있는 구독은 옵션만 바꾸고 기록은 유지합니다.
+        
+        Args:
+            url (str): 채널 또는 재생목록 URL
+            options (dict): 새 영상에 사용할 작업 옵션
+            newest_first (bool): 목록이 최신순이라 아는 영상에서 목록 조회를 멈출 수 있는지 여부
+            backfill (int): 처음 동기화할 때 받을 최신 영상 수 (None이면 전체)
+        """
+        self._execute(
+            'INSERT INTO subscriptions (url, options, newest_first, backfill, added_at) VALUES (?, ?, ?, ?, ?) '
+            'ON CONFLICT (url) DO UPDATE SET options = excluded.options, '
+            'newest_first = excluded.newest_first, backfill = excluded.backfill',
+            (url, json.dumps(options, ensure_ascii=False), int(newest_first), backfill, time.time()))
+    
+    def remove(self, url):
+        """구독과 본 영상 기록을 지웁니다.
+        
+        Returns:
+            bool: 구독이 있었으면 True
+        """
+        with self._lock:
+            self._conn.execute('DELETE FROM seen WHERE url = ?', (url,))
+            return self._conn.execute('DELETE FROM subscriptions WHERE url = ?', (url,)).rowcount > 0
+    
+    def subscriptions(self):
+        """구독 목록을 추가한 순서대로 반환합니다.
+        
+        Returns:
+            list: 구독 정보 딕셔너리 목록
+        """
+        keys = ('url', 'options', 'newest_first', 'backfill', 'cursor', 'last_new', 'error', 'synced_at')
+        rows = self._execute(f"SELECT {', '.join(keys)} FROM subscriptions ORDER BY added_at")
+        subscriptions = []
+        for row in rows:
+            subscription = dict(zip(keys, row))
+            subscription['options'] = json.loads(subscription['options'])
+            subscription['newest_first'] = bool(subscription['newest_first'])
+            subscriptions.append(subscription)
+        return subscriptions
+    
+    def seen_ids(self, url):
+        """구독에서 이미 본 영상 ID를 반환합니다."""
+        return {video_id for video_id, in self._execute('SELECT video_id FROM seen WHERE url = ?', (url,))}
+    
+    def mark_seen(self, url, video_ids, cursor, new_count):
+        """동기화 결과를 기록합니다.
+        
+        Args:
+            url (str): 구독 URL
+            video_ids (list): 본 영상 ID 목록 (대기열에 넣었거나 건너뛴 영상)
+            cursor (str): 가장 새 영상 ID (None이면 바꾸지 않음)
+            new_count (int): 대기열에 넣은 영상 수
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany('INSERT OR IGNORE INTO seen (url, video_id, seen_at) VALUES (?, ?, ?)',
+                                       [(url, video_id, now) for video_id in video_ids])
+                self._conn.execute(
+                    'UPDATE subscriptions SET cursor = COALESCE(?, cursor), last_new = ?, error = NULL, '
+                    'synced_at = ? WHERE url = ?', (cursor, new_count, now, url))
+            finally:
+                self._conn.execute('COMMIT')
+    
+    def record_error(self, url, error):
+        """동기화 오류를 기록합니다."""
+        self._execute('UPDATE subscriptions SET error = ?, synced_at = ? WHERE url = ?',
+                      (error, time.time(), url))
+    
+    def close(self):
+        """저장소 파일을 닫습니다."""
+        with self._lock:
+            self._conn.close()
+
+
+def subscription_url(url):
+    """구독 URL을 정리하고 목록이 최신순인지 판단합니다.
+    
+    탭 없이 입력한 채널 주소는 업로드 목록(/videos)으로 바꿉니다. 업로드 탭(/videos,
+    /shorts, /streams)과 업로드 재생목록(UU...)은 최신순이므로 아는 영상에 닿으면 목록
+    조회를 멈출 수 있지만, 일반 재생목록과 다른 채널 탭(/playlists 등)은 순서를 알 수
+    없으므로 매번 전체 목록을 확인합니다.
+    
+    Args:
+        url (str): 채널 또는 재생목록 URL
+        
+    Returns:
+        tuple: (정리한 URL, 최신순 여부)
+    """
+    url = url.strip()
+    if re.fullmatch(r'https?://(?:www\.|m\.)?youtube\.com/(?:@[^/?#]+|(?:channel|c|user)/[^/?#]+)/?', url):
+        url = url.rstrip('/') + '/videos'
+    newest_first = bool(re.search(r'youtube\.com/(?:@[^/?#]+|(?:channel|c|user)/[^/?#]+)'
+                                  r'/(?:videos|shorts|streams)/?(?:[?#]|$)', url)
+                        or re.search(r'[?&]list=UU', url))
+    return url, newest_first
+
+
+class ChannelSync:
+    """구독한 채널/재생목록에서 새 영상만 찾는 클래스
+    
+    yt-dlp로 목록을 평면(flat) 조회하면 영상 정보 없이 ID만 받고, 다음 페이지는
+    항목을 끝까지 읽을 때만 요청합니다. 최신순 목록에서는 지난 동기화의 가장 새
+    영상(cursor)에 닿거나, 그 영상이 지워졌더라도 이미 본 영상이 KNOWN_STOP개 연속으로
+    나오면 조회를 멈추므로, 새 영상이 몇 개 없는 채널은 보통 첫 페이지 요청 몇 번으로
+    끝납니다. 예정/진행 중인 방송은 끝난 뒤 다시 확인하도록
+    본 영상으로 기록하지 않습니다.
+    """
+    
+    # 최신순 목록에서 조회를 멈출 연속된 이미 본 영상 수 (고정 영상이나 순서가 바뀐 영상 대비)
+    KNOWN_STOP = 3
+    
+    def __init__(self, store, config, extractors=()):
+        """
+        Args:
+            store (SubscriptionStore): 구독 저장소
+            config (dict): 설정 (http_proxy, host_concurrency 사용)
+            extractors (list): yt-dlp 기본 추출기보다 먼저 시도할 추출기 클래스
+        """
+        self.store = store
+        self.config = config
+        self.extractors = list(extractors)
+    
+    def list_new(self, subscription):
+        """구독의 새 영상을 찾습니다.
+        
+        Args:
+            subscription (dict): SubscriptionStore.subscriptions()의 항목
+            
+        Returns:
+            dict: {'url', 'new': [(영상 ID, URL)], 'skipped': [영상 ID], 'cursor', 'listed', 'requests'}
+            ('skipped'는 처음 동기화할 때 backfill 밖이라 받지 않고 본 것으로 기록할 영상)
+        """
+        url = subscription['url']
+        newest_first = subscription['newest_first']
+        known = self.store.seen_ids(url)
+        backfill = subscription['backfill'] if subscription['cursor'] is None else None
+        stop_after = min(self.KNOWN_STOP, len(known))
+        requests_made = 0
+        ydl_opts = {
+            'proxy': self.config['http_proxy'] or None,
+            'logger': DownloadLogger(),
+            'quiet': True,
+            'extract_flat': 'in_playlist',
+        }
+        new, listed, cursor, known_run = [], 0, None, 0
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            urlopen = ydl.urlopen
+            
+            def counted_urlopen(*args, **kwargs):
+                nonlocal requests_made
+                requests_made += 1
+                return urlopen(*args, **kwargs)
+            
+            ydl.urlopen = counted_urlopen
+            ie_key = None
+            for extractor in self.extractors:
+                if extractor.suitable(url):
+                    ydl.add_info_extractor(extractor())
+                    ie_key = extractor.ie_key()
+                    break
+            info = ydl.extract_info(url, download=False, process=False, ie_key=ie_key)
+            while info.get('_type') in ('url', 'url_transparent'):
+                info = ydl.extract_info(info['url'], download=False, process=False, ie_key=info.get('ie_key'))
+            # entries는 페이지를 필요할 때 요청하는 생성기일 수 있으므로 끝까지 읽지 않고 멈춤
+            for entry in info.get('entries') or []:
+                listed += 1
+                video_id = entry and entry.get('id')
+                if not video_id or entry.get('_type') == 'playlist':
+                    continue
+                if entry.get('live_status') in ('is_live', 'is_upcoming') and video_id not in known:
+                    # 끝난 뒤 다시 확인해야 하므로 cursor로도 쓰지 않음
+                    known_run = 0
+                    continue
+                if cursor is None or not newest_first:
+                    cursor = video_id
+                if newest_first and video_id == subscription['cursor']:
+                    # 지난 동기화의 가장 새 영상: 그 뒤는 모두 이미 본 영상
+                    break
+                if video_id in known:
+                    known_run += 1
+                    if newest_first and stop_after and known_run >= stop_after:
+                        break
+                    continue
+                known_run = 0
+                known.add(video_id)
+                new.append((video_id, entry.get('url') or f"https://www.youtube.com/watch?v={video_id}"))
+                if newest_first and backfill is not None and len(new) >= backfill:
+                    break
+        skipped = []
+        if backfill is not None and len(new) > backfill:
+            # 최신순이 아닌 목록은 뒤쪽 항목을 새 영상으로 보고 나머지는 본 것으로만 기록
+            skipped = [video_id for video_id, _ in new[:len(new) - backfill]]
+            new = new[len(new) - backfill:]
+        return {'url': url, 'new': new, 'skipped': skipped, 'cursor': cursor, 'listed': listed,
+                'requests': requests_made}
+    
+    def run(self, subscriptions=None):
+        """구독 목록의 새 영상을 host_concurrency개씩 함께 찾습니다.
+        
+        한 구독의 오류는 기록만 하고 나머지 구독은 계속 확인합니다.
+        
+        Args:
+            subscriptions (list): 확인할 구독 (None이면 전체)
+            
+        Returns:
+            list: 구독 순서대로 list_new() 결과 (오류가 나면 {'url', 'error'})
+        """
+        if subscriptions is None:
+            subscriptions = self.store.subscriptions()
+        
+        def safe_list(subscription):
+            try:
+                return self.list_new(subscription)
+            except Exception as e:
+                self.store.record_error(subscription['url'], str(e))
+                return {'url': subscription['url'], 'error': str(e)}
+        
+        with ThreadPoolExecutor(max_workers=max(1, int(self.config['host_concurrency']))) as executor:
+            return list(executor.map(safe_list, subscriptions))
+
+
+def percentile(values, q):
+    """값 목록의 백분위수를 최근접 순위 방식으로 계산합니다.
+    
+    Args:
+        values (list): 숫자 목록
+        q (float): 백분위 (0-100)
+        
+    Returns:
+        float: 백분위수 (값이 없으면 None)
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def existing_dir(path):
+    """경로 중 실제로 있는 가장 가까운 상위 폴더를 반환합니다.
+    
+    Args:
+        path (str): 폴더 경로 (아직 만들어지지 않았을 수 있음)
+        
+    Returns:
+        str: 있는 폴더 경로
+    """
+    path = os.path.abspath(path)
+    while not os.path.isdir(path) and os.path.dirname(path) != path:
+        path = os.path.dirname(path)
+    return path
+
+
+def volume_id(path):
+    """경로가 속한 볼륨을 구분하는 값을 반환합니다.
+    
+    Args:
+        path (str): 폴더 경로
+        
+    Returns:
+        int: 볼륨(장치) 번호
+    """
+    return os.stat(existing_dir(path)).st_dev
+
+
+def disk_free(path):
+    """경로가 속한 볼륨의 여유 공간을 반환합니다.
+    
+    Args:
+        path (str): 폴더 경로
+        
+    Returns:
+        int: 여유 공간 (바이트)
+    """
+    return shutil.disk_usage(existing_dir(path)).free
+
+
+def video_quality(fmt):
+    """형식의 영상 품질을 비교할 수 있는 값으로 반환합니다.
+    
+    코덱은 계열만 비교합니다 (avc1.64001F와 avc1.4D401E는 같은 계열).
+    
+    Args:
+        fmt (dict): yt-dlp 형식 정보
+        
+    Returns:
+        tuple: (높이, 프레임 수, 코덱 계열)
+    """
+    codec = (fmt.get('vcodec') or 'none').split('.')[0].lower()
+    codec = {'h264': 'avc1', 'vp09': 'vp9', 'hevc': 'hvc1', 'hev1': 'hvc1'}.get(codec, codec)
+    return (fmt.get('height') or 0, round(fmt.get('fps') or 0), codec)
+
+
+def format_size(info):
+    """yt-dlp가 선택한 형식의 예상 크기를 계산합니다.
+    
+    영상과 음성을 따로 받아 합치는 경우 두 형식의 크기를 더합니다. filesize가 없으면
+    yt-dlp가 비트레이트와 길이로 계산한 filesize_approx를 사용합니다.
+    
+    Args:
+        info (dict): extract_info(download=False)가 반환한 정보
+        
+    Returns:
+        int: 예상 크기 (바이트, 알 수 없으면 None)
+    """
+    total = 0
+    for fmt in info.get('requested_formats') or [info]:
+        size = fmt.get('filesize') or fmt.get('filesize_approx')
+        if not size:
+            return None
+        total += int(size)
+    return total
+
+
+class MetadataCache:
+    """yt-dlp로 조회한 영상 메타데이터를 SQLite 파일에 보관하는 캐시 클래스
+    
+    형식을 고르기 전 단계(extract_info(process=False))의 결과를 저장하므로, 준비 단계의
+    크기 예상, 다운로드 단계, plan 명령이 같은 영상의 페이지를 다시 조회하지 않고
+    각자 형식을 고를 수 있습니다. 형식 URL은 몇 시간 뒤 만료되므로 ttl이 지난 항목은
+    다시 조회합니다. 같은 키를 여러 스레드가 동시에 요청하면 한 번만 조회합니다.
+    
+    Attributes:
+        ttl (float): 캐시 유지 시간 (초, 0이면 저장하지 않음)
+        stats (Counter): 적중(hits)/조회(misses) 횟수
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS metadata (
+            key TEXT PRIMARY KEY,
+            fetched_at REAL NOT NULL,
+            info BLOB NOT NULL
+        );
+    """
+    
+    def __init__(self, path=METADATA_CACHE_FILE, ttl=3600.0):
+        """
+        Args:
+            path (str): 캐시 파일 경로
+            ttl (float): 캐시 유지 시간 (초)
+        """
+        self.ttl = ttl
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(self.SCHEMA)
+    
+    @classmethod
+    def from_config(cls, config):
+        """설정 딕셔너리로 캐시를 생성합니다."""
+        return cls(ttl=parse_duration(config['metadata_cache_ttl']))
+    
+    def _key_lock(self, key):
+        """키별 조회 잠금을 반환합니다."""
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+    
+    def get(self, key, fetch):
+        """캐시된 메타데이터를 반환하고, 없거나 만료되었으면 fetch로 조회해 저장합니다.
+        
+        Args:
+            key (str): 캐시 키 (영상 ID 또는 URL)
+            fetch (callable): 메타데이터를 조회하는 함수 (인자 없음, JSON으로 저장할 수 있는 dict 반환)
+            
+        Returns:
+            dict: 메타데이터 (호출할 때마다 새로 만든 dict이므로 수정해도 됨)
+        """
+        with self._key_lock(key):
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT info FROM metadata WHERE key = ? AND fetched_at >= ?',
+                    (key, time.time() - self.ttl)).fetchone()
+            if row:
+                self.stats['hits'] += 1
+                return json.loads(zlib.decompress(row[0]))
+            self.stats['misses'] += 1
+            info = fetch()
+            if self.ttl:
+                now = time.time()
+                with self._lock:
+                    self._conn.execute('DELETE FROM metadata WHERE fetched_at < ?', (now - self.ttl,))
+                    self._conn.execute(
+                        'INSERT OR REPLACE INTO metadata (key, fetched_at, info) VALUES (?, ?, ?)',
+                        (key, now, zlib.compress(json.dumps(info).encode('utf-8'))))
+            return info
+    
+    def invalidate(self, key):
+        """키의 캐시 항목을 지웁니다 (형식 URL이 만료된 것으로 보이는 경우 등)."""
+        with self._lock:
+            self._conn.execute('DELETE FROM metadata WHERE key = ?', (key,))
+    
+    def close(self):
+        """캐시 파일을 닫습니다."""
+        with self._lock:
+            self._conn.close()
+
+
+class ReplayMissing(LookupError):
+    """재생 모드에서 기록에 없는 응답을 요청한 경우 발생하는 예외"""
+
+
+class ReplayedError(RuntimeError):
+    """기록할 때 실패했던 응답을 재생하면 발생하는 예외 (원래 예외 메시지를 그대로 담음)"""
+
+
+class ResponseArchive:
+    """메타데이터, 제목, 자막 응답을 기록하고 재생하는 SQLite 보관 파일 클래스
+    
+    record 모드에서는 실제로 조회한 응답(또는 실패한 경우 예외 메시지)과 걸린 시간을
+    종류와 키(영상 ID 등)별로 zlib으로 압축해 저장합니다. replay 모드에서는 네트워크에
+    요청하지 않고 저장한 응답을 같은 코드 경로로 돌려주며, 실패를 기록한 응답은
+    ReplayedError로 다시 발생시킵니다. delay를 지정하면 기록한 시간에 그 배율을 곱한
+    만큼 기다려 느린 응답도 재현할 수 있습니다 (0이면 기다리지 않음).
+    
+    미디어 파일은 기록하지 않으므로 재생 모드로 영상/음성을 받으면 기록된 형식 URL로
+    실제 다운로드를 시도합니다.
+    
+    Attributes:
+        mode (str): 'record' 또는 'replay'
+        stats (Counter): 기록(recorded), 재생(replayed), 누락(missing) 횟수
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            recorded_at REAL NOT NULL,
+            elapsed REAL NOT NULL,
+            ok INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (kind, key)
+        );
+    """
+    
+    def __init__(self, path, mode='replay', delay=0.0):
+        """
+        Args:
+            path (str): 보관 파일 경로
+            mode (str): 'record' 또는 'replay'
+            delay (float): 재생할 때 기록한 응답 시간에 곱할 배율
+        """
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"알 수 없는 보관 모드입니다: {mode}")
+        if mode == 'replay' and not os.path.exists(path):
+            raise ValueError(f"응답 보관 파일이 없습니다: {path}")
+        self.mode = mode
+        self.delay = delay
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(self.SCHEMA)
+    
+    @classmethod
+    def from_config(cls, config):
+        """설정 딕셔너리로 보관 파일을 엽니다 (사용하지 않으면 None)."""
+        if not config['response_archive']:
+            return None
+        return cls(config['response_archive'], mode=config['response_archive_mode'],
+                   delay=float(config['replay_delay']))
+    
+    def call(self, kind, key, fetch):
+        """record 모드에서는 fetch를 실행해 결과를 기록하고, replay 모드에서는 기록을 돌려줍니다.
+        
+        Args:
+            kind (str): 응답 종류 ('metadata', 'title', 'transcripts', 'transcript')
+            key (str): 응답 키
+            fetch (callable): 실제로 조회하는 함수 (인자 없음, JSON으로 저장할 수 있는 값 반환)
+            
+        Returns:
+            fetch의 반환값 또는 기록한 값
+            
+        Raises:
+            ReplayMissing: 재생 모드에서 기록이 없는 경우
+            ReplayedError: 기록할 때 실패한 응답을 재생한 경우
+        """
+        if self.mode == 'replay':
+            return self._replay(kind, key)
+        started = time.monotonic()
+        try:
+            result = fetch()
+        except JobInterrupted:
+            raise
+        except Exception as e:
+            self._store(kind, key, time.monotonic() - started, False, str(e))
+            raise
+        self._store(kind, key, time.monotonic() - started, True, result)
+        return result
+    
+    def _store(self, kind, key, elapsed, ok, data):
+        """응답 하나를 저장합니다."""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (kind, key, recorded_at, elapsed, ok, data) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (kind, key, time.time(), elapsed, int(ok), zlib.compress(json.dumps(data).encode('utf-8'))))
+            self.stats['recorded'] += 1
+    
+    def _replay(self, kind, key):
+        """저장한 응답을 돌려줍니다."""
+        with self._lock:
+            row = self._conn.execute('SELECT elapsed, ok, data FROM responses WHERE kind = ? AND key = ?',
+                                     (kind, key)).fetchone()
+            self.stats['replayed' if row else 'missing'] += 1
+        if row is None:
+            raise ReplayMissing(f"기록에 없는 응답입니다: {kind} {key}")
+        elapsed, ok, data = row
+        if self.delay:
+            time.sleep(elapsed * self.delay)
+        data = json.loads(zlib.decompress(data))
+        if not ok:
+            raise ReplayedError(data)
+        return data
+    
+    def video_ids(self):
+        """메타데이터를 기록한 영상 ID 목록을 반환합니다 (기록한 순서)."""
+        with self._lock:
+            return [key for key, in self._conn.execute(
+                "SELECT key FROM responses WHERE kind = 'metadata' ORDER BY recorded_at")]
+    
+    def close(self):
+        """보관 파일을 닫습니다."""
+        with self._lock:
+            self._conn.close()
+
+
+class ArchivedTranscript:
+    """ArchivedTranscriptApi가 돌려주는 언어별 자막 (youtube-transcript-api의 Transcript 대신 사용)"""
+    
+    def __init__(self, archive, video_id, language_code, is_generated, source=None):
+        """
+        Args:
+            archive (ResponseArchive): 응답 보관 파일
+            video_id (str): 영상 ID
+            language_code (str): 언어 코드
+            is_generated (bool): 자동 생성 자막 여부
+            source: 기록 모드에서 실제로 본문을 받을 youtube-transcript-api의 Transcript
+        """
+        self.archive = archive
+        self.video_id = video_id
+        self.language_code = language_code
+        self.is_generated = is_generated
+        self.source = source
+        self._data = None
+    
+    def fetch(self):
+        """자막 본문을 받거나 기록에서 읽습니다."""
+        key = f"{self.video_id}:{self.language_code}:{'auto' if self.is_generated else 'manual'}"
+        self._data = self.archive.call('transcript', key, lambda: self.source.fetch().to_raw_data())
+        return self
+    
+    def to_raw_data(self):
+        """자막 줄 목록을 반환합니다."""
+        return self._data
+
+
+class ArchivedTranscriptList:
+    """ArchivedTranscriptApi.list()가 돌려주는 자막 목록"""
+    
+    def __init__(self, archive, video_id, entries, sources):
+        self.archive = archive
+        self.video_id = video_id
+        self.entries = entries
+        self.sources = sources
+    
+    def _find(self, language_codes, kinds):
+        for code in language_codes:
+            for generated in kinds:
+                if {'language_code': code, 'is_generated': generated} in self.entries:
+                    return ArchivedTranscript(self.archive, self.video_id, code, generated,
+                                              self.sources.get((code, generated)))
+        raise LookupError(f"자막이 없습니다: {language_codes}")
+    
+    def find_transcript(self, language_codes):
+        """요청한 언어 중 처음으로 있는 자막을 반환합니다 (직접 만든 자막 우선)."""
+        return self._find(language_codes, (False, True))
+    
+    def find_generated_transcript(self, language_codes):
+        """요청한 언어 중 처음으로 있는 자동 생성 자막을 반환합니다."""
+        return self._find(language_codes, (True,))
+
+
+class ArchivedTranscriptApi:
+    """자막 목록과 본문 응답을 ResponseArchive로 기록하거나 재생하는 자막 API 클래스
+    
+    엔진의 transcript_api를 감싸 같은 list()/find_transcript()/fetch() 경로로 사용합니다.
+    """
+    
+    def __init__(self, api, archive):
+        """
+        Args:
+            api: 실제 자막 API (YouTubeTranscriptApi, 재생 모드에서는 사용하지 않음)
+            archive (ResponseArchive): 응답 보관 파일
+        """
+        self.api = api
+        self.archive = archive
+    
+    def list(self, video_id):
+        """영상의 자막 목록을 조회하거나 기록에서 읽습니다."""
+        sources = {}
+        
+        def fetch():
+            for transcript in self.api.list(video_id):
+                sources[(transcript.language_code, transcript.is_generated)] = transcript
+            return [{'language_code': code, 'is_generated': generated} for code, generated in sources]
+        
+        entries = self.archive.call('transcripts', video_id, fetch)
+        return ArchivedTranscriptList(self.archive, video_id, entries, sources)
+
+
+def caption_availability(info):
+    """메타데이터의 자막 목록으로 언어별 자막 종류를 정리합니다.
+    
+    자동 생성 자막은 영상 원래 언어의 자막("<언어>-orig")만 있는 것으로 봅니다
+    (나머지는 자동 번역 자막).
+    
+    Args:
+        info (dict): yt-dlp 메타데이터
+        
+    Returns:
+        dict: 언어 코드 -> 'manual' 또는 'auto'
+    """
+    languages = {}
+    for lang in info.get('automatic_captions') or {}:
+        if lang.endswith('-orig'):
+            languages[lang[:-len('-orig')]] = 'auto'
+    for lang in info.get('subtitles') or {}:
+        if lang != 'live_chat':
+            languages[lang] = 'manual'
+    return dict(sorted(languages.items()))
+
+
+class PhaseLog:
+    """엔진의 단계별 소요 시간 이벤트(type='phase')를 JSON 줄로 기록하는 회전 로그 클래스
+    
+    엔진 리스너로 등록해 사용합니다. 파일이 max_bytes를 넘으면 .1, .2, ...로 옮기고
+    새 파일에 기록합니다. read()와 summarize()로 단계별 백분위수를 계산합니다.
+    
+    이벤트 예:
+        {"type": "phase", "job_id": ..., "video_id": ..., "stage": "video",
+         "phase": "transfer", "seconds": 12.3, "outcome": "ok", "bytes": 104857600, "time": ...}
+    """
+    
+    def __init__(self, path=PHASE_LOG_FILE, max_bytes=5 * 1024 * 1024, backups=3):
+        """
+        Args:
+            path (str): 로그 파일 경로
+            max_bytes (int): 로그 파일을 바꿔 쓰는 크기
+            backups (int): 보관할 이전 로그 파일 수
+        """
+        self.path = path
+        self.logger = logging.getLogger(f"youtube_downloader.phases.{os.path.abspath(path)}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if not self.logger.handlers:
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self.logger.addHandler(handler)
+    
+    @classmethod
+    def from_config(cls, config):
+        """설정 딕셔너리로 로그를 생성합니다 (기록하지 않으면 None)."""
+        if not config['phase_log']:
+            return None
+        return cls(config['phase_log'], max_bytes=int(parse_rate(config['phase_log_max_size'])),
+                   backups=int(config['phase_log_backups']))
+    
+    def handle(self, event):
+        """엔진 이벤트 중 phase 이벤트를 기록합니다."""
+        if event['type'] == 'phase':
+            self.logger.info(json.dumps(event, ensure_ascii=False))
+    
+    @staticmethod
+    def read(path):
+        """로그 파일과 이전 로그 파일의 이벤트를 오래된 순서로 읽습니다.
+        
+        Args:
+            path (str): 로그 파일 경로
+            
+        Returns:
+            list: 이벤트 딕셔너리 목록
+        """
+        backups = sorted(glob.glob(glob.escape(path) + '.*'),
+                         key=lambda name: int(name.rsplit('.', 1)[1]) if name.rsplit('.', 1)[1].isdigit() else 0,
+                         reverse=True)
+        events = []
+        for name in backups + [path]:
+            try:
+                with open(name, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            events.append(json.loads(line))
+                        except ValueError:
+                            continue
+            except OSError:
+                continue
+        return events
+    
+    @staticmethod
+    def summarize(events):
+        """단계별 횟수, 오류 수, 소요 시간 백분위수, 바이트 합계를 계산합니다.
+        
+        Args:
+            events (list): phase 이벤트 목록
+            
+        Returns:
+            dict: 단계 이름 -> 요약 (전체 소요 시간이 긴 단계부터)
+        """
+        phases = {}
+        for event in events:
+            phases.setdefault(event['phase'], []).append(event)
+        summary = {}
+        for phase, items in phases.items():
+            seconds = [item['seconds'] for item in items]
+            summary[phase] = {
+                'count': len(items),
+                'errors': sum(1 for item in items if item['outcome'] == 'error'),
+                'p50': round(percentile(seconds, 50), 3),
+                'p95': round(percentile(seconds, 95), 3),
+                'max': round(max(seconds), 3),
+                'total': round(sum(seconds), 3),
+                'bytes': sum(item.get('bytes') or 0 for item in items),
+            }
+        return dict(sorted(summary.items(), key=lambda item: item[1]['total'], reverse=True))
+
+
+class MetricsRegistry:
+    """다운로드 엔진의 카운터와 히스토그램을 모아 Prometheus 텍스트 형식으로 만드는 클래스
+    
+    값은 스레드마다 따로 둔 Counter에 잠금 없이 더하고, 지표를 읽을 때만 모든 스레드의
+    값을 합칩니다. 그래서 진행률 콜백처럼 자주 호출되는 경로에서도 부담 없이 기록할 수
+    있습니다. 히스토그램은 관측값이 들어간 구간의 횟수만 세고 출력할 때 누적합니다.
+    
+    큐 길이, 실행 중인 작업 수, 속도처럼 현재 값을 나타내는 게이지는 저장하지 않고
+    render()에 넘겨받아 함께 출력합니다.
+    """
+    
+    # 지표 이름 앞에 붙이는 접두어
+    PREFIX = 'ytdl_'
+    # 소요 시간 히스토그램 구간 (초)
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+    # 지표 이름 -> (형식, 설명)
+    METRICS = {
+        'queue_depth': ('gauge', "대기열별 대기 중인 작업 수"),
+        'workers': ('gauge', "작업자 스레드 수"),
+        'active_jobs': ('gauge', "영상/음성 단계를 실행 중인 작업 수"),
+        'bytes_per_second': ('gauge', "최근 10초 동안의 전체 수신 속도"),
+        'job_bytes_per_second': ('gauge', "최근 10초 동안의 작업별 수신 속도"),
+        'reserved_bytes': ('gauge', "디스크 사전 확인으로 예약한 공간"),
+        'downloaded_bytes_total': ('counter', "받은 바이트 수"),
+        'phase_seconds': ('histogram', "세부 단계별 소요 시간"),
+        'phases_total': ('counter', "세부 단계별 결과 횟수"),
+        'jobs_total': ('counter', "끝난 상태별 작업 수"),
+        'job_errors_total': ('counter', "작업 실패의 오류 형식별 횟수"),
+        'requests_total': ('counter', "요청 관리자를 거친 HTTP 요청 수"),
+        'transfers_total': ('counter', "요청 관리자의 서킷 브레이커만 거친 미디어 전송 수"),
+        'request_retries_total': ('counter', "요청 재시도 횟수"),
+        'request_errors_total': ('counter', "재시도한 요청의 상태 코드 또는 예외 형식별 횟수"),
+        'request_gave_up_total': ('counter', "재시도를 모두 소진한 요청 수"),
+        'circuit_opened_total': ('counter', "서킷 브레이커가 열린 횟수"),
+        'fragment_retries_total': ('counter', "조각 다운로드 재시도 횟수"),
+        'cache_requests_total': ('counter', "캐시별 적중/미적중 횟수"),
+    }
+    
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+    
+    def _shard(self):
+        """현재 스레드의 Counter를 반환합니다 (처음이면 만들어 등록)."""
+        shard = getattr(self._local, 'counts', None)
+        if shard is None:
+            shard = self._local.counts = Counter()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+    
+    def inc(self, name, value=1, **labels):
+        """카운터에 값을 더합니다.
+        
+        Args:
+            name (str): 지표 이름 (METRICS 참조)
+            value (float): 더할 값
+            **labels: 레이블
+        """
+        self._shard()[(name, tuple(sorted(labels.items())))] += value
+    
+    def observe(self, name, value, **labels):
+        """히스토그램에 관측값을 기록합니다.
+        
+        Args:
+            name (str): 지표 이름 (METRICS 참조)
+            value (float): 관측값
+            **labels: 레이블
+        """
+        key = tuple(sorted(labels.items()))
+        bucket = next((i for i, bound in enumerate(self.BUCKETS) if value <= bound), len(self.BUCKETS))
+        shard = self._shard()
+        shard[(name + '_bucket', key + (('le', bucket),))] += 1
+        shard[(name + '_sum', key)] += value
+        shard[(name + '_count', key)] += 1
+    
+    def snapshot(self):
+        """모든 스레드의 값을 합칩니다.
+        
+        Returns:
+            Counter: (이름, 레이블 튜플) -> 값 (히스토그램 구간은 누적하지 않은 횟수)
+        """
+        with self._lock:
+            shards = list(self._shards)
+        total = Counter()
+        for shard in shards:
+            # dict.copy()는 다른 스레드가 값을 더하는 중에도 한 번에 복사됨
+            total.update(shard.copy())
+        return total
+    
+    def handle(self, event):
+        """엔진 이벤트에서 단계별 소요 시간과 끝난 작업 수를 기록합니다."""
+        if event['type'] == 'phase':
+            self.observe('phase_seconds', event['seconds'], phase=event['phase'])
+            self.inc('phases_total', phase=event['phase'], outcome=event['outcome'])
+        elif event['type'] == 'job' and event['state'] in ('done', 'failed', 'cancelled'):
+            self.inc('jobs_total', state=event['state'])
+    
+    @staticmethod
+    def format_sample(name, labels, value):
+        """표본 한 줄을 만듭니다.
+        
+        Args:
+            name (str): 접두어를 붙인 지표 이름
+            labels (tuple): (레이블 이름, 값) 튜플
+            value (float): 값
+            
+        Returns:
+            str: 'name{label="value",...} value' 형식의 줄
+        """
+        if labels:
+            escaped = ','.join(
+                '{}="{}"'.format(key, str(label).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                for key, label in labels)
+            name = f"{name}{{{escaped}}}"
+        return f"{name} {value}"
+    
+    def histogram_samples(self, name, series):
+        """구간별 횟수를 레이블마다 누적해 _bucket, _sum, _count 표본을 만듭니다."""
+        grouped = {}
+        for (sample, labels), value in series.items():
+            if sample == name + '_bucket':
+                base = tuple(item for item in labels if item[0] != 'le')
+                grouped.setdefault(base, Counter())[dict(labels)['le']] += value
+        samples = []
+        for base in sorted(grouped):
+            running = 0
+            for i, bound in enumerate(self.BUCKETS + ('+Inf',)):
+                running += grouped[base][i]
+                samples.append((name + '_bucket', base + (('le', bound),), running))
+            samples.append((name + '_sum', base, series[(name + '_sum', base)]))
+            samples.append((name + '_count', base, series[(name + '_count', base)]))
+        return samples
+    
+    def render(self, gauges=()):
+        """모든 지표를 Prometheus 텍스트 형식(0.0.4)으로 만듭니다.
+        
+        Args:
+            gauges (iterable): 함께 출력할 (이름, 레이블 딕셔너리, 값) 목록
+            
+        Returns:
+            str: 지표 텍스트
+        """
+        series = self.snapshot()
+        for name, labels, value in gauges:
+            series[(name, tuple(sorted(labels.items())))] = value
+        lines = []
+        for name, (kind, help_text) in self.METRICS.items():
+            if kind == 'histogram':
+                samples = self.histogram_samples(name, series)
+            else:
+                samples = sorted((name, labels, value) for (sample, labels), value in series.items()
+                                 if sample == name)
+            if not samples:
+                continue
+            lines.append(f"# HELP {self.PREFIX}{name} {help_text}")
+            lines.append(f"# TYPE {self.PREFIX}{name} {kind}")
+            lines += [self.format_sample(self.PREFIX + sample, labels, value)
+                      for sample, labels, value in samples]
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """MetricsServer의 요청 처리 클래스 (GET /metrics만 응답)"""
+    
+    def do_GET(self):
+        """GET 요청을 처리합니다."""
+        if urlparse(self.path).path != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.engine.metrics_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        """요청마다 출력되는 로그를 끕니다."""
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """다운로드 엔진의 지표를 Prometheus 텍스트 형식으로 제공하는 로컬 HTTP 서버 클래스"""
+    
+    daemon_threads = True
+    
+    def __init__(self, engine, port, host='127.0.0.1'):
+        """
+        Args:
+            engine (DownloadEngine): 지표를 읽을 엔진
+            port (int): 사용할 포트
+            host (str): 받을 주소
+        """
+        super().__init__((host, port), MetricsHandler)
+        self.engine = engine
+    
+    @property
+    def url(self):
+        """지표 URL"""
+        return f"http://{self.server_address[0]}:{self.server_port}/metrics"
+    
+    def start(self):
+        """백그라운드 스레드에서 서버를 시작합니다.
+        
+        Returns:
+            MetricsServer: 자기 자신
+        """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+    
+    def stop(self):
+        """서버를 중지합니다."""
+        self.shutdown()
+        self.server_close()
+
+
+class JobProfiler:
+    """선택한 작업 또는 실행 전체의 CPU 사용을 프로파일링하는 클래스
+    
+    두 가지 방식을 지원합니다.
+    
+    - sample: 별도 스레드가 SAMPLE_INTERVAL마다 sys._current_frames()로 스레드별 호출 스택을
+      기록합니다. 여러 작업이 동시에 실행되어도 스레드별로 나눠 기록하며, 작업을 지정하지
+      않으면 GUI 메인 스레드(Tk 변수 추적 등)를 포함한 모든 스레드를 기록합니다.
+      대기열이나 잠금을 기다리는 스레드는 기록하지 않습니다.
+      작업별 결과는 flamegraph 도구로 볼 수 있는 접힌 스택 형식(.folded)으로 저장합니다.
+    - cprofile: 작업을 실행하는 동안 그 스레드에서 cProfile을 켜서 함수별 호출 횟수와 시간을
+      정확히 기록하고 작업별 .prof 파일(pstats 형식)로 저장합니다. Python 3.12부터는
+      cProfile을 한 번에 하나만 켤 수 있어 다른 작업을 프로파일링하는 중이면 건너뜁니다.
+    
+    close()를 호출하면 모든 작업의 결과를 합친 hotspots.txt를 함께 저장합니다.
+    프로파일링을 켜지 않으면 엔진은 이 클래스를 만들지 않으므로 비용이 없습니다.
+    """
+    
+    # 호출 스택을 기록하는 간격 (초)
+    SAMPLE_INTERVAL = 0.005
+    # 합친 보고서에 출력할 함수 수
+    REPORT_LIMIT = 30
+    # 가장 안쪽 프레임이 이 모듈에 있으면 대기 중인 스레드로 보고 기록하지 않음
+    IDLE_MODULES = ('threading.py', 'queue.py', 'selectors.py')
+    
+    def __init__(self, out_dir, mode='sample', jobs=None):
+        """
+        Args:
+            out_dir (str): 결과를 저장할 폴더
+            mode (str): 'sample' 또는 'cprofile'
+            jobs (list): 프로파일링할 작업 ID 또는 영상 ID (None이면 모든 작업)
+        """
+        if mode not in ('sample', 'cprofile'):
+            raise ValueError(f"알 수 없는 프로파일링 방식입니다: {mode}")
+        self.out_dir = out_dir
+        self.mode = mode
+        self.jobs = set(jobs) if jobs else None
+        os.makedirs(out_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._threads = {}
+        self._samples = Counter()
+        self._profiles = {}
+        self._stop = threading.Event()
+        self._sampler = None
+        if mode == 'sample':
+            self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+            self._sampler.start()
+    
+    @classmethod
+    def from_environ(cls, environ=None):
+        """환경 변수로 프로파일러를 생성합니다.
+        
+        YTDL_PROFILE에 결과 폴더를, YTDL_PROFILE_MODE에 방식을, YTDL_PROFILE_JOBS에
+        쉼표로 구분한 작업 ID 또는 영상 ID를 지정합니다.
+        
+        Returns:
+            JobProfiler: 프로파일러 (YTDL_PROFILE이 없으면 None)
+        """
+        environ = os.environ if environ is None else environ
+        if not environ.get('YTDL_PROFILE'):
+            return None
+        jobs = [item.strip() for item in environ.get('YTDL_PROFILE_JOBS', '').split(',') if item.strip()]
+        return cls(environ['YTDL_PROFILE'], environ.get('YTDL_PROFILE_MODE', 'sample'), jobs or None)
+    
+    def wants(self, job):
+        """작업을 프로파일링할지 확인합니다."""
+        return self.jobs is None or job.job_id in self.jobs or job.video_id in self.jobs
+    
+    @contextlib.contextmanager
+    def profile(self, job, part):
+        """블록을 실행하는 동안 현재 스레드를 작업에 대해 프로파일링합니다.
+        
+        Args:
+            job (DownloadJob): 실행할 작업
+            part (str): 작업 부분 이름 ('prepare' 또는 'run')
+        """
+        if not self.wants(job):
+            yield
+            return
+        label = f"{job.video_id or job.job_id}"
+        ident = threading.get_ident()
+        profiler = None
+        if self.mode == 'cprofile':
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Python 3.12부터는 다른 스레드에서 켠 cProfile이 있으면 켤 수 없음
+                profiler = None
+        with self._lock:
+            self._threads[ident] = f"{label};{part}"
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._threads.pop(ident, None)
+            if profiler:
+                profiler.disable()
+                with self._lock:
+                    self._profiles.setdefault(label, []).append(profiler)
+    
+    @staticmethod
+    def frame_name(frame):
+        """스택 프레임을 '함수 (파일:줄)' 형식의 이름으로 만듭니다."""
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    
+    def _sample_loop(self):
+        """SAMPLE_INTERVAL마다 스레드별 호출 스택을 기록하는 스레드 함수"""
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.SAMPLE_INTERVAL):
+            frames = sys._current_frames()
+            with self._lock:
+                threads = dict(self._threads)
+            if self.jobs is None:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == own or os.path.basename(frame.f_code.co_filename) in self.IDLE_MODULES:
+                    continue
+                label = threads.get(ident)
+                if label is None:
+                    if self.jobs is not None:
+                        continue
+                    label = f"thread-{names.get(ident, ident)}"
+                stack = []
+                while frame is not None:
+                    stack.append(self.frame_name(frame))
+                    frame = frame.f_back
+                self._samples[(label, tuple(reversed(stack)))] += 1
+    
+    def close(self):
+        """프로파일링을 끝내고 작업별 결과와 합친 보고서를 저장합니다.
+        
+        Returns:
+            str: 합친 보고서 파일 경로
+        """
+        self._stop.set()
+        if self._sampler:
+            self._sampler.join()
+        report_path = os.path.join(self.out_dir, 'hotspots.txt')
+        if self.mode == 'sample':
+            report = self._write_samples()
+        else:
+            report = self._write_profiles()
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(report)
+        return report_path
+    
+    def _write_samples(self):
+        """작업별 접힌 스택 파일을 저장하고, 함수별 자체/누적 표본 수 보고서를 만듭니다."""
+        by_job = {}
+        own, inclusive = Counter(), Counter()
+        for (label, stack), count in self._samples.items():
+            job = label.split(';', 1)[0]
+            by_job.setdefault(job, []).append((label, stack, count))
+            own[stack[-1]] += count
+            for name in set(stack):
+                inclusive[name] += count
+        for job, rows in by_job.items():
+            with open(os.path.join(self.out_dir, f"{job}.folded"), 'w', encoding='utf-8') as f:
+                for label, stack, count in rows:
+                    f.write(f"{label};{';'.join(stack)} {count}\n")
+        total = sum(self._samples.values()) or 1
+        lines = [f"표본 {total}개 ({self.SAMPLE_INTERVAL * 1000:g}ms 간격), 작업 {len(by_job)}개", '',
+                 "자체 표본 상위 함수:"]
+        lines += [f"{count * 100 / total:6.2f}% {count:8d}  {name}" for name, count in own.most_common(self.REPORT_LIMIT)]
+        lines += ['', "누적 표본 상위 함수:"]
+        lines += [f"{count * 100 / total:6.2f}% {count:8d}  {name}"
+                  for name, count in inclusive.most_common(self.REPORT_LIMIT)]
+        return '\n'.join(lines) + '\n'
+    
+    def _write_profiles(self):
+        """작업별 .prof 파일을 저장하고, 모든 작업을 합친 pstats 보고서를 만듭니다."""
+        merged = None
+        for label, profiles in self._profiles.items():
+            stats = pstats.Stats(*profiles)
+            stats.dump_stats(os.path.join(self.out_dir, f"{label}.prof"))
+            if merged is None:
+                merged = pstats.Stats(*profiles)
+            else:
+                merged.add(*profiles)
+        if merged is None:
+            return "프로파일링한 작업이 없습니다.\n"
+        stream = io.StringIO()
+        merged.stream = stream
+        merged.sort_stats('cumulative').print_stats(self.REPORT_LIMIT)
+        merged.sort_stats('tottime').print_stats(self.REPORT_LIMIT)
+        return stream.getvalue()
+
+
+class JobApiHandler(BaseHTTPRequestHandler):
+    """JobApiServer의 요청 처리 클래스
+    
+    요청과 응답 본문은 JSON입니다. api_token을 설정하면 모든 요청에
+    'Authorization: Bearer <토큰>' 헤더(또는 ?token= 쿼리)가 있어야 합니다.
+    웹 페이지가 브라우저를 통해 작업을 추가하거나 취소하지 못하도록, 이 서버가 아닌
+    Origin 헤더가 붙은 요청은 거부하고 POST 본문은 Content-Type이 application/json이어야
+    합니다 (브라우저는 다른 사이트로 JSON을 보내기 전에 사전 요청을 하므로 막힘).
+    
+        GET  /health              서버 상태
+        GET  /jobs?limit=50       최근 작업 목록 (실행 중인 작업은 단계별 진행률 포함)
+        GET  /jobs/<작업 ID>      작업 상세 (단계별 상태, 진행률, 마지막 상태 메시지)
+        POST /jobs                작업 추가 {"urls": [...], "options": {...}}
+        POST /control             일시 정지/재개/취소 {"action": "pause", "job_id": null}
+        POST /limit               속도 제한 {"value": "2M", "video_id": null}
+        GET  /events              엔진 이벤트 스트림 (Server-Sent Events)
+        GET  /artifacts?limit=50  완료된 작업의 결과 파일 목록 (크기, SHA-256)
+        GET  /metrics             Prometheus 형식 지표
+    """
+    
+    def _authorized(self):
+        """요청에 올바른 토큰이 있는지 확인합니다 (비교 시간으로 토큰을 알아낼 수 없게 비교)."""
+        token = self.server.engine.config['api_token']
+        if not token:
+            return True
+        query = parse_qs(urlparse(self.path).query)
+        candidates = [self.headers.get('Authorization') or '', f"Bearer {query.get('token', [''])[0]}"]
+        expected = f"Bearer {token}".encode('utf-8')
+        return any(hmac.compare_digest(candidate.encode('utf-8'), expected) for candidate in candidates)
+    
+    def _same_origin(self):
+        """Origin 헤더가 없거나(브라우저가 아닌 클라이언트) 이 서버 자신이면 True를 반환합니다."""
+        origin = self.headers.get('Origin')
+        if origin is None:
+            return True
+        port = self.server.server_port
+        allowed = {f"http://{host}:{port}"
+                   for host in ('127.0.0.1', 'localhost', '[::1]', self.server.server_address[0])}
+        return origin in allowed
+    
+    def _route(self, method):
+        """요청을 처리할 메서드와 경로 인자를 찾아 실행합니다."""
+        if not self._same_origin():
+            self.send_json({'error': "다른 사이트에서 보낸 요청은 받지 않습니다."}, status=403)
+            return
+        if not self._authorized():
+            self.send_json({'error': "인증 토큰이 필요합니다."}, status=401)
+            return
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        if method == 'POST' and content_type != 'application/json':
+            self.send_json({'error': "요청 본문의 Content-Type은 application/json이어야 합니다."}, status=415)
+            return
+        parts = [part for part in urlparse(self.path).path.split('/') if part]
+        routes = {
+            ('GET', 'health'): self.get_health,
+            ('GET', 'jobs'): self.get_jobs,
+            ('POST', 'jobs'): self.post_jobs,
+            ('POST', 'control'): self.post_control,
+            ('POST', 'limit'): self.post_limit,
+            ('GET', 'events'): self.get_events,
+            ('GET', 'artifacts'): self.get_artifacts,
+            ('GET', 'metrics'): self.get_metrics,
+        }
+        handler = routes.get((method, parts[0] if parts else ''))
+        if handler is None or len(parts) > 2 or (len(parts) == 2 and handler != self.get_jobs):
+            self.send_json({'error': "알 수 없는 경로입니다."}, status=404)
+            return
+        try:
+            handler(*parts[1:])
+        except ValueError as e:
+            self.send_json({'error': str(e)}, status=400)
+    
+    def do_GET(self):
+        """GET 요청을 처리합니다."""
+        self._route('GET')
+    
+    def do_POST(self):
+        """POST 요청을 처리합니다."""
+        self._route('POST')
+    
+    def read_json(self):
+        """요청 본문을 JSON으로 읽습니다."""
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            raise ValueError("요청 본문이 올바른 JSON이 아닙니다.")
+        if not isinstance(body, dict):
+            raise ValueError("요청 본문은 JSON 객체여야 합니다.")
+        return body
+    
+    def query(self, name, default=None):
+        """쿼리 문자열 값을 반환합니다."""
+        return parse_qs(urlparse(self.path).query).get(name, [default])[0]
+    
+    def send_json(self, data, status=200):
+        """JSON 응답을 보냅니다."""
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def get_health(self):
+        self.send_json({'ok': True, 'jobs': len(self.server.engine.job_ids()), 'subscribers': len(self.server.subscribers)})
+    
+    def get_jobs(self, job_id=None):
+        server = self.server
+        if job_id:
+            job = server.engine.journal.get_job(job_id)
+            if job is None:
+                self.send_json({'error': "작업이 없습니다."}, status=404)
+                return
+            self.send_json(server.with_live_state(job))
+            return
+        rows = server.engine.journal.list_jobs(int(self.query('limit', 50)))
+        self.send_json({'jobs': [server.with_live_state({'job_id': job_id, 'state': state, 'title': title,
+                                                         'url': url})
+                                 for job_id, state, title, url in rows]})
+    
+    def post_jobs(self):
+        body = self.read_json()
+        urls = body.get('urls') or []
+        if not urls or not all(isinstance(url, str) for url in urls):
+            raise ValueError("urls에 URL 목록을 지정해야 합니다.")
+        options = validate_job_options(body.get('options') or {})
+        if len(urls) > 1:
+            options['title'] = ''
+        jobs = self.server.engine.submit_batch(urls, options)
+        self.send_json({'jobs': [{'job_id': job.job_id, 'video_id': job.video_id, 'url': job.url,
+                                  'state': job.state} for job in jobs]}, status=201)
+    
+    def post_control(self):
+        body = self.read_json()
+        actions = {'pause': self.server.engine.pause, 'resume': self.server.engine.resume,
+                   'cancel': self.server.engine.cancel}
+        if body.get('action') not in actions:
+            raise ValueError("action은 pause, resume, cancel 중 하나여야 합니다.")
+        self.send_json({'count': actions[body['action']](body.get('job_id'))})
+    
+    def post_limit(self):
+        """속도 제한을 바꿉니다. 설정 파일에는 저장하지 않으므로 서버를 다시 시작하면 설정값으로 돌아갑니다."""
+        body = self.read_json()
+        bandwidth = self.server.engine.bandwidth
+        value = body.get('value') or ''
+        if body.get('video_id'):
+            bandwidth.set_job_limit(body['video_id'], value)
+        else:
+            bandwidth.set_global_limit(value)
+        self.send_json({'limit': format_rate(parse_rate(value))})
+    
+    def get_events(self):
+        """엔진 이벤트를 Server-Sent Events로 보냅니다 (연결이 끊길 때까지)."""
+        events = self.server.subscribe()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        try:
+            while True:
+                try:
+                    event = events.get(timeout=self.server.KEEPALIVE)
+                except queue.Empty:
+                    self.wfile.write(b': keepalive\n\n')
+                else:
+                    if event is None:
+                        break
+                    self.wfile.write(f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                                     .encode('utf-8'))
+                self.wfile.flush()
+        except OSError:
+            pass
+        finally:
+            self.server.unsubscribe(events)
+    
+    def get_artifacts(self):
+        self.send_json({'artifacts': self.server.artifacts(int(self.query('limit', 50)))})
+    
+    def get_metrics(self):
+        body = self.server.engine.metrics_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        """요청마다 출력되는 로그를 끕니다."""
+
+
+class JobApiServer(ThreadingHTTPServer):
+    """다운로드 엔진 하나를 HTTP/JSON 작업 API로 공유하는 서버 클래스
+    
+    여러 사용자가 같은 대기열, 메타데이터 캐시, 저장소, 응답 보관 파일을 쓰도록 엔진을
+    하나만 실행하고 요청을 받습니다. 엔진 이벤트는 구독한 클라이언트마다 큐에 넣어
+    /events로 보내며, 큐가 가득 찰 만큼 느린 클라이언트는 연결을 끊습니다 (다시 연결한 뒤
+    /jobs로 현재 상태를 조회하면 됩니다). 작업별 마지막 진행률과 상태 메시지는
+    /jobs 응답에 함께 넣기 위해 보관합니다.
+    """
+    
+    daemon_threads = True
+    # 클라이언트별 이벤트 큐 크기
+    QUEUE_SIZE = 1000
+    # 이벤트가 없을 때 연결 유지 주석을 보내는 간격 (초)
+    KEEPALIVE = 15.0
+    
+    def __init__(self, engine, port, host='127.0.0.1'):
+        """
+        Args:
+            engine (DownloadEngine): 공유할 엔진
+            port (int): 사용할 포트 (0이면 임의의 빈 포트)
+            host (str): 받을 주소
+        """
+        super().__init__((host, port), JobApiHandler)
+        self.engine = engine
+        self.subscribers = []
+        self.progress = {}
+        self.messages = {}
+        self._lock = threading.Lock()
+        engine.add_listener(self.broadcast)
+    
+    @property
+    def url(self):
+        """API 기본 URL"""
+        return f"http://{self.server_address[0]}:{self.server_port}"
+    
+    def subscribe(self):
+        """이벤트를 받을 큐를 등록합니다."""
+        events = queue.Queue(self.QUEUE_SIZE)
+        with self._lock:
+            self.subscribers.append(events)
+        return events
+    
+    def unsubscribe(self, events):
+        """이벤트 큐 등록을 해제합니다."""
+        with self._lock:
+            if events in self.subscribers:
+                self.subscribers.remove(events)
+    
+    def broadcast(self, event):
+        """엔진 이벤트를 기록하고 모든 구독자 큐에 넣습니다."""
+        job_id = event.get('job_id')
+        with self._lock:
+            if event['type'] == 'progress':
+                self.progress.setdefault(job_id, {})[event['stage']] = event['percent']
+            elif event['type'] == 'status' and job_id:
+                self.messages[job_id] = event['message']
+            elif event['type'] == 'job' and event['state'] in ('done', 'failed', 'cancelled'):
+                # 끝난 작업의 상태는 저널에 남으므로 진행률 기록은 버림
+                self.progress.pop(job_id, None)
+                self.messages.pop(job_id, None)
+            subscribers = list(self.subscribers)
+        for events in subscribers:
+            try:
+                events.put_nowait(event)
+            except queue.Full:
+                # 따라오지 못하는 클라이언트는 연결을 끊음 (None을 받으면 스트림 종료)
+                self.unsubscribe(events)
+                with events.mutex:
+                    events.queue.clear()
+                events.put_nowait(None)
+    
+    def with_live_state(self, job):
+        """저널에서 읽은 작업 정보에 이 서버가 본 진행률과 마지막 상태 메시지를 더합니다."""
+        with self._lock:
+            job['progress'] = dict(self.progress.get(job['job_id'], {}))
+            job['message'] = self.messages.get(job['job_id'])
+        return job
+    
+    def artifacts(self, limit=50):
+        """완료된 작업의 결과 파일 목록을 만듭니다.
+        
+        저장 폴더에서 작업 파일명으로 시작하는 파일을 찾고, 해시 목록에 기록된
+        SHA-256이 있으면 함께 반환합니다.
+        
+        Args:
+            limit (int): 확인할 최근 작업 수
+            
+        Returns:
+            list: 작업별 {'job_id', 'title', 'url', 'files': [{'path', 'size', 'sha256'}]}
+        """
+        artifacts = []
+        for job_id, state, title, url in self.engine.journal.list_jobs(limit):
+            if state != 'done' or not title:
+                continue
+            folder = self.engine.journal.get_job(job_id)['options']['download_path']
+            index = HashIndex.load(folder) if os.path.isdir(folder) else {}
+            files = []
+            for path in sorted(glob.glob(os.path.join(glob.escape(folder), glob.escape(title) + '*'))):
+                name = os.path.basename(path)
+                if name.endswith(('.part', '.ytdl')) or not os.path.isfile(path):
+                    continue
+                files.append({'path': path, 'size': os.path.getsize(path),
+                              'sha256': (index.get(name) or {}).get('sha256')})
+            artifacts.append({'job_id': job_id, 'title': title, 'url': url, 'files': files})
+        return artifacts
+
+
+class RemoteEngine:
+    """작업 API 서버(serve 명령)에 연결해 다른 프로세스나 컴퓨터의 엔진을 사용하는 클라이언트 클래스
+    
+    GUI가 사용하는 DownloadEngine의 기능(add_listener, start, submit_batch, pause, resume,
+    cancel, bandwidth.set_global_limit)을 같은 형태로 제공합니다. 이벤트는 /events 스트림을
+    받는 스레드가 같은 딕셔너리 형식으로 리스너에 전달하며, 연결이 끊기면
+    RECONNECT_DELAY 후 다시 연결합니다. 저장 경로는 서버의 설정을 따릅니다.
+    """
+    
+    # 이벤트 스트림 연결이 끊긴 뒤 다시 연결할 때까지 기다리는 시간 (초)
+    RECONNECT_DELAY = 3.0
+    
+    def __init__(self, url, token='', timeout=(5, 20)):
+        """
+        Args:
+            url (str): 작업 API 서버 URL (예: http://192.168.0.10:8765)
+            token (str): 인증 토큰
+            timeout (tuple): (연결, 읽기) 제한 시간 (초)
+        """
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        if token:
+            self.session.headers['Authorization'] = f"Bearer {token}"
+        self._listeners = []
+        # GUI가 engine.bandwidth.set_global_limit()과 engine.profiler를 사용하므로 같은 이름으로 제공
+        self.bandwidth = self
+        self.profiler = None
+    
+    @classmethod
+    def from_config(cls, config):
+        """설정 딕셔너리로 클라이언트를 생성합니다 (api_url이 비어 있으면 None)."""
+        if not config['api_url']:
+            return None
+        return cls(config['api_url'], token=config['api_token'])
+    
+    def add_listener(self, callback):
+        """이벤트 리스너를 등록합니다."""
+        self._listeners.append(callback)
+    
+    def emit(self, **event):
+        """모든 리스너에 이벤트를 전달합니다."""
+        for listener in self._listeners:
+            listener(event)
+    
+    def request(self, method, path, **kwargs):
+        """API를 호출하고 JSON 응답을 반환합니다.
+        
+        Raises:
+            requests.RequestException: 연결 실패 또는 오류 응답
+        """
+        response = self.session.request(method, self.url + path, timeout=self.timeout, **kwargs)
+        if response.status_code >= 400:
+            try:
+                message = response.json()['error']
+            except (ValueError, KeyError):
+                message = response.reason
+            raise requests.HTTPError(f"{response.status_code} {message}", response=response)
+        return response.json()
+    
+    def start(self, workers=None):
+        """이벤트 스트림을 받는 스레드를 시작합니다.
+        
+        Returns:
+            list: 빈 목록 (미완료 작업은 서버가 이어서 진행)
+        """
+        threading.Thread(target=self._event_loop, daemon=True).start()
+        return []
+    
+    def _event_loop(self):
+        """/events 스트림의 이벤트를 리스너에 전달하는 스레드 함수"""
+        while True:
+            try:
+                with self.session.get(self.url + '/events', stream=True,
+                                      timeout=(self.timeout[0], None)) as response:
+                    response.raise_for_status()
+                    self.emit(type='status', job_id=None, message=f"작업 서버에 연결했습니다: {self.url}")
+                    for line in response.iter_lines(decode_unicode=True):
+                        if line and line.startswith('data: '):
+                            self.emit(**json.loads(line[len('data: '):]))
+            except (requests.RequestException, ValueError) as e:
+                self.emit(type='status', job_id=None, message=f"작업 서버 연결 끊김: {e}")
+            time.sleep(self.RECONNECT_DELAY)
+    
+    def _call(self, method, path, **kwargs):
+        """API를 호출하고, 실패하면 상태 메시지 이벤트를 보낸 뒤 None을 반환합니다."""
+        try:
+            return self.request(method, path, **kwargs)
+        except requests.RequestException as e:
+            self.emit(type='status', job_id=None, message=f"작업 서버 요청 실패: {e}")
+            return None
+    
+    def submit_batch(self, urls, options):
+        """작업을 서버 대기열에 추가합니다.
+        
+        Args:
+            urls (list): YouTube 영상 URL 목록
+            options (dict): 작업 옵션 (저장 경로와 배치는 서버가 정함)
+            
+        Returns:
+            list: 추가된 작업 정보 딕셔너리 목록
+        """
+        options = {key: value for key, value in options.items() if key not in ('download_path', 'batch')}
+        result = self._call('POST', '/jobs', json={'urls': urls, 'options': options})
+        return result['jobs'] if result else []
+    
+    def submit(self, url, options):
+        """작업 하나를 서버 대기열에 추가합니다."""
+        jobs = self.submit_batch([url], options)
+        return jobs[0] if jobs else None
+    
+    def _control(self, action, job_id):
+        result = self._call('POST', '/control', json={'action': action, 'job_id': job_id})
+        return result['count'] if result else 0
+    
+    def pause(self, job_id=None):
+        """작업(None이면 모든 작업)을 일시 정지합니다."""
+        return self._control('pause', job_id)
+    
+    def resume(self, job_id=None):
+        """일시 정지된 작업(None이면 모든 작업)을 재개합니다."""
+        return self._control('resume', job_id)
+    
+    def cancel(self, job_id=None):
+        """작업(None이면 모든 작업)을 취소합니다."""
+        return self._control('cancel', job_id)
+    
+    def set_global_limit(self, value):
+        """서버의 전체 속도 제한을 변경합니다.
+        
+        Raises:
+            ValueError: 형식이 올바르지 않은 경우
+        """
+        parse_rate(value)
+        self._call('POST', '/limit', json={'value': value})
+    
+    def jobs(self, limit=50):
+        """서버의 최근 작업 목록을 반환합니다."""
+        return self.request('GET', '/jobs', params={'limit': limit})['jobs']
+    
+    def artifacts(self, limit=50):
+        """서버의 완료된 결과 파일 목록을 반환합니다."""
+        return self.request('GET', '/artifacts', params={'limit': limit})['artifacts']
+
+
+class JobQueue:
+    """예약 정책에 따라 다음에 실행할 작업을 고르는 대기열 클래스
+    
+    queue.Queue와 같은 put/get/task_done/join 인터페이스를 제공하며, get()은 넣은
+    순서가 아니라 정책에 따라 작업을 꺼냅니다. 우선순위(작업 옵션의 priority)는
+    fifo를 제외한 모든 정책에서 먼저 비교합니다.
+    
+    - fifo: 넣은 순서
+    - priority: 우선순위, 같으면 넣은 순서
+    - sjf: 우선순위, 같으면 예상 크기가 작은 작업 먼저. 기다린 1초마다 aging 바이트씩
+      작게 취급해 큰 작업이 작은 작업에 계속 밀리지 않게 합니다.
+    - fair: 우선순위, 같으면 지금까지 내준 예상 바이트가 가장 적은 배치의 작업 먼저,
+      배치 안에서는 sjf. 큰 배치가 나중에 추가한 작은 배치를 막지 않습니다.
+    
+    예상 크기를 모르는 작업은 같은 우선순위의 다른 작업보다 뒤에 실행합니다.
+    넣은 뒤에 작업의 generation이 바뀐 항목(대기 중에 일시 정지된 작업)은 꺼내지 않고 버립니다.
+    """
+    
+    POLICIES = ('fifo', 'priority', 'sjf', 'fair')
+    
+    def __init__(self, policy='sjf', aging=0, clock=time.monotonic):
+        """
+        Args:
+            policy (str): 예약 정책 (POLICIES 중 하나)
+            aging (float): 기다린 1초마다 예상 크기에서 빼는 바이트 수
+            clock (callable): 현재 시각(초)을 반환하는 함수 (모의 실행에서 가상 시계 사용)
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"알 수 없는 예약 정책입니다: {policy}")
+        self.policy = policy
+        self.aging = aging
+        self.clock = clock
+        self._items = []
+        self._seq = itertools.count()
+        self._served = Counter()
+        self._unfinished = 0
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._all_done = threading.Condition(self._lock)
+    
+    @classmethod
+    def from_config(cls, config):
+        """설정 딕셔너리로부터 대기열을 생성합니다.
+        
+        Args:
+            config (dict): load_config()가 반환한 설정
+            
+        Returns:
+            JobQueue: 생성된 대기열
+        """
+        return cls(policy=config['schedule_policy'], aging=parse_rate(config['sjf_aging']))
+    
+    @staticmethod
+    def batch_of(job):
+        """작업이 속한 배치를 반환합니다 (배치가 없으면 작업 자체가 하나의 배치)."""
+        return job.options.get('batch') or job.job_id
+    
+    def _key(self, item, now):
+        """정책에 따른 정렬 키를 반환합니다 (작을수록 먼저 실행)."""
+        seq, enqueued_at, job, _ = item
+        if self.policy == 'fifo':
+            return (seq,)
+        priority = -int(job.options.get('priority') or 0)
+        if self.policy == 'priority':
+            return (priority, seq)
+        if job.estimate is None:
+            cost = float('inf')
+        else:
+            cost = job.estimate - self.aging * (now - enqueued_at)
+        if self.policy == 'sjf':
+            return (priority, cost, seq)
+        return (priority, self._served[self.batch_of(job)], cost, seq)
+    
+    def put(self, job):
+        """작업을 대기열에 넣습니다.
+        
+        Args:
+            job (DownloadJob): 넣을 작업
+        """
+        with self._lock:
+            self._items.append((next(self._seq), self.clock(), job, getattr(job, 'generation', 0)))
+            self._unfinished += 1
+            self._not_empty.notify()
+    
+    @staticmethod
+    def _stale(item):
+        """넣은 뒤에 작업의 generation이 바뀐 항목인지 확인합니다."""
+        return item[3] != getattr(item[2], 'generation', 0)
+    
+    def get(self):
+        """정책에 따라 다음 작업을 꺼냅니다. 대기열이 비어 있으면 기다립니다.
+        
+        Returns:
+            DownloadJob: 꺼낸 작업
+        """
+        with self._lock:
+            while True:
+                stale = [item for item in self._items if self._stale(item)]
+                for item in stale:
+                    self._items.remove(item)
+                self._unfinished -= len(stale)
+                if stale and self._unfinished <= 0:
+                    self._all_done.notify_all()
+                if self._items:
+                    break
+                self._not_empty.wait()
+            now = self.clock()
+            item = min(self._items, key=lambda item: self._key(item, now))
+            self._items.remove(item)
+            job = item[2]
+            self._served[self.batch_of(job)] += job.estimate or 0
+            return job
+    
+    def task_done(self):
+        """꺼낸 작업의 처리가 끝났음을 알립니다."""
+        with self._lock:
+            self._unfinished -= 1
+            if self._unfinished <= 0:
+                self._all_done.notify_all()
+    
+    def join(self):
+        """넣은 모든 작업의 처리가 끝날 때까지 기다립니다."""
+        with self._lock:
+            while self._unfinished:
+                self._all_done.wait()
+    
+    def __len__(self):
+        with self._lock:
+            return sum(1 for item in self._items if not self._stale(item))
+
+
+class DownloadEngine:
+    """다운로드 작업 대기열과 작업자 스레드를 관리하는 엔진 클래스
+    
+    GUI와 명령행이 함께 사용하는 다운로드 엔진입니다. 작업을 저널에 먼저 기록한 뒤
+    준비 대기열에 넣습니다. 준비 스레드는 넣은 순서대로 파일명을 정하고 자막을 받은 뒤
+    선택한 형식의 예상 크기를 확인해 작업을 영상/음성 대기열(JobQueue)로 넘기고,
+    작업자 스레드가 예약 정책에 따라 작업을 꺼내 영상, 음성 단계를 실행합니다.
+    그래서 큰 영상을 받는 동안에도 배치 전체의 자막을 먼저 받을 수 있습니다.
+    디스크 사전 확인을 켜면 준비 단계에서 예상 크기로 필요한 공간을 예약하므로, 병합
+    도중에 디스크가 가득 차기 전에 작업을 기다리게 하거나 실패 처리합니다.
+    시작할 때 저널에서 완료되지 않은 작업을 불러와 끝난 단계는 건너뛰고 이어서 진행합니다.
+    
+    작업은 pause/resume/cancel로 제어합니다. 실행 중인 작업은 진행률 콜백과 후처리 콜백이
+    다음에 호출될 때 멈추며, 일시 정지된 작업은 작업자 스레드와 대역폭을 바로 내놓고
+    .part 파일을 남겨 재개할 때 이어받습니다. 다른 프로세스(명령행)의 제어 요청은
+    저널을 통해 CONTROL_INTERVAL마다 확인합니다.
+    
+    진행 상황은 이벤트 딕셔너리로 리스너에 전달됩니다. 리스너는 작업자 스레드에서
+    호출되므로 GUI는 이벤트를 큐에 넣고 메인 스레드에서 처리해야 합니다.
+    
+        {'type': 'status', 'job_id': ..., 'message': ...}
+        {'type': 'progress', 'job_id': ..., 'stage': ..., 'percent': ...}
+        {'type': 'job', 'job_id': ..., 'state': ..., 'video_id': ..., 'title': ...}
+        {'type': 'phase', 'job_id': ..., 'phase': ..., 'seconds': ..., 'outcome': ..., ...}
+    
+    Attributes:
+        config (dict): 공유 설정 딕셔너리
+        journal (JobJournal): 작업 저널
+        jobs (dict): 이 엔진이 관리하는 끝나지 않은 작업 (작업 ID -> DownloadJob)
+    """
+    
+    # .part 경로와 받은 바이트 수를 저널에 기록하는 최소 간격 (초)
+    OFFSET_INTERVAL = 2.0
+    # 저널의 제어 요청을 확인하는 간격 (초)
+    CONTROL_INTERVAL = 1.0
+    
+    def __init__(self, config, journal=None):
+        """
+        Args:
+            config (dict): load_config()가 반환한 설정
+            journal (JobJournal): 작업 저널 (None이면 기본 경로의 저널 사용)
+        """
+        self.config = config
+        self.journal = journal or JobJournal()
+        self._listeners = []
+        self._prepare_queue = queue.Queue()
+        self._queue = JobQueue.from_config(config)
+        self._offset_written = {}
+        self.jobs = {}
+        self._jobs_lock = threading.Lock()
+        # 디스크 사전 확인: 대기열에 넘긴 작업이 예약한 공간과 공간이 나기를 기다리는 작업
+        self._reserved = {}
+        self._held = []
+        self._space_lock = threading.Lock()
+        
+        # 제목 조회와 자막 요청이 함께 사용하는 HTTP 연결 풀
+        self.governor = RequestGovernor.from_config(
+            config,
+            on_pause=lambda seconds: self.update_status(
+                None, f"요청 오류가 많아 {int(seconds)}초 동안 다운로드를 일시 중지합니다."))
+        self.http = PooledSession.from_config(config, governor=self.governor)
+        self.metadata = MetadataCache.from_config(config)
+        self.store = MediaStore.from_config(config)
+        phase_log = PhaseLog.from_config(config)
+        if phase_log:
+            self.add_listener(phase_log.handle)
+        self.metrics = MetricsRegistry()
+        self.add_listener(self.metrics.handle)
+        self.metrics_server = None
+        self._workers = 0
+        # 프로파일링을 켜지 않으면 None (YTDL_PROFILE 환경 변수 또는 download --profile)
+        self.profiler = JobProfiler.from_environ()
+        self.bandwidth = BandwidthScheduler(config)
+        self.fragments = FragmentConcurrencyController.from_config(config)
+        self.segmented = SegmentedDownloader.from_config(self.http, config)
+        self.transcript_api = YouTubeTranscriptApi(http_client=self.http)
+        self.archive = ResponseArchive.from_config(config)
+        if self.archive:
+            self.transcript_api = ArchivedTranscriptApi(self.transcript_api, self.archive)
+        # 제목 조회 엔드포인트와 yt-dlp 기본 추출기보다 먼저 시도할 추출기 (벤치마크에서 교체)
+        self.oembed_url = OEMBED_URL
+        self.extractors = []
+    
+    def add_listener(self, callback):
+        """이벤트 리스너를 등록합니다.
+        
+        Args:
+            callback (callable): 이벤트 딕셔너리를 인자로 받는 함수
+        """
+        self._listeners.append(callback)
+    
+    def emit(self, **event):
+        """모든 리스너에 이벤트를 전달합니다."""
+        for listener in self._listeners:
+            listener(event)
+    
+    def update_status(self, job_id, message):
+        """상태 메시지 이벤트를 보냅니다.
+        
+        Args:
+            job_id (str): 작업 ID (작업과 무관하면 None)
+            message (str): 상태 메시지
+        """
+        self.emit(type='status', job_id=job_id, message=message)
+    
+    def set_progress(self, job_id, stage, percent):
+        """진행률 이벤트를 보냅니다.
+        
+        Args:
+            job_id (str): 작업 ID
+            stage (str): 단계 이름
+            percent (float): 진행률 (0-100)
+        """
+        self.emit(type='progress', job_id=job_id, stage=stage, percent=percent)
+    
+    def record_phase(self, job, stage, phase, seconds, outcome='ok', **fields):
+        """단계별 소요 시간 이벤트를 보냅니다.
+        
+        Args:
+            job (DownloadJob): 대상 작업
+            stage (str): 작업 단계 ('caption', 'video', 'audio', 준비 중이면 None)
+            phase (str): 세부 단계 이름 (title, metadata, transfer, merge, encode 등)
+            seconds (float): 소요 시간 (단조 시계 기준)
+            outcome (str): 결과 ('ok', 'error', 'interrupted')
+            **fields: 함께 기록할 값 (bytes 등)
+        """
+        self.emit(type='phase', job_id=job.job_id, video_id=job.video_id, stage=stage, phase=phase,
+                  seconds=round(seconds, 3), outcome=outcome, time=time.time(), **fields)
+    
+    @contextlib.contextmanager
+    def timed(self, job, stage, phase, **fields):
+        """블록의 실행 시간을 단조 시계로 재서 phase 이벤트로 보냅니다.
+        
+        블록 안에서 반환된 딕셔너리에 bytes 같은 값을 넣으면 이벤트에 함께 기록됩니다.
+        예외가 발생하면 결과를 'error'(중단이면 'interrupted')로 기록하고 다시 발생시킵니다.
+        
+        Args:
+            job (DownloadJob): 대상 작업
+            stage (str): 작업 단계
+            phase (str): 세부 단계 이름
+            **fields: 함께 기록할 값
+        """
+        start = time.monotonic()
+        outcome = 'ok'
+        try:
+            yield fields
+        except JobInterrupted:
+            outcome = 'interrupted'
+            raise
+        except Exception as e:
+            outcome = 'error'
+            fields['error'] = str(e)
+            raise
+        finally:
+            self.record_phase(job, stage, phase, time.monotonic() - start, outcome, **fields)
+    
+    def archived(self, kind, key, fetch):
+        """응답 보관 파일을 쓰면 응답을 기록하거나 재생하고, 아니면 fetch를 그대로 실행합니다."""
+        if self.archive:
+            return self.archive.call(kind, key, fetch)
+        return fetch()
+    
+    def start(self, workers=None):
+        """저널의 미완료 작업을 대기열에 넣고 작업자 스레드를 시작합니다.
+        
+        Args:
+            workers (int): 작업자 스레드 수 (None이면 설정값 사용)
+            
+        Returns:
+            list: 이어서 진행할 DownloadJob 목록
+        """
+        resumed = []
+        for job in self.journal.incomplete_jobs():
+            with self._jobs_lock:
+                self.jobs[job.job_id] = job
+            self.emit(type='job', job_id=job.job_id, state=job.state, video_id=job.video_id, title=job.title)
+            if job.state == 'queued':
+                resumed.append(job)
+                self._prepare_queue.put((job, job.generation))
+        if resumed:
+            self.update_status(None, f"완료되지 않은 작업 {len(resumed)}개를 이어서 진행합니다.")
+        for _ in range(int(self.config['prepare_workers'])):
+            threading.Thread(target=self._prepare_worker, daemon=True).start()
+        self._workers = workers or int(self.config['max_workers'])
+        for _ in range(self._workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+        threading.Thread(target=self._control_loop, daemon=True).start()
+        if int(self.config['metrics_port']) and self.metrics_server is None:
+            try:
+                self.metrics_server = MetricsServer(self, int(self.config['metrics_port']),
+                                                    self.config['metrics_host']).start()
+                self.update_status(None, f"지표 제공 중: {self.metrics_server.url}")
+            except OSError as e:
+                self.update_status(None, f"지표 서버를 시작하지 못했습니다: {e}")
+        return resumed
+    
+    def metrics_text(self):
+        """엔진의 현재 지표를 Prometheus 텍스트 형식으로 만듭니다.
+        
+        카운터와 히스토그램은 MetricsRegistry에서, 대기열 길이와 속도 같은 게이지와
+        요청 관리자, 메타데이터 캐시의 집계는 지금 값을 읽어 함께 출력합니다.
+        
+        Returns:
+            str: 지표 텍스트
+        """
+        with self._jobs_lock:
+            active = sum(1 for job in self.jobs.values() if job.state == 'running')
+        with self._space_lock:
+            held, reserved = len(self._held), sum(self._reserved.values())
+        gauges = [
+            ('queue_depth', {'queue': 'prepare'}, self._prepare_queue.qsize()),
+            ('queue_depth', {'queue': 'media'}, len(self._queue)),
+            ('queue_depth', {'queue': 'disk_hold'}, held),
+            ('workers', {}, self._workers),
+            ('active_jobs', {}, active),
+            ('bytes_per_second', {}, self.bandwidth.measured_rate()),
+            ('reserved_bytes', {}, reserved),
+        ]
+        gauges += [('job_bytes_per_second', {'job_id': job_id}, rate)
+                   for job_id, rate in self.bandwidth.job_measured_rates().items()]
+        governor = self.governor.snapshot()
+        gauges += [('requests_total', {}, governor.get('requests', 0)),
+                   ('transfers_total', {}, governor.get('transfers', 0)),
+                   ('request_retries_total', {}, governor.get('retries', 0)),
+                   ('request_gave_up_total', {}, governor.get('gave_up', 0)),
+                   ('circuit_opened_total', {}, governor.get('circuit_opened', 0))]
+        gauges += [('request_errors_total', {'type': key[len('error_'):]}, value)
+                   for key, value in governor.items() if key.startswith('error_')]
+        cache = dict(self.metadata.stats)
+        gauges += [('cache_requests_total', {'cache': 'metadata', 'result': 'hit'}, cache.get('hits', 0)),
+                   ('cache_requests_total', {'cache': 'metadata', 'result': 'miss'}, cache.get('misses', 0))]
+        return self.metrics.render(gauges)
+    
+    def job_ids(self):
+        """아직 끝나지 않은 (대기, 실행, 일시 정지) 작업 ID 목록을 반환합니다."""
+        with self._jobs_lock:
+            return list(self.jobs)
+    
+    def capacity(self, prefetch=0):
+        """작업자 수에 비해 더 받을 수 있는 작업 수를 반환합니다.
+        
+        공유 작업 저장소처럼 엔진 밖에서 작업을 가져오는 쪽이 가져갈 수를 정할 때 씁니다.
+        
+        Args:
+            prefetch (int): 작업자 수보다 더 받아 둘 작업 수
+            
+        Returns:
+            int: 작업자 수 + prefetch - 끝나지 않은 작업 수 (0 이상)
+        """
+        with self._jobs_lock:
+            pending = len(self.jobs)
+        return max(0, self._workers + prefetch - pending)
+    
+    def submit(self, url, options, job_id=None):
+        """작업을 저널에 기록하고 대기열에 넣습니다.
+        
+        Args:
+            url (str): YouTube 영상 URL
+            options (dict): 작업 옵션 (DEFAULT_JOB_OPTIONS 참조)
+            job_id (str): 작업 ID (None이면 새로 생성, 공유 작업 저장소의 작업은 저장소의 ID 사용)
+            
+        Returns:
+            DownloadJob: 등록된 작업
+        """
+        options = dict(options)
+        options['download_path'] = options.get('download_path') or self.config['download_path']
+        job = DownloadJob(url, options, job_id=job_id)
+        self.journal.add_job(job)
+        with self._jobs_lock:
+            self.jobs[job.job_id] = job
+        self._prepare_queue.put((job, job.generation))
+        self.emit(type='job', job_id=job.job_id, state=job.state, video_id=job.video_id, title=job.title)
+        return job
+    
+    def submit_batch(self, urls, options):
+        """여러 URL을 한 배치로 묶어 등록합니다.
+        
+        같은 배치의 작업은 fair 정책에서 하나의 공평 분배 단위가 됩니다.
+        
+        Args:
+            urls (list): YouTube 영상 URL 목록
+            options (dict): 작업 옵션 (DEFAULT_JOB_OPTIONS 참조)
+            
+        Returns:
+            list: 등록된 DownloadJob 목록
+        """
+        options = {**options, 'batch': uuid.uuid4().hex[:12]}
+        return [self.submit(url, options) for url in urls]
+    
+    def wait(self):
+        """대기열의 모든 작업이 끝날 때까지 기다립니다."""
+        self._prepare_queue.join()
+        self._queue.join()
+    
+    def _set_state(self, job, state, error=None):
+        """작업 상태를 바꾸고 저널에 기록한 뒤 이벤트를 보냅니다.
+        
+        끝난 작업(done/failed/cancelled)은 관리 목록에서 빼고, 끝나거나 일시 정지된 작업이
+        예약한 디스크 공간은 돌려줍니다.
+        """
+        job.state = state
+        self.journal.set_job_state(job.job_id, state, error)
+        if state in ('done', 'failed', 'cancelled'):
+            with self._jobs_lock:
+                self.jobs.pop(job.job_id, None)
+        self.emit(type='job', job_id=job.job_id, state=state, video_id=job.video_id, title=job.title)
+        if state in ('done', 'failed', 'cancelled', 'paused'):
+            self.release_space(job)
+    
+    def _targets(self, job_id):
+        """제어 대상 작업 목록을 반환합니다 (job_id가 None이면 모든 작업)."""
+        with self._jobs_lock:
+            if job_id is None:
+                return list(self.jobs.values())
+            job = self.jobs.get(job_id)
+            return [job] if job else []
+    
+    def pause(self, job_id=None):
+        """작업을 일시 정지합니다.
+        
+        대기 중인 작업은 바로 일시 정지되고, 실행 중인 작업은 진행률 콜백이나
+        후처리 콜백이 다음에 호출될 때 멈춥니다. 대기 중인 작업은 generation을 늘려
+        대기열에 남은 항목이 재개 후 새로 넣은 항목과 함께 실행되지 않게 합니다.
+        
+        Args:
+            job_id (str): 작업 ID (None이면 모든 작업)
+            
+        Returns:
+            int: 일시 정지를 요청한 작업 수
+        """
+        count = 0
+        for job in self._targets(job_id):
+            if job.state == 'queued':
+                job.generation += 1
+                self._set_state(job, 'paused')
+            elif job.state == 'running' and job.control is None:
+                job.control = 'pause'
+            else:
+                continue
+            count += 1
+        if count:
+            self.update_status(job_id, f"{count}개 작업을 일시 정지합니다.")
+        return count
+    
+    def resume(self, job_id=None):
+        """일시 정지된 작업을 다시 대기열에 넣습니다.
+        
+        아직 멈추지 않은 실행 중인 작업의 일시 정지 요청은 취소됩니다.
+        
+        Args:
+            job_id (str): 작업 ID (None이면 모든 작업)
+            
+        Returns:
+            int: 재개한 작업 수
+        """
+        count = 0
+        for job in self._targets(job_id):
+            if job.state == 'paused':
+                job.control = None
+                self._set_state(job, 'queued')
+                self._prepare_queue.put((job, job.generation))
+            elif job.state == 'running' and job.control == 'pause':
+                job.control = None
+            else:
+                continue
+            count += 1
+        if count:
+            self.update_status(job_id, f"{count}개 작업을 재개합니다.")
+        return count
+    
+    def cancel(self, job_id=None):
+        """작업을 취소합니다.
+        
+        대기 중이거나 일시 정지된 작업은 바로 취소되고, 실행 중인 작업은 진행률 콜백이나
+        후처리 콜백이 다음에 호출될 때 멈춥니다. 설정(keep_partial_on_cancel)에 따라
+        .part 파일을 지웁니다.
+        
+        Args:
+            job_id (str): 작업 ID (None이면 모든 작업)
+            
+        Returns:
+            int: 취소를 요청한 작업 수
+        """
+        count = 0
+        for job in self._targets(job_id):
+            if job.state in ('queued', 'paused'):
+                self._finish_cancel(job)
+            elif job.state == 'running':
+                job.control = 'cancel'
+            else:
+                continue
+            count += 1
+        if count:
+            self.update_status(job_id, f"{count}개 작업을 취소합니다.")
+        return count
+    
+    def _finish_cancel(self, job):
+        """취소된 작업의 상태를 기록하고 설정에 따라 임시 파일을 지웁니다."""
+        if not self.config['keep_partial_on_cancel']:
+            self.remove_partial_files(job)
+        self._set_state(job, 'cancelled')
+    
+    @staticmethod
+    def remove_partial_files(job):
+        """작업이 남긴 이어받기용 임시 파일을 지웁니다.
+        
+        Args:
+            job (DownloadJob): 대상 작업
+            
+        Returns:
+            int: 지운 파일 수
+        """
+        removed = 0
+        for filename in job.partial_files:
+            for suffix in PARTIAL_SUFFIXES:
+                for path in glob.glob(glob.escape(filename + suffix) + '*'):
+                    try:
+                        os.remove(path)
+                        removed += 1
+                    except OSError:
+                        pass
+        return removed
+    
+    def checkpoint(self, job):
+        """처리 대기 중인 제어 요청이 있으면 해당 예외를 발생시킵니다.
+        
+        진행률 콜백, 후처리 콜백, 단계 사이에서 호출됩니다.
+        
+        Args:
+            job (DownloadJob): 실행 중인 작업
+            
+        Raises:
+            JobPaused: 일시 정지 요청이 있을 때
+            JobCancelled: 취소 요청이 있을 때
+        """
+        if job.control is not None:
+            raise JOB_CONTROLS[job.control](job.job_id)
+    
+    def _control_loop(self):
+        """저널에 남은 다른 프로세스의 제어 요청을 주기적으로 적용하는 스레드 함수"""
+        actions = {'pause': self.pause, 'resume': self.resume, 'cancel': self.cancel}
+        while True:
+            for job_id, action in self.journal.take_controls():
+                if action in actions:
+                    actions[action](job_id)
+            time.sleep(self.CONTROL_INTERVAL)
+    
+    def _prepare_worker(self):
+        """준비 대기열에서 작업을 꺼내 자막과 예상 크기를 처리하는 스레드 함수"""
+        while True:
+            job, generation = self._prepare_queue.get()
+            try:
+                self._guarded(job, self.prepare_job, generation)
+            finally:
+                self._prepare_queue.task_done()
+    
+    def _worker(self):
+        """영상/음성 대기열에서 작업을 꺼내 실행하는 작업자 스레드 함수
+        
+        일시 정지되거나 취소된 작업은 작업자를 바로 내놓고 다음 작업을 꺼냅니다.
+        """
+        while True:
+            job = self._queue.get()
+            try:
+                self._guarded(job, self.run_job)
+            finally:
+                self._queue.task_done()
+    
+    def _guarded(self, job, func, generation=None):
+        """대기 중인 작업에 func를 실행하고 중단/오류를 작업 상태로 기록합니다.
+        
+        대기 중에 일시 정지/취소되었거나 이미 다른 스레드가 처리 중인 작업은 건너뜁니다.
+        generation을 넘기면 대기열에 넣은 뒤 일시 정지되었던 항목(재개하면서 새 항목이
+        들어감)도 건너뜁니다.
+        프로파일링 중이면 func를 실행하는 동안 이 스레드를 작업에 대해 프로파일링합니다.
+        """
+        try:
+            if job.state == 'queued' and generation in (None, job.generation):
+                if self.profiler:
+                    with self.profiler.profile(job, func.__name__):
+                        func(job)
+                else:
+                    func(job)
+        except JobPaused:
+            # 멈추기 전에 재개 요청이 들어왔으면 바로 다시 대기열에 넣음
+            resumed = job.control != 'pause'
+            job.control = None
+            self._set_state(job, 'paused')
+            if resumed:
+                self.resume(job.job_id)
+            else:
+                self.update_status(job.job_id, "작업을 일시 정지했습니다.")
+        except JobCancelled:
+            job.control = None
+            self._finish_cancel(job)
+            self.update_status(job.job_id, "작업을 취소했습니다.")
+        except Exception as e:
+            self.metrics.inc('job_errors_total', type=type(e).__name__)
+            self.update_status(job.job_id, f"오류 발생: {str(e)}")
+            self._set_state(job, 'failed', str(e))
+    
+    def media_stages(self, job):
+        """아직 끝나지 않은 영상/음성 단계를 반환합니다."""
+        return [stage for stage in job.selected_stages()
+                if stage != 'caption' and job.stages.get(stage) != 'done']
+    
+    def prepare_job(self, job):
+        """파일명을 정하고 자막을 받은 뒤 예상 크기와 함께 영상/음성 대기열로 넘깁니다.
+        
+        영상/음성 단계가 남아 있지 않으면 작업을 바로 끝냅니다. 디스크 사전 확인을 켜면
+        받기 전에 필요한 공간을 예약하고, 공간이 모자라면 대기시키거나 실패 처리합니다.
+        
+        Args:
+            job (DownloadJob): 준비할 작업
+        """
+        generation = job.generation
+        if not job.title:
+            with self.timed(job, None, 'title'):
+                job.title = self.get_safe_filename(job.url, job.options['title'])
+            self.journal.set_title(job.job_id, job.title)
+        if job.options['caption'] and job.stages.get('caption') != 'done':
+            self.run_stage(job, 'caption')
+        
+        # 저장소에 이미 있는 단계는 받지 않고 연결만 함
+        for stage in self.media_stages(job):
+            if self.link_from_store(job, stage):
+                job.stages[stage] = 'done'
+                self.journal.set_stage(job.job_id, stage, 'done')
+        media = self.media_stages(job)
+        if not media:
+            self.finish_job(job)
+            return
+        if self.config['disk_preflight']:
+            with self.timed(job, None, 'estimate'):
+                estimates = self.estimate_stages(job, media)
+            if estimates is not None:
+                job.estimate = sum(final for final, _ in estimates)
+            if not self.reserve_space(job, estimates):
+                return
+        # 크기를 비교하는 정책에서만 형식 정보를 미리 조회
+        elif job.estimate is None and self._queue.policy in ('sjf', 'fair'):
+            with self.timed(job, None, 'estimate'):
+                job.estimate = self.estimate_size(job, media)
+        # 준비하는 동안 일시 정지/취소된 작업은 넘기지 않음 (재개했으면 새로 준비 중)
+        if job.state == 'queued' and job.generation == generation:
+            job.queued_at = time.monotonic()
+            self._queue.put(job)
+    
+    def estimate_stages(self, job, stages):
+        """선택될 형식의 정보를 조회해 단계별 예상 크기와 최대 사용 공간을 계산합니다.
+        
+        영상과 음성을 따로 받아 합치거나 mp3로 변환하는 단계는 원본과 결과 파일이
+        함께 있는 동안 최종 크기의 disk_overhead_factor배까지 공간을 씁니다.
+        
+        Args:
+            job (DownloadJob): 대상 작업
+            stages (list): 예상할 단계 ('video', 'audio')
+            
+        Returns:
+            list: 단계별 (최종 크기, 최대 사용 공간) (바이트, 조회에 실패하거나
+                크기 정보가 없으면 None)
+        """
+        overhead = float(self.config['disk_overhead_factor'])
+        estimates = []
+        try:
+            for mode in stages:
+                ydl_opts = {
+                    'format': self.format_selector(job, mode),
+                    'logger': DownloadLogger(),
+                    'quiet': True,
+                }
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    info = ydl.process_ie_result(self.fetch_metadata(job), download=False)
+                size = format_size(info)
+                if size is None:
+                    return None
+                size *= clip_fraction(info, job.options['clips'])
+                if mode == 'video':
+                    converts = len(info.get('requested_formats') or []) > 1
+                else:
+                    converts = not job.options['audio_passthrough']
+                estimates.append((size, size * overhead if converts else size))
+        except Exception:
+            return None
+        return estimates
+    
+    def fetch_metadata(self, job, governed=True):
+        """작업 영상의 메타데이터(형식 목록, 자막 목록, 챕터 등)를 캐시를 거쳐 조회합니다.
+        
+        반환한 메타데이터는 YoutubeDL.process_ie_result()에 넘겨 형식을 고르거나
+        다운로드할 수 있습니다.
+        
+        Args:
+            job (DownloadJob): 대상 작업
+            governed (bool): 호스트 슬롯과 재시도를 적용할지 여부 (이미 RequestGovernor.call
+                안에서 호출하면 False)
+            
+        Returns:
+            dict: 메타데이터
+        """
+        host = urlparse(job.url).hostname
+        
+        def extract():
+            ydl_opts = {
+                'proxy': self.config['http_proxy'] or None,
+                'logger': DownloadLogger(),
+                'quiet': True,
+            }
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                ie_key = None
+                for extractor in self.extractors:
+                    if extractor.suitable(job.url):
+                        ydl.add_info_extractor(extractor())
+                        ie_key = extractor.ie_key()
+                        break
+                info = ydl.extract_info(job.url, download=False, process=False, ie_key=ie_key)
+            return yt_dlp.YoutubeDL.sanitize_info(info, remove_private_keys=True)
+        
+        def archived_extract():
+            return self.archived('metadata', job.video_id or job.url, extract)
+        
+        def fetch():
+            timing['cached'] = False
+            if governed:
+                return self.governor.call(host, archived_extract, classify_ydl_error)
+            return archived_extract()
+        
+        with self.timed(job, None, 'metadata', cached=True) as timing:
+            return self.metadata.get(job.video_id or job.url, fetch)
+    
+    def estimate_size(self, job, stages):
+        """선택될 형식의 정보를 조회해 남은 단계의 예상 크기를 계산합니다.
+        
+        Args:
+            job (DownloadJob): 대상 작업
+            stages (list): 예상할 단계 ('video', 'audio')
+            
+        Returns:
+            int: 예상 크기 (바이트, 조회에 실패하거나 크기 정보가 없으면 None)
+        """
+        estimates = self.estimate_stages(job, stages)
+        if estimates is None:
+            return None
+        return sum(final for final, _ in estimates)
+    
+    def plan_job(self, job, rate, window):
+        """메타데이터만 조회해 작업이 받을 형식, 예상 크기, 자막 여부를 계산합니다.
+        
+        미디어는 받지 않습니다. 다운로드 단계와 같은 방법으로 형식을 고르며, 자동 해상도는
+        rate로 window초 안에 받을 수 있는 가장 높은 해상도를 고릅니다.
+        
+        Args:
+            job (DownloadJob): 대상 작업 (저널에 기록하지 않은 작업)
+            rate (float): 이 작업이 쓸 수 있는 전송 속도 (초당 바이트)
+            window (float): 자동 해상도에서 이 작업에 주어진 시간 (초)
+            
+        Returns:
+            dict: 작업 계획 (단계별 형식 ID와 예상 크기, 언어별 자막 종류 등)
+        """
+        info = self.fetch_metadata(job)
+        fraction = clip_fraction(info, job.options['clips'])
+        captions = caption_availability(info)
+        wanted = {'한국어': ['ko'], '영어': ['en'], '모든 언어': ['ko', 'en']}[job.options['language']]
+        plan = {
+            'url': job.url,
+            'video_id': info.get('id') or job.video_id,
+            'title': info.get('title'),
+            'duration': info.get('duration'),
+            'clip_fraction': round(fraction, 3),
+            'captions': captions,
+            'caption': bool(job.options['caption']) and any(lang in captions for lang in wanted),
+            'stages': {},
+        }
+        for mode in self.media_stages(job):
+            ydl_ref, decision = [], {}
+            
+            def select(ctx):
+                ydl = ydl_ref[0]
+                if job.options['resolution'] == AUTO_RESOLUTION:
+                    height, _ = self.height_for_budget(ctx, ydl, rate * window / fraction)
+                else:
+                    height = int(job.options['resolution'].replace('p', ''))
+                decision.update(self.video_format_decision(ctx, ydl, height)
+                                or {'format': f"bv*[height<={height}]+ba/b[height<={height}]"})
+                return ydl.build_format_selector(decision['format'])(ctx)
+            
+            ydl_opts = {
+                'format': select if mode == 'video' else self.format_selector(job, mode),
+                'merge_output_format': 'mp4',
+                'logger': DownloadLogger(),
+                'quiet': True,
+            }
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                ydl_ref.append(ydl)
+                selected = ydl.process_ie_result(copy.deepcopy(info), download=False)
+            size = format_size(selected)
+            stage = {
+                'format': selected['format_id'],
+                'merge': len(selected.get('requested_formats') or []) > 1,
+                'resolution': selected.get('resolution'),
+                'ext': selected.get('ext'),
+                'bytes': int(size * fraction) if size is not None else None,
+            }
+            if mode == 'video':
+                stage['reason'] = decision.get('reason')
+            elif not job.options['audio_passthrough']:
+                stage['ext'] = 'mp3'
+            plan['stages'][mode] = stage
+        sizes = [stage['bytes'] for stage in plan['stages'].values()]
+        plan['bytes'] = sum(size for size in sizes if size is not None)
+        plan['unknown_size'] = None in sizes
+        return plan
+    
+    def staging_path(self, job):
+        """작업의 임시 파일을 쓸 폴더를 반환합니다."""
+        return self.config['staging_path'] or job.options['download_path']
+    
+    def space_needs(self, job, estimates):
+        """단계별 예상 크기로 볼륨별 필요 공간을 계산합니다.
+        
+        단계는 차례로 실행되므로 임시 폴더에는 가장 큰 단계의 최대 사용 공간이,
+        저장 폴더에는 모든 단계의 최종 크기가 필요합니다. 두 폴더가 같은 볼륨이면
+        최종 크기의 합에 가장 큰 단계의 추가 사용 공간을 더합니다.
+        
+        Args:
+            job (DownloadJob): 대상 작업
+            estimates (list): estimate_stages()가 반환한 단계별 (최종 크기, 최대 사용 공간)
+            
+        Returns:
+            dict: 볼륨 번호 -> (폴더 경로, 필요 공간)
+        """
+        destination = job.options['download_path']
+        staging = self.staging_path(job)
+        finals = sum(final for final, _ in estimates)
+        extra = max(peak - final for final, peak in estimates)
+        if volume_id(staging) == volume_id(destination):
+            return {volume_id(destination): (destination, finals + extra)}
+        return {volume_id(staging): (staging, max(peak for _, peak in estimates)),
+                volume_id(destination): (destination, finals)}
+    
+    def check_space(self, needs):
+        """필요 공간을 볼륨의 여유 공간과 다른 작업의 예약 공간과 비교합니다.
+        
+        _space_lock을 잡은 상태에서 호출해야 합니다.
+        
+        Args:
+            needs (dict): space_needs()가 반환한 볼륨별 필요 공간
+            
+        Returns:
+            tuple: (판정, 메시지) 판정은 'ok', 'hold'(다른 작업이 끝나면 다시 확인),
+                'reject'(다른 작업이 없어도 공간 부족) 중 하나
+        """
+        margin = parse_rate(self.config['disk_reserve'])
+        verdict, message = 'ok', None
+        for volume, (path, need) in needs.items():
+            free = disk_free(path) - margin
+            reserved = sum(other[volume][1] for other in self._reserved.values() if volume in other)
+            if need <= free - reserved:
+                continue
+            mb = 1024 * 1024
+            message = (f"디스크 공간 부족 ({existing_dir(path)}): 필요 {need / mb:.0f}MB, "
+                       f"여유 {max(free, 0) / mb:.0f}MB, 대기열 예약 {reserved / mb:.0f}MB")
+            # 여유 공간 자체가 모자라도 예약한 작업이 임시 파일을 지우면 공간이 날 수 있음
+            verdict = 'hold' if reserved else 'reject'
+            if verdict == 'reject':
+                break
+        return verdict, message
+    
+    def reserve_space(self, job, estimates):
+        """작업이 쓸 디스크 공간을 예약합니다.
+        
+        공간이 있으면 예약하고 True를 반환합니다. 대기열에 넘긴 작업의 예약 때문에
+        모자라면 작업을 대기 목록에 넣고, 다른 작업의 예약이 없는데도 모자라면 작업을
+        실패 처리합니다. 예상 크기를 알 수 없으면 확인하지 않고 통과시킵니다.
+        
+        Args:
+            job (DownloadJob): 대상 작업
+            estimates (list): estimate_stages()가 반환한 단계별 크기 (None이면 알 수 없음)
+            
+        Returns:
+            bool: 대기열에 넘길 수 있으면 True
+        """
+        if estimates is None:
+            self.update_status(job.job_id, "예상 크기를 알 수 없어 디스크 공간을 확인하지 않습니다.")
+            return True
+        needs = self.space_needs(job, estimates)
+        with self._space_lock:
+            if job.state != 'queued':
+                return False
+            verdict, message = self.check_space(needs)
+            if verdict == 'ok':
+                self._reserved[job.job_id] = needs
+            elif verdict == 'hold':
+                self._held.append((job, needs))
+        if verdict == 'hold':
+            self.update_status(job.job_id, f"{message} - 다른 작업이 끝날 때까지 기다립니다.")
+        elif verdict == 'reject':
+            self.update_status(job.job_id, message)
+            self._set_state(job, 'failed', message)
+        return verdict == 'ok'
+    
+    def release_space(self, job):
+        """작업의 예약 공간을 돌려주고 기다리던 작업을 다시 확인합니다.
+        
+        기다리던 작업은 필요 공간이 작은 순서로 확인하므로, 큰 작업이 공간을 기다리는
+        동안 들어갈 수 있는 작은 작업이 먼저 대기열로 넘어갑니다.
+        
+        Args:
+            job (DownloadJob): 끝나거나 일시 정지된 작업
+        """
+        admitted, rejected = [], []
+        with self._space_lock:
+            if self._reserved.pop(job.job_id, None) is None and not self._held:
+                return
+            held = sorted((item for item in self._held if item[0].state == 'queued'),
+                          key=lambda item: sum(need for _, need in item[1].values()))
+            self._held = []
+            for waiting, needs in held:
+                verdict, message = self.check_space(needs)
+                if verdict == 'ok':
+                    self._reserved[waiting.job_id] = needs
+                    admitted.append(waiting)
+                elif verdict == 'hold':
+                    self._held.append((waiting, needs))
+                else:
+                    rejected.append((waiting, message))
+        for waiting in admitted:
+            self.update_status(waiting.job_id, "디스크 공간을 확보해 대기열에 넣습니다.")
+            waiting.queued_at = time.monotonic()
+            self._queue.put(waiting)
+        for waiting, message in rejected:
+            self.update_status(waiting.job_id, message)
+            self._set_state(waiting, 'failed', message)
+    
+    def run_stage(self, job, stage):
+        """작업의 단계 하나를 실행하고 결과를 저널에 기록합니다.
+        
+        Args:
+            job (DownloadJob): 실행할 작업
+            stage (str): 단계 이름
+            
+        Returns:
+            bool: 단계 성공 여부
+        """
+        self.checkpoint(job)
+        if stage in job.offsets:
+            downloaded = job.offsets[stage][1]
+            self.update_status(job.job_id, f"{STAGE_LABELS[stage]} 이어받기 "
+                                           f"({downloaded // (1024 * 1024)}MB 지점부터)")
+        self.journal.set_stage(job.job_id, stage, 'running')
+        start = time.monotonic()
+        if stage == 'caption':
+            ok = self.download_caption(job)
+        else:
+            # 대기하는 동안 같은 파일을 다른 작업이 받았을 수 있음
+            ok = self.link_from_store(job, stage) or self.download_video_audio(job, stage)
+        self.record_phase(job, stage, 'stage', time.monotonic() - start, 'ok' if ok else 'error')
+        job.stages[stage] = 'done' if ok else 'failed'
+        self.journal.set_stage(job.job_id, stage, job.stages[stage])
+        return ok
+    
+    def link_from_store(self, job, stage):
+        """저장소에 같은 결과 파일이 있으면 받지 않고 저장 폴더에 이름만 만듭니다.
+        
+        Args:
+            job (DownloadJob): 대상 작업
+            stage (str): 단계 이름 ('video' 또는 'audio')
+            
+        Returns:
+            bool: 저장소의 파일을 연결했으면 True
+        """
+        variant = self.store and self.store.variant(job, stage)
+        if not variant:
+            return False
+        found = self.store.lookup(job.video_id, stage, variant)
+        self.metrics.inc('cache_requests_total', cache='media_store', result='hit' if found else 'miss')
+        if not found:
+            return False
+        digest, ext, size = found
+        path = os.path.join(job.options['download_path'], f"{job.title}.{ext}")
+        os.makedirs(job.options['download_path'], exist_ok=True)
+        self.store.link(digest, ext, path)
+        if self.config['integrity_hashes']:
+            HashIndex.record(path, digest, size)
+        self.set_progress(job.job_id, stage, 100)
+        self.update_status(job.job_id, f"{STAGE_LABELS[stage]}: 저장소에 있는 파일을 연결했습니다 ({os.path.basename(path)})")
+        return True
+    
+    def run_job(self, job):
+        """작업의 남은 영상/음성 단계를 차례로 실행합니다.
+        
+        저널에 완료로 기록된 단계는 다시 받지 않고 건너뜁니다.
+        
+        Args:
+            job (DownloadJob): 실행할 작업
+        """
+        self._set_state(job, 'running')
+        job.started_at = time.time()
+        if job.queued_at is not None:
+            self.record_phase(job, None, 'queue', time.monotonic() - job.queued_at)
+        for stage in self.media_stages(job):
+            self.run_stage(job, stage)
+        self.finish_job(job)
+    
+    def finish_job(self, job):
+        """단계별 결과로 최종 메시지를 보내고 작업 상태를 기록합니다.
+        
+        Args:
+            job (DownloadJob): 끝난 작업
+        """
+        # 다운로드 성공 여부를 추적하는 변수
+        success = {stage: job.stages.get(stage) == 'done' for stage in job.selected_stages()}
+        for stage, ok in success.items():
+            if ok:
+                self.set_progress(job.job_id, stage, 100)
+        
+        # 자막만 선택했고 다운로드에 실패한 경우 최종 메시지를 출력하지 않음
+        only_caption_failed = success.keys() == {'caption'} and not success['caption']
+        if not only_caption_failed:
+            if all(success.values()):
+                self.update_status(job.job_id, "모든 다운로드가 완료되었습니다!")
+            elif any(ok for stage, ok in success.items() if stage != 'caption'):
+                # 자막 이외의 것이 선택되었고 실패하지 않았다면 일부 완료 메시지 표시
+                self.update_status(job.job_id, "일부 다운로드가 완료되었습니다.")
+        
+        self._set_state(job, 'done' if all(success.values()) else 'failed')
+    
+    def get_safe_filename(self, url, title=''):
+        """안전한 파일명을 생성합니다.
+        
+        다음 우선순위로 파일명을 결정합니다:
+        1. 사용자가 입력한 제목
+        2. YouTube 영상의 원제목
+        3. 날짜_시간 형식의 자동 생성 이름
+        
+        Args:
+            url (str): YouTube 영상 URL
+            title (str): 사용자가 입력한 제목
+            
+        Returns:
+            str: 사용할 파일명
+        """
+        if title and title.strip():
+            return title.strip()
+        
+        try:
+            return self.archived('title', url, lambda: fetch_video_title(self.http, url, self.oembed_url))
+        except Exception:
+            current_time = datetime.now().strftime('%y%m%d_%H%M')
+            return f"download_{current_time}"
+
+    def extract_percent(self, percent_str):
+        """진행률 문자열에서 숫자만 추출합니다.
+        
+        ANSI 색상 코드와 기타 문자를 제거하고 숫자만 추출합니다.
+        
+        Args:
+            percent_str (str): 진행률 문자열
+            
+        Returns:
+            float: 추출된 진행률 값 (0-100)
+        """
+        clean_str = re.sub(r'\x1b\[[0-9;]*m', '', percent_str)
+        clean_str = re.sub(r'[^\d.]', '', clean_str)
+        try:
+            return float(clean_str)
+        except ValueError:
+            return 0.0
+
+    def format_time(self, seconds):
+        """초 단위 시간을 자막 시간 형식으로 변환합니다.
+        
+        SRT 형식의 시간 표시(HH:MM:SS,mmm)로 변환합니다.
+        
+        Args:
+            seconds (float): 초 단위 시간
+            
+        Returns:
+            str: 변환된 시간 문자열 (HH:MM:SS,mmm 형식)
+        """
+        hours, remainder = divmod(seconds, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        milliseconds = int((seconds - int(seconds)) * 1000)
+        return f"{int(hours):02}:{int(minutes):02}:{int(seconds):02},{milliseconds:03}"
+
+    def report_fragment_retry(self, job_id):
+        """조각 재시도를 동시 조각 수 조절기와 지표에 기록합니다."""
+        self.fragments.report_retry(job_id)
+        self.metrics.inc('fragment_retries_total')
+    
+    def progress_hook(self, job, mode, timings=None):
+        """다운로드 진행률 업데이트를 처리하는 콜백 함수를 반환합니다.
+        
+        yt-dlp의 progress_hooks에서 사용되며, 다운로드 진행 상황을
+        진행률 이벤트로 보내고 대역폭 스케줄러로 속도를 제한합니다.
+        .part 경로와 받은 바이트 수는 OFFSET_INTERVAL마다 저널에 기록하고,
+        일시 정지나 취소 요청이 있으면 예외를 발생시켜 다운로드를 멈춥니다.
+        
+        Args:
+            job (DownloadJob): 다운로드 중인 작업
+            mode (str): 다운로드 모드 ('video' 또는 'audio')
+            timings (dict): 받은 파일별 크기를 기록할 딕셔너리 ('files' 키 사용)
+            
+        Returns:
+            function: 진행률 업데이트 콜백 함수
+        """
+        key = (job.job_id, mode)
+        
+        def hook(d):
+            if d.get('filename'):
+                job.partial_files.add(d['filename'])
+            self.checkpoint(job)
+            self.fragments.observe(job.job_id, d)
+            if d['status'] == 'downloading':
+                self.metrics.inc('downloaded_bytes_total', self.bandwidth.consume_progress(job.job_id, d))
+                self.set_progress(job.job_id, mode, self.extract_percent(d['_percent_str']))
+                now = time.monotonic()
+                if now - self._offset_written.get(key, 0) >= self.OFFSET_INTERVAL:
+                    self._offset_written[key] = now
+                    self.journal.record_offset(
+                        job.job_id, mode, d.get('tmpfilename'), d.get('downloaded_bytes'),
+                        d.get('total_bytes') or d.get('total_bytes_estimate'))
+            elif d['status'] == 'finished':
+                self.set_progress(job.job_id, mode, 100)
+                if timings is not None:
+                    timings['files'][d.get('filename')] = d.get('total_bytes') or d.get('downloaded_bytes') or 0
+        return hook
+    
+    def postprocessor_hook(self, job, mode, timings=None):
+        """후처리(병합, mp3 변환) 단계의 콜백 함수를 반환합니다.
+        
+        후처리기가 시작될 때 일시 정지나 취소 요청을 확인합니다. 이미 실행 중인
+        ffmpeg는 끝날 때까지 기다리며, 재개하면 yt-dlp가 받은 파일을 다시 받지 않고
+        후처리만 다시 수행합니다. 후처리기마다 소요 시간을 phase 이벤트로 보냅니다.
+        
+        Args:
+            job (DownloadJob): 다운로드 중인 작업
+            mode (str): 다운로드 모드 ('video' 또는 'audio')
+            timings (dict): 후처리에 쓴 시간을 더할 딕셔너리 ('postprocess' 키 사용)
+            
+        Returns:
+            function: 후처리 콜백 함수
+        """
+        started = {}
+        
+        def hook(d):
+            name = d['postprocessor']
+            if d['status'] == 'started':
+                started[name] = time.monotonic()
+                self.checkpoint(job)
+                self.update_status(job.job_id, f"{STAGE_LABELS[mode]} 후처리 중... ({name})")
+            elif d['status'] == 'finished' and name in started:
+                seconds = time.monotonic() - started.pop(name)
+                if timings is not None:
+                    timings['postprocess'] += seconds
+                self.record_phase(job, mode, POSTPROCESSOR_PHASES.get(name, name.lower()), seconds)
+        return hook
+
+    def save_caption_to_file(self, transcript_data, file_path, is_srt, suffix):
+        """자막 데이터를 파일로 저장합니다.
+        
+        Args:
+            transcript_data (list): 자막 데이터 목록
+            file_path (str): 저장할 파일 경로 (확장자 제외)
+            is_srt (bool): True면 SRT 형식, False면 TXT 형식으로 저장
+            suffix (str): 파일명에 추가할 접미사 (예: "_kr" 또는 "_en")
+        """
+        file_ext = 'srt' if is_srt else 'txt'
+        full_path = f"{file_path}{suffix}.{file_ext}"
+        
+        lines = []
+        if is_srt:
+            for i, entry in enumerate(transcript_data):
+                start = entry['start']
+                duration = entry.get('duration', 0)
+                end = start + duration
+                text = entry['text'].replace('\n', ' ')
+                lines.append(f"{i + 1}\n{self.format_time(start)} --> {self.format_time(end)}\n{text}\n\n")
+        else:
+            for entry in transcript_data:
+                lines.append(entry['text'] + '\n')
+        
+        # 쓰는 내용으로 해시를 계산해 파일을 다시 읽지 않음 (줄바꿈은 텍스트 모드와 같게 변환)
+        data = ''.join(lines).replace('\n', os.linesep).encode('utf-8')
+        with open(full_path, 'wb') as file:
+            file.write(data)
+        if self.config['integrity_hashes']:
+            HashIndex.record(full_path, hashlib.sha256(data).hexdigest(), len(data))
+        
+        return full_path
+
+    def download_caption(self, job):
+        """자막을 다운로드하고 파일로 저장합니다.
+        
+        선택한 언어에 따라 자막을 다운로드하고 요청한 포맷으로 저장합니다.
+        
+        Args:
+            job (DownloadJob): 다운로드할 작업
+            
+        Returns:
+            bool: 자막 다운로드 성공 여부
+        """
+        is_srt = job.options['srt']
+        try:
+            self.update_status(job.job_id, "자막 다운로드 중...")
+            with self.timed(job, 'caption', 'caption_list'):
+                available_transcripts = self.transcript_api.list(job.video_id)
+            selected_language = job.options['language']
+            file_path = os.path.join(job.options['download_path'], job.title)
+            
+            # 다운로드된 자막 추적
+            downloaded_subtitles = []
+            
+            # 한국어 자막 다운로드 시도
+            self.checkpoint(job)
+            if selected_language in ["한국어", "모든 언어"]:
+                try:
+                    ko_transcript = available_transcripts.find_transcript(['ko'])
+                    with self.timed(job, 'caption', 'caption_fetch', language='ko') as timing:
+                        ko_data = ko_transcript.fetch().to_raw_data()
+                        timing['bytes'] = os.path.getsize(
+                            self.save_caption_to_file(ko_data, file_path, is_srt, "_kr"))
+                    downloaded_subtitles.append("한국어")
+                except Exception:
+                    if selected_language == "한국어":
+                        self.update_status(job.job_id, "한국어 자막이 없어 다운로드 하지 못했습니다.")
+            
+            # 영어 자막 다운로드 시도
+            self.checkpoint(job)
+            if selected_language in ["영어", "모든 언어"]:
+                try:
+                    en_transcript = available_transcripts.find_transcript(['en'])
+                    with self.timed(job, 'caption', 'caption_fetch', language='en') as timing:
+                        en_data = en_transcript.fetch().to_raw_data()
+                        timing['bytes'] = os.path.getsize(
+                            self.save_caption_to_file(en_data, file_path, is_srt, "_en"))
+                    downloaded_subtitles.append("영어")
+                except Exception:
+                    # 영어 자막 없을 때 자동 생성 영어 자막 시도
+                    try:
+                        auto_en_transcript = available_transcripts.find_generated_transcript(['en'])
+                        with self.timed(job, 'caption', 'caption_fetch', language='en-auto') as timing:
+                            auto_en_data = auto_en_transcript.fetch().to_raw_data()
+                            timing['bytes'] = os.path.getsize(
+                                self.save_caption_to_file(auto_en_data, file_path, is_srt, "_auto_en"))
+                        downloaded_subtitles.append("영어 자동생성")
+                    except Exception:
+                        if selected_language == "영어":
+                            self.update_status(job.job_id, "영어 자막이 없어 다운로드 하지 못했습니다.")
+            
+            # 다운로드 결과 메시지 표시
+            if downloaded_subtitles:
+                if len(downloaded_subtitles) == 1:
+                    self.update_status(job.job_id, f"{downloaded_subtitles[0]} 자막 다운로드 완료")
+                else:
+                    self.update_status(job.job_id, f"{' 및 '.join(downloaded_subtitles)} 자막 다운로드 완료")
+                self.set_progress(job.job_id, 'caption', 100)
+                return True
+            elif selected_language == "모든 언어":
+                self.update_status(job.job_id, "자막을 찾을 수 없어 다운로드 하지 못했습니다.")
+                self.set_progress(job.job_id, 'caption', 0)
+                return False
+            else:
+                self.set_progress(job.job_id, 'caption', 0)
+                return False
+
+        except JobInterrupted:
+            raise
+        except Exception as e:
+            error_msg = str(e)
+            self.update_status(job.job_id, f"자막 다운로드 실패: {error_msg}")
+            self.set_progress(job.job_id, 'caption', 0)
+            return False
+
+    @staticmethod
+    def format_selector(job, mode):
+        """yt-dlp 형식 선택 문자열을 반환합니다.
+        
+        자동 해상도는 AUTO_MAX_HEIGHT를 상한으로 사용합니다 (크기 예상용).
+        
+        Args:
+            job (DownloadJob): 대상 작업
+            mode (str): 다운로드 모드 ('video' 또는 'audio')
+            
+        Returns:
+            str: 형식 선택 문자열
+        """
+        if mode == 'audio':
+            return 'bestaudio/best'
+        if job.options['resolution'] == AUTO_RESOLUTION:
+            resolution = AUTO_MAX_HEIGHT
+        else:
+            resolution = job.options['resolution'].replace('p', '')
+        return f"bv*[height<={resolution}]+ba/b[height<={resolution}]"
+    
+    def deadline_budget(self, job):
+        """작업의 남은 시간과 그 시간 동안 회선을 나눠 쓸 작업 수를 계산합니다.
+        
+        배치 마감이 있으면 같은 마감의 끝나지 않은 작업 수, 작업별 마감(또는 기본 마감)이면
+        1을 나눠 쓸 작업 수로 보고, 동시에 실행 중인 작업 수보다 작지 않게 합니다.
+        
+        Args:
+            job (DownloadJob): 대상 작업
+            
+        Returns:
+            tuple: (남은 시간(초), 회선을 나눠 쓸 작업 수)
+        """
+        now = time.time()
+        with self._jobs_lock:
+            jobs = list(self.jobs.values())
+        running = sum(1 for other in jobs if other.state == 'running')
+        deadline = job.options.get('deadline')
+        if deadline:
+            sharers = sum(1 for other in jobs
+                          if other.options.get('deadline') == deadline
+                          and other.state in ('queued', 'running') and self.media_stages(other))
+        else:
+            limit = parse_duration(job.options.get('job_deadline')
+                                   or self.config['auto_resolution_deadline'])
+            deadline = (job.started_at or now) + limit
+            sharers = 1
+        return deadline - now, max(sharers, running, 1)
+    
+    @staticmethod
+    def height_for_budget(ctx, ydl, budget):
+        """바이트 예산 안에 받을 수 있는 가장 높은 해상도를 고릅니다.
+        
+        높은 해상도부터 yt-dlp가 고를 형식의 크기(filesize, 없으면 tbr로 계산한
+        filesize_approx)를 확인해 예산 안에 드는 첫 해상도를 고르고, 모두 넘으면
+        가장 낮은 해상도를 고릅니다.
+        
+        Args:
+            ctx (dict): yt-dlp 형식 선택 함수의 인자 ({'formats': [...], ...})
+            ydl (yt_dlp.YoutubeDL): 형식 선택에 사용할 YoutubeDL
+            budget (float): 받을 수 있는 바이트 수
+            
+        Returns:
+            tuple: (최대 높이, 그 해상도의 예상 크기 (모르면 None))
+        """
+        heights = sorted({fmt['height'] for fmt in ctx['formats']
+                          if fmt.get('height') and fmt.get('vcodec') != 'none'
+                          and fmt['height'] <= AUTO_MAX_HEIGHT}, reverse=True)
+        if not heights:
+            return AUTO_MAX_HEIGHT, None
+        chosen, size = heights[-1], None
+        for height in heights:
+            selected = list(ydl.build_format_selector(
+                f"bv*[height<={height}]+ba/b[height<={height}]")(dict(ctx)))
+            size = format_size(selected[0]) if selected else None
+            if size is not None and size <= budget:
+                chosen = height
+                break
+        return chosen, size
+    
+    def choose_height(self, job, ctx, ydl):
+        """측정한 회선 속도와 마감으로 받을 수 있는 가장 높은 해상도를 고릅니다.
+        
+        영상 단계를 시작할 때마다 새로 고르므로 속도가 떨어지면 대기열에 남은 작업은
+        낮은 해상도로 받습니다. 이어받는 작업은 .part 파일을 그대로 쓰도록 처음 고른
+        해상도를 유지합니다.
+        
+        Args:
+            job (DownloadJob): 대상 작업
+            ctx (dict): yt-dlp 형식 선택 함수의 인자 ({'formats': [...], ...})
+            ydl (yt_dlp.YoutubeDL): 형식 선택에 사용할 YoutubeDL
+            
+        Returns:
+            int: 최대 높이
+        """
+        if job.options.get('auto_height') and 'video' in job.offsets:
+            return job.options['auto_height']
+        
+        rate = self.bandwidth.measured_rate() or parse_rate(self.config['assumed_throughput'])
+        limit = self.bandwidth.global_limit()
+        if limit:
+            rate = min(rate, limit)
+        time_left, sharers = self.deadline_budget(job)
+        # 구간만 받으면 형식 크기 중 그 비율만큼만 전송됨
+        budget = rate * max(time_left, 0) / sharers / job.clip_fraction
+        
+        chosen, size = self.height_for_budget(ctx, ydl, budget)
+        job.options['auto_height'] = chosen
+        self.journal.set_options(job.job_id, job.options)
+        size_text = f"{size / (1024 * 1024):.0f}MB" if size else "알 수 없음"
+        self.update_status(job.job_id, f"자동 해상도: {chosen}p (측정 속도 {format_rate(rate)}, "
+                                       f"남은 시간 {int(time_left)}초, 예상 크기 {size_text})")
+        return chosen
+    
+    def video_format_decision(self, ctx, ydl, height):
+        """영상과 음성이 함께 든 형식과 따로 받아 합치는 형식 중 비용이 적은 쪽을 고릅니다.
+        
+        합치는 경로는 두 형식을 받은 뒤 ffmpeg로 다시 써야 하므로 받을 바이트에 병합
+        결과 크기 × merge_cost_factor를 더해 비용으로 봅니다. 함께 든 형식의 영상 품질
+        (높이, 프레임 수, 코덱 계열)이 합칠 영상과 같거나 높으면 비용이 더 크지 않은 한
+        병합 없이 받고, 낮으면 합치는 경로를 고릅니다.
+        
+        Args:
+            ctx (dict): yt-dlp 형식 선택 함수의 인자 ({'formats': [...], ...})
+            ydl (yt_dlp.YoutubeDL): 형식 선택에 사용할 YoutubeDL
+            height (int): 최대 높이
+            
+        Returns:
+            dict: 고른 형식 ID(format)와 비교 내용 (고를 수 있는 형식이 없으면 None)
+        """
+        muxed = list(ydl.build_format_selector(f"b[height<={height}]")(dict(ctx)))
+        merged = list(ydl.build_format_selector(f"bv[height<={height}]+ba")(dict(ctx)))
+        if not muxed and not merged:
+            return None
+        
+        factor = float(self.config['merge_cost_factor'])
+        muxed_cost = format_size(muxed[0]) if muxed else None
+        merged_cost = None
+        if merged:
+            merged_size = format_size(merged[0])
+            if merged_size is not None:
+                merged_cost = merged_size * (1 + factor)
+        
+        if not merged:
+            chosen, reason = muxed[0], "합칠 형식 없음"
+        elif not muxed:
+            chosen, reason = merged[0], "함께 든 형식 없음"
+        else:
+            video = merged[0]['requested_formats'][0]
+            muxed_quality, merged_quality = video_quality(muxed[0]), video_quality(video)
+            if muxed_quality[:2] > merged_quality[:2]:
+                chosen, reason = muxed[0], "함께 든 형식의 화질이 더 높음"
+            elif muxed_quality != merged_quality:
+                chosen, reason = merged[0], "합치는 형식의 화질이 더 높음"
+            elif muxed_cost is not None and merged_cost is not None and muxed_cost > merged_cost:
+                chosen, reason = merged[0], "같은 화질에서 병합 비용 포함해도 더 적음"
+            else:
+                chosen, reason = muxed[0], "같은 화질, 병합 없이 받음"
+        return {
+            'format': chosen['format_id'],
+            'merge': 'requested_formats' in chosen,
+            'muxed': muxed[0]['format_id'] if muxed else None,
+            'muxed_cost': muxed_cost,
+            'merged': merged[0]['format_id'] if merged else None,
+            'merged_cost': merged_cost,
+            'reason': reason,
+        }
+    
+    def choose_video_format(self, job, ctx, ydl, height):
+        """작업의 영상 형식을 고르고 결과를 알립니다.
+        
+        고른 결과(video_format_decision() 참조)는 상태 메시지로 알리고 작업 옵션에 기록해
+        이어받을 때 같은 형식을 사용합니다.
+        
+        Args:
+            job (DownloadJob): 대상 작업
+            ctx (dict): yt-dlp 형식 선택 함수의 인자 ({'formats': [...], ...})
+            ydl (yt_dlp.YoutubeDL): 형식 선택에 사용할 YoutubeDL
+            height (int): 최대 높이
+            
+        Returns:
+            str: 형식 선택 문자열 (형식 ID)
+        """
+        if job.options.get('video_format') and 'video' in job.offsets:
+            return job.options['video_format']
+        decision = self.video_format_decision(ctx, ydl, height)
+        if decision is None:
+            return f"bv*[height<={height}]+ba/b[height<={height}]"
+        
+        def size_text(cost):
+            return f"{cost / (1024 * 1024):.0f}MB" if cost is not None else "알 수 없음"
+        
+        job.options['video_format'] = decision['format']
+        job.options['format_decision'] = decision
+        self.journal.set_options(job.job_id, job.options)
+        self.update_status(job.job_id, f"형식 선택: {decision['format']} ({decision['reason']}; "
+                                       f"함께 든 형식 {decision['muxed'] or '-'} {size_text(decision['muxed_cost'])}, "
+                                       f"합치는 형식 {decision['merged'] or '-'} {size_text(decision['merged_cost'])})")
+        return decision['format']
+    
+    def video_format(self, job, ydl_ref):
+        """영상 단계의 yt-dlp 형식 선택 함수를 반환합니다.
+        
+        yt-dlp는 format 옵션에 함수를 받으면 형식 정보를 조회한 뒤 호출하므로,
+        실제 형식 목록을 보고 해상도(자동 해상도일 때)와 병합 여부를 고를 수 있습니다.
+        
+        Args:
+            job (DownloadJob): 대상 작업
+            ydl_ref (list): 생성된 YoutubeDL을 담을 리스트 (함수가 만들어진 뒤에 채워짐)
+            
+        Returns:
+            function: 형식 선택 함수
+        """
+        chosen = []
+        
+        def select(ctx):
+            # 다운로드할 때 형식을 다시 고르더라도 처음 고른 형식을 유지
+            ydl = ydl_ref[0]
+            if not chosen:
+                if job.options['resolution'] == AUTO_RESOLUTION:
+                    height = self.choose_height(job, ctx, ydl)
+                else:
+                    height = int(job.options['resolution'].replace('p', ''))
+                chosen.append(self.choose_video_format(job, ctx, ydl, height))
+            return ydl.build_format_selector(chosen[0])(ctx)
+        return select
+
+    def download_video_audio(self, job, mode):
+        """영상 또는 음성을 다운로드합니다.
+        
+        yt-dlp를 사용하여 고품질의 영상 또는 음성을 다운로드합니다.
+        
+        Args:
+            job (DownloadJob): 다운로드할 작업
+            mode (str): 다운로드 모드 ('video' 또는 'audio')
+            
+        Returns:
+            bool: 다운로드 성공 여부
+        """
+        url = job.url
+        job_id = job.job_id
+        try:
+            file_ext = 'mp4' if mode == 'video' else 'mp3'
+
+            # yt-dlp의 확장자 템플릿 사용
+            output_filename = f"{job.title}.%(ext)s"
+            
+            # 구간을 지정하면 yt-dlp가 구간에 해당하는 부분만 받음 (구간마다 파일 하나)
+            clips = job.options['clips']
+            if clips:
+                output_filename = f"{job.title} [%(section_title,section_start>%H-%M-%S)s].%(ext)s"
+
+            ffmpeg_path = 'C:/ffmpeg/bin'
+            
+            # 동시 조각 수는 이 호스트에서 측정한 처리량을 바탕으로 정함
+            host = urlparse(url).hostname
+            self.bandwidth.register(job_id, job.video_id)
+            concurrent_fragments = self.fragments.start(job_id, host)
+
+            # 전송 시간은 yt-dlp 실행 시간에서 후처리 시간을 빼서 계산
+            timings = {'files': {}, 'postprocess': 0.0}
+            hook = self.progress_hook(job, mode, timings)
+            # 해시를 기록하면 받는 동안 계산해 두고 옮길 때 파일을 다시 읽지 않음
+            hasher = StreamHasher() if self.config['integrity_hashes'] else None
+            
+            ydl_ref = []
+            if mode == 'video':
+                format_spec = self.video_format(job, ydl_ref)
+            else:
+                format_spec = self.format_selector(job, mode)
+
+            ydl_opts = {
+                'format': format_spec,
+                'proxy': self.config['http_proxy'] or None,
+                'outtmpl': output_filename,
+                # 받는 중인 파일과 병합은 임시 폴더에서 처리하고 끝나면 저장 폴더로 옮김
+                'paths': {'home': job.options['download_path'], 'temp': self.staging_path(job)},
+                'merge_output_format': file_ext,
+                'ffmpeg_location': ffmpeg_path,
+                'progress_hooks': [hook, hasher.hook] if hasher else [hook],
+                'postprocessor_hooks': [self.postprocessor_hook(job, mode, timings)],
+                'concurrent_fragment_downloads': concurrent_fragments,
+                'logger': DownloadLogger(on_retry=lambda: self.report_fragment_retry(job_id)),
+                'no_color': True,
+                'noprogress': True,
+                'quiet': True,
+            }
+            
+            if clips:
+                ranges, chapters = parse_clips(clips)
+                ydl_opts['download_ranges'] = yt_dlp.utils.download_range_func(chapters, ranges)
+                ydl_opts['force_keyframes_at_cuts'] = job.options['accurate_cuts']
+            
+            # 챕터별로 나누면 ChapterAudioSplitter가 mp3 변환까지 한 번에 처리하고,
+            # 원본 코덱 그대로 저장하면 변환하지 않음
+            split_audio = mode == 'audio' and job.options['split_chapters']
+            if mode == 'audio' and not split_audio and not job.options['audio_passthrough']:
+                ydl_opts.update({
+                    'postprocessors': [{
+                        'key': 'FFmpegExtractAudio',
+                        'preferredcodec': 'mp3',
+                        'preferredquality': '192',
+                    }]
+                })
+
+            def run():
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    ydl_ref[:] = [ydl]
+                    if split_audio:
+                        ydl.add_post_processor(
+                            ChapterAudioSplitter(ydl, passthrough=job.options['audio_passthrough'],
+                                                 record_hashes=self.config['integrity_hashes']),
+                            when='after_move')
+                    if hasher:
+                        ydl.add_post_processor(HashingMover(ydl, hasher=hasher), when='post_process')
+                    if self.store and self.store.variant(job, mode):
+                        ydl.add_post_processor(MediaStoreIngest(ydl, self.store, job, mode, hasher),
+                                               when='after_move')
+                    self.fragments.bind(job_id, ydl.params)
+                    try:
+                        # 형식을 고르기 전에 구간 비율을 계산해 자동 해상도에 반영
+                        info = self.fetch_metadata(job)
+                        job.clip_fraction = clip_fraction(info, clips)
+                        info = ydl.process_ie_result(info, download=False)
+                        start = time.monotonic()
+                        timings['files'].clear()
+                        timings['postprocess'] = 0.0
+                        outcome = 'error'
+                        try:
+                            # 단일 파일 형식은 여러 연결로 먼저 받아 두고, yt-dlp는 이미 받은 파일로
+                            # 인식해 후처리(mp3 변환 등)만 수행 (구간만 받을 때는 제외)
+                            if not clips and SegmentedDownloader.supports(info):
+                                self.segmented.download(info['url'], ydl.prepare_filename(info, 'temp'),
+                                                        headers=info.get('http_headers'), progress_hook=hook,
+                                                        hasher=hasher)
+                            ydl.process_ie_result(info, download=True)
+                            outcome = 'ok'
+                        except JobInterrupted:
+                            outcome = 'interrupted'
+                            raise
+                        finally:
+                            self.record_phase(job, mode, 'transfer',
+                                              time.monotonic() - start - timings['postprocess'], outcome,
+                                              bytes=sum(timings['files'].values()), format=info.get('format_id'))
+                    except Exception:
+                        # 재시도할 때는 형식 URL이 만료되었을 수 있으므로 메타데이터를 다시 조회
+                        self.metadata.invalidate(job.video_id or job.url)
+                        raise
+            
+            # 메타데이터 조회만 호스트 슬롯과 재시도를 거치고, 전송은 서킷 브레이커만 따름
+            self.governor.transfer(run, classify_ydl_error)
+            return True
+        except JobInterrupted:
+            raise
+        except Exception as e:
+            error_msg = str(e)
+            self.update_status(job.job_id, f"{mode} 다운로드 실패: {error_msg}")
+            return False
+        finally:
+            self.bandwidth.unregister(job_id)
+            self.fragments.finish(job_id)
+
+
 class DownloadStatus(tk.Frame):
     """진행률 표시 컴포넌트 클래스
     
@@ -121,6 +6294,228 @@ class DownloadStatus(tk.Frame):
         """
         self.percent_label.configure(text=f"{int(value)}%")
 
+class JobListView(ttk.Frame):
+    """작업 목록을 보여주는 가상화된 표 컴포넌트 클래스
+    
+    작업마다 위젯이나 Treeview 항목을 만들지 않고, 화면에 보이는 줄 수만큼의 항목만
+    만들어 두고 스크롤 위치에 맞는 작업의 값으로 바꿔 씁니다. 작업 정보는 딕셔너리에만
+    두므로 수만 개의 작업이 대기열에 있어도 그리는 비용은 보이는 줄 수에 비례합니다.
+    값이 바뀐 줄만 다시 쓰고, 필터와 정렬은 목록이 바뀐 경우에만 다시 계산합니다.
+    
+    Attributes:
+        rows (dict): 작업 ID -> 표시할 값 ('seq', 'title', 'state', 단계별 진행률)
+        view (list): 필터와 정렬을 적용한 작업 ID 목록
+        selected (str): 선택한 작업 ID (없으면 None)
+    """
+    
+    COLUMNS = (('title', "제목", 280), ('state', "상태", 70),
+               ('caption', "자막", 50), ('video', "영상", 50), ('audio', "음성", 50))
+    STATE_LABELS = {'queued': "대기", 'running': "진행 중", 'paused': "일시 정지",
+                    'done': "완료", 'failed': "실패", 'cancelled': "취소"}
+    FILTERS = {"전체": None, "대기": ('queued',), "진행 중": ('running',), "일시 정지": ('paused',),
+               "완료": ('done',), "실패/취소": ('failed', 'cancelled')}
+    # 한 번 휠을 돌릴 때 움직이는 줄 수
+    WHEEL_ROWS = 3
+    
+    def __init__(self, parent):
+        """
+        Args:
+            parent: 부모 위젯
+        """
+        super().__init__(parent)
+        self.rows = {}
+        self.view = []
+        self.selected = None
+        self.offset = 0
+        self.sort_key, self.sort_reverse = 'seq', False
+        self._dirty = False
+        self._pool = []
+        self._shown = {}
+        self._height = 0
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+        
+        # 상태 필터와 작업 수
+        toolbar = ttk.Frame(self)
+        toolbar.grid(row=0, column=0, columnspan=2, sticky='ew', pady=(0, 2))
+        ttk.Label(toolbar, text="작업 목록:").pack(side='left')
+        self.filter_var = tk.StringVar(value="전체")
+        filter_dropdown = ttk.Combobox(toolbar, textvariable=self.filter_var, values=list(self.FILTERS),
+                                       width=9, state="readonly")
+        filter_dropdown.pack(side='left', padx=5)
+        filter_dropdown.bind('<<ComboboxSelected>>', lambda e: self.set_filter())
+        self.count_label = ttk.Label(toolbar, text="0개")
+        self.count_label.pack(side='right')
+        
+        # 보이는 줄만 항목으로 만드는 표 (높이는 창 크기에 맞춰 _resize에서 정함)
+        self.tree = ttk.Treeview(self, columns=[key for key, _, _ in self.COLUMNS], show='headings',
+                                 selectmode='browse', height=1)
+        for key, text, width in self.COLUMNS:
+            self.tree.heading(key, text=text, command=lambda key=key: self.sort_by(key))
+            self.tree.column(key, width=width, stretch=key == 'title', anchor='w' if key == 'title' else 'e')
+        self.tree.tag_configure('failed', foreground='red')
+        self.tree.tag_configure('done', foreground='gray')
+        self.tree.grid(row=1, column=0, sticky='nsew')
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self.yview)
+        self.scrollbar.grid(row=1, column=1, sticky='ns')
+        
+        self.tree.bind('<Configure>', self._resize)
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<MouseWheel>', self._on_wheel)
+        self.tree.bind('<Button-4>', self._on_wheel)
+        self.tree.bind('<Button-5>', self._on_wheel)
+    
+    def update_jobs(self, jobs, progress):
+        """펌프가 모은 이벤트를 한 번에 반영하고 다시 그립니다.
+        
+        Args:
+            jobs (dict): 작업 ID -> 마지막 job 이벤트
+            progress (dict): (작업 ID, 단계) -> 마지막 진행률
+        """
+        for job_id, event in jobs.items():
+            row = self._row(job_id)
+            row['title'] = event.get('title') or row['title'] or event.get('video_id') or ''
+            if row['state'] != event['state']:
+                row['state'] = event['state']
+                self._dirty = self._dirty or self.sort_key == 'state' or self.filter_var.get() != "전체"
+        for (job_id, stage), percent in progress.items():
+            row = self._row(job_id)
+            row[stage] = percent
+            self._dirty = self._dirty or self.sort_key == stage
+        self.render()
+    
+    def _row(self, job_id):
+        """작업의 줄 정보를 반환합니다 (처음 보는 작업이면 만듦)."""
+        row = self.rows.get(job_id)
+        if row is None:
+            # 창을 연 뒤 연결한 원격 엔진처럼 job 이벤트 없이 진행률이 먼저 올 수 있음
+            row = self.rows[job_id] = {'seq': len(self.rows), 'title': '', 'state': 'running',
+                                       'caption': 0.0, 'video': 0.0, 'audio': 0.0}
+            self._dirty = True
+        return row
+    
+    def _refresh_view(self):
+        """필터와 정렬을 적용해 표시할 작업 목록을 다시 만듭니다."""
+        states = self.FILTERS[self.filter_var.get()]
+        items = [(job_id, row) for job_id, row in self.rows.items() if states is None or row['state'] in states]
+        key = self.sort_key
+        if key == 'title':
+            items.sort(key=lambda item: (item[1]['title'].lower(), item[1]['seq']), reverse=self.sort_reverse)
+        else:
+            items.sort(key=lambda item: (item[1][key], item[1]['seq']), reverse=self.sort_reverse)
+        self.view = [job_id for job_id, _ in items]
+        self.offset = max(0, min(self.offset, len(self.view) - len(self._pool)))
+        self.count_label.configure(text=f"{len(self.view)}개" if states is None
+                                   else f"{len(self.view)} / {len(self.rows)}개")
+    
+    def render(self):
+        """보이는 줄에 해당하는 작업의 값 중 바뀐 것만 표에 씁니다."""
+        if self._dirty:
+            self._dirty = False
+            self._refresh_view()
+        visible = self.view[self.offset:self.offset + len(self._pool)]
+        for index, iid in enumerate(self._pool):
+            if index < len(visible):
+                row = self.rows[visible[index]]
+                shown = ((row['title'] or visible[index], self.STATE_LABELS.get(row['state'], row['state']),
+                          f"{int(row['caption'])}%", f"{int(row['video'])}%", f"{int(row['audio'])}%"),
+                         (row['state'],))
+            else:
+                shown = (('',) * len(self.COLUMNS), ())
+            if self._shown.get(iid) != shown:
+                self._shown[iid] = shown
+                self.tree.item(iid, values=shown[0], tags=shown[1])
+        # 선택한 작업이 보이는 줄에 있으면 그 줄을 선택 (스크롤하면 다른 줄로 옮겨 감)
+        target = (self._pool[visible.index(self.selected)],) if self.selected in visible else ()
+        if self.tree.selection() != target:
+            if target:
+                self.tree.selection_set(target)
+            else:
+                self.tree.selection_remove(self.tree.selection())
+        total = len(self.view)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + len(self._pool)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def yview(self, *args):
+        """스크롤바 명령 ('moveto', 비율) 또는 ('scroll', 수, 'units'/'pages')을 처리합니다."""
+        if args[0] == 'moveto':
+            offset = int(float(args[1]) * len(self.view))
+        else:
+            step = len(self._pool) if args[2] == 'pages' else 1
+            offset = self.offset + int(args[1]) * step
+        self.scroll_to(offset)
+    
+    def scroll_to(self, offset):
+        """첫 번째로 보일 작업의 위치를 바꿉니다."""
+        offset = max(0, min(offset, len(self.view) - len(self._pool)))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+    
+    def _on_wheel(self, event):
+        """마우스 휠로 스크롤합니다 (Linux는 Button-4/5, 그 밖은 MouseWheel)."""
+        up = event.num == 4 or getattr(event, 'delta', 0) > 0
+        self.scroll_to(self.offset + (-self.WHEEL_ROWS if up else self.WHEEL_ROWS))
+        return 'break'
+    
+    def _resize(self, event=None):
+        """표 높이에 맞춰 보이는 줄 수만큼 항목을 만들거나 지웁니다."""
+        if event is not None:
+            self._height = event.height
+        if not self._pool:
+            self._pool.append(self.tree.insert('', 'end'))
+        bbox = self.tree.bbox(self._pool[0])
+        if bbox:
+            heading, row_height = bbox[1], bbox[3]
+        else:
+            # 아직 그려지지 않아 줄 크기를 모르면 스타일 값으로 계산하고, 그린 뒤 한 번 더 맞춤
+            row_height = int(ttk.Style(self).lookup('Treeview', 'rowheight') or 20)
+            heading = row_height + 4
+            if event is not None:
+                self.after_idle(self._resize)
+        count = max(1, (self._height - heading) // max(row_height, 1))
+        while len(self._pool) < count:
+            self._pool.append(self.tree.insert('', 'end'))
+        while len(self._pool) > count:
+            iid = self._pool.pop()
+            self._shown.pop(iid, None)
+            self.tree.delete(iid)
+        self.offset = max(0, min(self.offset, len(self.view) - len(self._pool)))
+        self.render()
+    
+    def _on_select(self, event):
+        """사용자가 고른 줄의 작업을 선택한 작업으로 기록합니다 (빈 줄이면 선택 해제)."""
+        selection = self.tree.selection()
+        if not selection:
+            return
+        position = self.offset + self._pool.index(selection[0])
+        self.selected = self.view[position] if position < len(self.view) else None
+        if self.selected is None:
+            self.tree.selection_remove(selection)
+    
+    def sort_by(self, key):
+        """열 제목을 누르면 그 열로 정렬합니다 (다시 누르면 반대 순서, 세 번째에는 추가한 순서)."""
+        if key != self.sort_key:
+            self.sort_key, self.sort_reverse = key, False
+        elif not self.sort_reverse:
+            self.sort_reverse = True
+        else:
+            self.sort_key, self.sort_reverse = 'seq', False
+        for column, text, _ in self.COLUMNS:
+            arrow = (" ▼" if self.sort_reverse else " ▲") if column == self.sort_key else ""
+            self.tree.heading(column, text=text + arrow)
+        self._dirty = True
+        self.render()
+    
+    def set_filter(self):
+        """상태 필터를 바꾸고 목록 처음으로 돌아갑니다."""
+        self.offset = 0
+        self._dirty = True
+        self.render()
+
+
 class YouTubeDownloader(tk.Tk):
     """YouTube 다운로더 메인 애플리케이션 클래스
     
@@ -136,13 +6531,22 @@ class YouTubeDownloader(tk.Tk):
         resolution_var (tk.StringVar): 선택된 해상도
         title_var (tk.StringVar): 사용자 지정 파일명
         language_var (tk.StringVar): 선택된 자막 언어
+        settings (dict): 설정 (tk.Tk의 config 메서드와 겹치지 않도록 다른 이름 사용)
+        engine (DownloadEngine): 다운로드 엔진
     """
     
-    def __init__(self):
-        """YouTubeDownloader 클래스 초기화"""
+    # 엔진 이벤트를 처리하는 간격 (밀리초)
+    PUMP_INTERVAL = 100
+    
+    def __init__(self, engine=None):
+        """YouTubeDownloader 클래스 초기화
+        
+        Args:
+            engine (DownloadEngine): 사용할 엔진 (None이면 설정에 따라 만듦, 벤치마크에서 지정)
+        """
         super().__init__()
         self.title("유튜브 다운로더 v1.0.1")
-        self.geometry("600x350")  # 언어 선택 드롭다운 추가로 높이 약간 증가
+        self.geometry("640x600")  # 작업 목록 추가로 높이 증가
         
         self.padding = 20
         main_frame = ttk.Frame(self, padding=self.padding)
@@ -151,6 +6555,15 @@ class YouTubeDownloader(tk.Tk):
         self.setup_variables()
         self.create_widgets(main_frame)
         
+        # 다운로드 엔진 이벤트는 작업자 스레드에서 발생하므로 큐를 거쳐 메인 스레드에서 처리
+        self.events = queue.Queue()
+        self.current_job = None
+        # api_url을 설정하면 serve 명령으로 실행 중인 작업 서버의 엔진을 사용
+        self.engine = engine or RemoteEngine.from_config(self.settings) or DownloadEngine(self.settings)
+        self.engine.add_listener(self.events.put)
+        self.after(self.PUMP_INTERVAL, self.pump_events)
+        self.engine.start()
+        
         # 초기화 시 예외 처리 설정
         # 기본 Tkinter 예외 핸들러 재정의
         self.report_callback_exception = self.handle_exception
@@ -158,40 +6571,25 @@ class YouTubeDownloader(tk.Tk):
         # 프로그램 종료 시 설정 저장
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
         
-    def load_config(self):
-        """설정 파일에서 저장된 다운로드 경로를 로드합니다.
-        
-        Returns:
-            str: 저장된 다운로드 경로 또는 기본 다운로드 폴더 경로
-        """
-        try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    return config.get('download_path', os.path.expanduser("~/Downloads"))
-        except Exception as e:
-            print(f"설정 파일 로드 중 오류 발생: {e}")
-        return os.path.expanduser("~/Downloads")
-        
     def save_config(self):
         """현재 다운로드 경로를 설정 파일에 저장합니다."""
-        try:
-            config = {
-                'download_path': self.download_path.get()
-            }
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"설정 파일 저장 중 오류 발생: {e}")
+        self.settings['download_path'] = self.download_path.get()
+        save_config(self.settings)
             
     def on_closing(self):
-        """프로그램 종료 시 설정을 저장하고 종료합니다."""
+        """프로그램 종료 시 설정을 저장하고 종료합니다.
+        
+        진행 중인 작업은 저널에 남아 있으므로 다음 실행 때 이어서 진행합니다.
+        """
         self.save_config()
+        if self.engine.profiler:
+            self.engine.profiler.close()
         self.quit()
         
     def setup_variables(self):
         """프로그램에서 사용하는 변수들을 초기화합니다."""
-        self.download_path = tk.StringVar(value=self.load_config())
+        self.settings = load_config()
+        self.download_path = tk.StringVar(value=self.settings['download_path'])
         self.video_check = tk.BooleanVar(value=True)
         self.sub_check = tk.BooleanVar(value=True)
         self.srt_check = tk.BooleanVar()
@@ -199,10 +6597,20 @@ class YouTubeDownloader(tk.Tk):
         self.resolution_var = tk.StringVar(value='2160p')
         self.title_var = tk.StringVar()
         self.language_var = tk.StringVar(value='한국어')  # 자막 언어 설정 변수 추가
+        self.rate_limit_var = tk.StringVar(value=self.settings['bandwidth_limit'] or '무제한')
+        self.deadline_var = tk.StringVar(value='없음')
+        self.clips_var = tk.StringVar()
+        self.split_chapters_check = tk.BooleanVar()
+        self.accurate_cuts_check = tk.BooleanVar()
         
         self.caption_progress_var = tk.DoubleVar()
         self.video_progress_var = tk.DoubleVar()
         self.audio_progress_var = tk.DoubleVar()
+        self.progress_vars = {
+            'caption': self.caption_progress_var,
+            'video': self.video_progress_var,
+            'audio': self.audio_progress_var,
+        }
         
     def create_widgets(self, parent):
         """UI 위젯을 생성하고 배치합니다.
@@ -235,6 +6643,21 @@ class YouTubeDownloader(tk.Tk):
         title_entry = ttk.Entry(title_frame, textvariable=self.title_var)
         title_entry.grid(row=0, column=1, columnspan=3, sticky='ew')
         
+        # 자동 해상도의 배치 마감 (이 시간 안에 모두 받을 수 있는 해상도를 고름)
+        ttk.Label(title_frame, text="마감:").grid(row=0, column=4, padx=(10, 5))
+        ttk.Combobox(title_frame, textvariable=self.deadline_var, values=["없음", "10m", "30m", "1h", "2h"],
+                     width=6, state="readonly").grid(row=0, column=5)
+        
+        # 구간 입력 프레임 (쉼표로 여러 구간 또는 챕터 이름 입력)
+        clip_frame = ttk.Frame(parent)
+        clip_frame.pack(fill='x', pady=(0, 5))
+        clip_frame.columnconfigure(1, weight=1)
+        
+        ttk.Label(clip_frame, text="구간:").grid(row=0, column=0, padx=(0, 5))
+        ttk.Entry(clip_frame, textvariable=self.clips_var).grid(row=0, column=1, sticky='ew')
+        ttk.Checkbutton(clip_frame, text="정확히 자르기",
+                        variable=self.accurate_cuts_check).grid(row=0, column=2, padx=(10, 0))
+        
         # 현재 다운로드 경로 표시
         path_frame = ttk.Frame(parent)
         path_frame.pack(fill='x', pady=(0, 10))
@@ -253,7 +6676,7 @@ class YouTubeDownloader(tk.Tk):
         
         ttk.Checkbutton(options_frame, text="영상", variable=self.video_check).pack(side='left', padx=5)
         ttk.Combobox(options_frame, textvariable=self.resolution_var, 
-                    values=["2160p", "1080p", "720p"], width=6).pack(side='left', padx=5)
+                    values=[AUTO_RESOLUTION, "2160p", "1080p", "720p"], width=6).pack(side='left', padx=5)
         
         # 자막 옵션과 언어 드롭다운을 나란히 배치
         ttk.Checkbutton(options_frame, text="자막", variable=self.sub_check).pack(side='left', padx=5)
@@ -263,296 +6686,96 @@ class YouTubeDownloader(tk.Tk):
         language_dropdown.current(0)  # 기본값은 한국어
         
         ttk.Checkbutton(options_frame, text="음성", variable=self.audio_check).pack(side='left', padx=5)
+        ttk.Checkbutton(options_frame, text="챕터별", variable=self.split_chapters_check).pack(side='left')
         
-        # 상태 프레임
-        status_frame = ttk.Frame(parent)
-        status_frame.pack(fill='x', pady=(0, 20))
-        
-        self.caption_status = DownloadStatus(status_frame, "자막", self.caption_progress_var)
-        self.caption_status.pack(fill='x', pady=2)
-        
-        self.video_status = DownloadStatus(status_frame, "영상", self.video_progress_var)
-        self.video_status.pack(fill='x', pady=2)
-        
-        self.audio_status = DownloadStatus(status_frame, "음성", self.audio_progress_var)
-        self.audio_status.pack(fill='x', pady=2)
+        # 전체 속도 제한 (진행 중인 다운로드에도 바로 적용)
+        ttk.Label(options_frame, text="속도 제한:").pack(side='left', padx=(10, 0))
+        rate_dropdown = ttk.Combobox(options_frame, textvariable=self.rate_limit_var,
+                                     values=["무제한", "1M", "2M", "5M", "10M", "20M"], width=7)
+        rate_dropdown.pack(side='left', padx=5)
+        rate_dropdown.bind('<<ComboboxSelected>>', lambda e: self.apply_rate_limit())
+        rate_dropdown.bind('<Return>', lambda e: self.apply_rate_limit())
+        rate_dropdown.bind('<FocusOut>', lambda e: self.apply_rate_limit())
         
-        # 완료 상태 메시지
+        # 상태 프레임
         status_frame = ttk.Frame(parent)
-        status_frame.pack(fill='x', pady=(5, 5))
-        self.status_label = ttk.Label(status_frame, text="")
-        self.status_label.pack(side='right')
-        
-        # 하단 프레임
-        bottom_frame = ttk.Frame(parent)
-        bottom_frame.pack(fill='x', pady=(5, 0))
-        
-        copyright_label = ttk.Label(
-            bottom_frame, 
-            text="© 2025 지식에 대한 탐구 (https://small-tip.co.kr) - All rights reserved.",
-            cursor="hand2"
-        )
-        copyright_label.pack(side='left')
-        copyright_label.bind("<Button-1>", lambda e: self.open_website())
-        
-        exit_button = ttk.Button(bottom_frame, text="종료", command=self.on_closing)
-        exit_button.pack(side='right')
-
-    def open_website(self):
-        """저작권 정보의 웹사이트 링크를 엽니다."""
-        import webbrowser
-        webbrowser.open("https://small-tip.co.kr")
-
-    def open_download_folder(self):
-        """다운로드 폴더를 파일 탐색기에서 엽니다."""
-        download_path = self.download_path.get()
-        try:
-            if sys.platform == 'win32':
-                os.startfile(download_path)
-            elif sys.platform == 'darwin':  # macOS
-                import subprocess
-                subprocess.Popen(['open', download_path])
-            else:  # linux variants
-                import subprocess
-                subprocess.Popen(['xdg-open', download_path])
-        except Exception as e:
-            self.update_status(f"폴더 열기 실패: {str(e)}")
-
-    def get_safe_filename(self, url, video_id):
-        """안전한 파일명을 생성합니다.
-        
-        다음 우선순위로 파일명을 결정합니다:
-        1. 사용자가 입력한 제목
-        2. YouTube 영상의 원제목
-        3. 날짜_시간 형식의 자동 생성 이름
-        
-        Args:
-            url (str): YouTube 영상 URL
-            video_id (str): YouTube 영상 ID
-            
-        Returns:
-            str: 사용할 파일명
-        """
-        if self.title_var.get().strip():
-            return self.title_var.get().strip()
-        
-        try:
-            yt = YouTube(url)
-            return yt.title
-        except:
-            current_time = datetime.now().strftime('%y%m%d_%H%M')
-            return f"download_{current_time}"
-
-    def extract_percent(self, percent_str):
-        """진행률 문자열에서 숫자만 추출합니다.
-        
-        ANSI 색상 코드와 기타 문자를 제거하고 숫자만 추출합니다.
-        
-        Args:
-            percent_str (str): 진행률 문자열
-            
-        Returns:
-            float: 추출된 진행률 값 (0-100)
-        """
-        clean_str = re.sub(r'\x1b\[[0-9;]*m', '', percent_str)
-        clean_str = re.sub(r'[^\d.]', '', clean_str)
-        try:
-            return float(clean_str)
-        except ValueError:
-            return 0.0
-
-    def format_time(self, seconds):
-        """초 단위 시간을 자막 시간 형식으로 변환합니다.
-        
-        SRT 형식의 시간 표시(HH:MM:SS,mmm)로 변환합니다.
-        
-        Args:
-            seconds (float): 초 단위 시간
-            
-        Returns:
-            str: 변환된 시간 문자열 (HH:MM:SS,mmm 형식)
-        """
-        hours, remainder = divmod(seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        milliseconds = int((seconds - int(seconds)) * 1000)
-        return f"{int(hours):02}:{int(minutes):02}:{int(seconds):02},{milliseconds:03}"
-
-    def progress_hook(self, mode):
-        """다운로드 진행률 업데이트를 처리하는 콜백 함수를 반환합니다.
-        
-        yt-dlp의 progress_hooks에서 사용되며, 다운로드 진행 상황을
-        UI에 실시간으로 반영합니다.
-        
-        Args:
-            mode (str): 다운로드 모드 ('video' 또는 'audio')
-            
-        Returns:
-            function: 진행률 업데이트 콜백 함수
-        """
-        def hook(d):
-            if d['status'] == 'downloading':
-                percent = self.extract_percent(d['_percent_str'])
-                if mode == 'video':
-                    self.video_progress_var.set(percent)
-                elif mode == 'audio':
-                    self.audio_progress_var.set(percent)
-            elif d['status'] == 'finished':
-                if mode == 'video':
-                    self.video_progress_var.set(100)
-                elif mode == 'audio':
-                    self.audio_progress_var.set(100)
-        return hook
-
-    def save_caption_to_file(self, transcript_data, file_path, is_srt, suffix):
-        """자막 데이터를 파일로 저장합니다.
-        
-        Args:
-            transcript_data (list): 자막 데이터 목록
-            file_path (str): 저장할 파일 경로 (확장자 제외)
-            is_srt (bool): True면 SRT 형식, False면 TXT 형식으로 저장
-            suffix (str): 파일명에 추가할 접미사 (예: "_kr" 또는 "_en")
-        """
-        file_ext = 'srt' if is_srt else 'txt'
-        full_path = f"{file_path}{suffix}.{file_ext}"
-        
-        with open(full_path, 'w', encoding='utf-8') as file:
-            if is_srt:
-                for i, entry in enumerate(transcript_data):
-                    start = entry['start']
-                    duration = entry.get('duration', 0)
-                    end = start + duration
-                    text = entry['text'].replace('\n', ' ')
-                    file.write(f"{i + 1}\n{self.format_time(start)} --> {self.format_time(end)}\n{text}\n\n")
-            else:
-                for entry in transcript_data:
-                    file.write(entry['text'] + '\n')
-        
-        return full_path
-
-    def download_caption(self, video_id, url, safe_title, is_srt):
-        """자막을 다운로드하고 파일로 저장합니다.
-        
-        선택한 언어에 따라 자막을 다운로드하고 요청한 포맷으로 저장합니다.
+        status_frame.pack(fill='x', pady=(0, 10))
         
-        Args:
-            video_id (str): YouTube 영상 ID
-            url (str): YouTube 영상 URL
-            safe_title (str): 저장할 파일명
-            is_srt (bool): True면 SRT 형식, False면 TXT 형식으로 저장
-            
-        Returns:
-            bool: 자막 다운로드 성공 여부
-        """
-        try:
-            self.update_status("자막 다운로드 중...")
-            available_transcripts = YouTubeTranscriptApi.list_transcripts(video_id)
-            selected_language = self.language_var.get()
-            file_path = os.path.join(self.download_path.get(), safe_title)
-            
-            # 다운로드된 자막 추적
-            downloaded_subtitles = []
-            
-            # 한국어 자막 다운로드 시도
-            if selected_language in ["한국어", "모든 언어"]:
-                try:
-                    ko_transcript = available_transcripts.find_transcript(['ko'])
-                    ko_data = ko_transcript.fetch()
-                    self.save_caption_to_file(ko_data, file_path, is_srt, "_kr")
-                    downloaded_subtitles.append("한국어")
-                except Exception:
-                    if selected_language == "한국어":
-                        self.update_status("한국어 자막이 없어 다운로드 하지 못했습니다.")
-            
-            # 영어 자막 다운로드 시도
-            if selected_language in ["영어", "모든 언어"]:
-                try:
-                    en_transcript = available_transcripts.find_transcript(['en'])
-                    en_data = en_transcript.fetch()
-                    self.save_caption_to_file(en_data, file_path, is_srt, "_en")
-                    downloaded_subtitles.append("영어")
-                except Exception:
-                    # 영어 자막 없을 때 자동 생성 영어 자막 시도
-                    try:
-                        auto_en_transcript = available_transcripts.find_generated_transcript(['en'])
-                        auto_en_data = auto_en_transcript.fetch()
-                        self.save_caption_to_file(auto_en_data, file_path, is_srt, "_auto_en")
-                        downloaded_subtitles.append("영어 자동생성")
-                    except Exception:
-                        if selected_language == "영어":
-                            self.update_status("영어 자막이 없어 다운로드 하지 못했습니다.")
-            
-            # 다운로드 결과 메시지 표시
-            if downloaded_subtitles:
-                if len(downloaded_subtitles) == 1:
-                    self.update_status(f"{downloaded_subtitles[0]} 자막 다운로드 완료")
-                else:
-                    self.update_status(f"{' 및 '.join(downloaded_subtitles)} 자막 다운로드 완료")
-                self.caption_progress_var.set(100)
-                return True
-            elif selected_language == "모든 언어":
-                self.update_status("자막을 찾을 수 없어 다운로드 하지 못했습니다.")
-                self.caption_progress_var.set(0)
-                return False
-            else:
-                self.caption_progress_var.set(0)
-                return False
-
-        except Exception as e:
-            error_msg = str(e)
-            self.update_status(f"자막 다운로드 실패: {error_msg}")
-            self.caption_progress_var.set(0)
-            return False
-
-    def download_video_audio(self, url, safe_title, mode):
-        """영상 또는 음성을 다운로드합니다.
+        self.caption_status = DownloadStatus(status_frame, "자막", self.caption_progress_var)
+        self.caption_status.pack(fill='x', pady=2)
         
-        yt-dlp를 사용하여 고품질의 영상 또는 음성을 다운로드합니다.
+        self.video_status = DownloadStatus(status_frame, "영상", self.video_progress_var)
+        self.video_status.pack(fill='x', pady=2)
         
-        Args:
-            url (str): YouTube 영상 URL
-            safe_title (str): 저장할 파일명
-            mode (str): 다운로드 모드 ('video' 또는 'audio')
-            
-        Returns:
-            bool: 다운로드 성공 여부
-        """
-        try:
-            file_ext = 'mp4' if mode == 'video' else 'mp3'
-            resolution = self.resolution_var.get().replace('p', '')
-
-            # yt-dlp의 확장자 템플릿 사용
-            output_filename = os.path.join(self.download_path.get(), f"{safe_title}.%(ext)s")
-
-            ffmpeg_path = 'C:/ffmpeg/bin'
+        self.audio_status = DownloadStatus(status_frame, "음성", self.audio_progress_var)
+        self.audio_status.pack(fill='x', pady=2)
+        
+        # 작업 목록 (보이는 줄만 그리므로 작업이 많아도 느려지지 않음)
+        self.job_list = JobListView(parent)
+        self.job_list.pack(fill='both', expand=True, pady=(0, 10))
+        
+        # 완료 상태 메시지
+        status_frame = ttk.Frame(parent)
+        status_frame.pack(fill='x', pady=(5, 5))
+        self.status_label = ttk.Label(status_frame, text="")
+        self.status_label.pack(side='right')
+        
+        # 하단 프레임
+        bottom_frame = ttk.Frame(parent)
+        bottom_frame.pack(fill='x', pady=(5, 0))
+        
+        copyright_label = ttk.Label(
+            bottom_frame, 
+            text="© 2025 지식에 대한 탐구 (https://small-tip.co.kr) - All rights reserved.",
+            cursor="hand2"
+        )
+        copyright_label.pack(side='left')
+        copyright_label.bind("<Button-1>", lambda e: self.open_website())
+        
+        exit_button = ttk.Button(bottom_frame, text="종료", command=self.on_closing)
+        exit_button.pack(side='right')
+        
+        # 작업 목록에서 선택한 작업 제어 (선택하지 않으면 모든 작업)
+        ttk.Button(bottom_frame, text="취소",
+                   command=lambda: self.engine.cancel(self.job_list.selected)).pack(side='right', padx=5)
+        ttk.Button(bottom_frame, text="재개",
+                   command=lambda: self.engine.resume(self.job_list.selected)).pack(side='right')
+        ttk.Button(bottom_frame, text="일시 정지",
+                   command=lambda: self.engine.pause(self.job_list.selected)).pack(side='right', padx=5)
 
-            ydl_opts = {
-                'format': f"bv*[height<={resolution}]+ba/b[height<={resolution}]" if mode == 'video' else 'bestaudio/best',
-                'outtmpl': output_filename,
-                'merge_output_format': file_ext,
-                'ffmpeg_location': ffmpeg_path,
-                'progress_hooks': [self.progress_hook(mode)],
-                'no_color': True,
-                'noprogress': True,
-                'quiet': True,
-            }
-            
-            if mode == 'audio':
-                ydl_opts.update({
-                    'postprocessors': [{
-                        'key': 'FFmpegExtractAudio',
-                        'preferredcodec': 'mp3',
-                        'preferredquality': '192',
-                    }]
-                })
+    def open_website(self):
+        """저작권 정보의 웹사이트 링크를 엽니다."""
+        import webbrowser
+        webbrowser.open("https://small-tip.co.kr")
 
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
-            
-            return True
+    def open_download_folder(self):
+        """다운로드 폴더를 파일 탐색기에서 엽니다."""
+        download_path = self.download_path.get()
+        try:
+            if sys.platform == 'win32':
+                os.startfile(download_path)
+            elif sys.platform == 'darwin':  # macOS
+                import subprocess
+                subprocess.Popen(['open', download_path])
+            else:  # linux variants
+                import subprocess
+                subprocess.Popen(['xdg-open', download_path])
         except Exception as e:
-            error_msg = str(e)
-            self.update_status(f"{mode} 다운로드 실패: {error_msg}")
-            return False
+            self.update_status(f"폴더 열기 실패: {str(e)}")
+
+    def apply_rate_limit(self):
+        """속도 제한 입력값을 대역폭 스케줄러에 적용하고 설정에 저장합니다."""
+        value = self.rate_limit_var.get().strip()
+        value = '' if value == '무제한' else value
+        if value == self.settings['bandwidth_limit']:
+            return
+        try:
+            self.engine.bandwidth.set_global_limit(value)
+        except ValueError:
+            self.update_status("속도 제한 형식이 올바르지 않습니다. (예: 500K, 2M)")
+            return
+        self.save_config()
+        self.update_status(f"속도 제한: {format_rate(parse_rate(value))}")
 
     def select_download_path(self):
         """다운로드 경로를 선택하고 설정을 저장합니다."""
@@ -584,78 +6807,981 @@ class YouTubeDownloader(tk.Tk):
         """
         self.status_label.config(text=message)
             
-    def start_download(self):
-        """다운로드를 시작합니다.
+    def pump_events(self):
+        """엔진 이벤트를 메인 스레드에서 처리합니다.
         
-        사용자가 선택한 옵션에 따라 영상, 자막, 음성 다운로드를
-        비동기적으로 실행합니다.
+        쌓인 이벤트를 한 번에 꺼내 진행률은 단계별 마지막 값만, 상태 메시지는
+        마지막 메시지만 반영해 Tk 변수 갱신 횟수를 줄입니다. 진행률 바는
+        가장 최근에 진행률을 보낸 작업을 표시하고, 작업 목록에는 작업별 마지막 상태와
+        진행률을 한 번에 넘깁니다.
         """
-        url = self.url_entry.get()
-        if not url:
-            self.update_status("URL을 입력해주세요.")
-            return
-            
-        video_id = url.split("v=")[-1].split("&")[0]
-        safe_title = self.get_safe_filename(url, video_id)
-        
-        # 다운로드 성공 여부를 추적하는 변수
-        success = {
-            'caption': False,
-            'video': False,
-            'audio': False
-        }
+        progress = {}
+        status = None
+        jobs, job_progress = {}, {}
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if event['type'] == 'progress':
+                if event['job_id'] != self.current_job:
+                    self.current_job = event['job_id']
+                    progress = {stage: 0 for stage in JOB_STAGES}
+                progress[event['stage']] = event['percent']
+                job_progress[(event['job_id'], event['stage'])] = event['percent']
+            elif event['type'] == 'job':
+                jobs[event['job_id']] = event
+            elif event['type'] == 'status':
+                status = event['message']
+        for stage, percent in progress.items():
+            self.progress_vars[stage].set(percent)
+        if jobs or job_progress:
+            self.job_list.update_jobs(jobs, job_progress)
+        if status is not None:
+            self.update_status(status)
+        self.after(self.PUMP_INTERVAL, self.pump_events)
+    
+    def collect_options(self):
+        """현재 체크박스와 드롭다운 값으로 작업 옵션을 만듭니다.
         
-        # 선택된 옵션 추적
-        options_selected = {
+        Returns:
+            dict: 작업 옵션 (DEFAULT_JOB_OPTIONS 참조)
+        """
+        return {
             'caption': self.sub_check.get(),
             'video': self.video_check.get(),
-            'audio': self.audio_check.get()
+            'audio': self.audio_check.get(),
+            'srt': self.srt_check.get(),
+            'language': self.language_var.get(),
+            'resolution': self.resolution_var.get(),
+            'title': self.title_var.get().strip(),
+            'download_path': self.download_path.get(),
+            'deadline': deadline_time(self.deadline_var.get()),
+            'clips': [clip.strip() for clip in self.clips_var.get().split(',') if clip.strip()],
+            'accurate_cuts': self.accurate_cuts_check.get(),
+            'split_chapters': self.split_chapters_check.get(),
         }
+            
+    def start_download(self):
+        """다운로드를 시작합니다.
         
-        def run_tasks():
-            try:
-                # 자막 다운로드
-                if options_selected['caption']:
-                    success['caption'] = self.download_caption(video_id, url, safe_title, self.srt_check.get())
-                
-                # 영상 다운로드
-                if options_selected['video']:
-                    success['video'] = self.download_video_audio(url, safe_title, 'video')
-                
-                # 음성 다운로드
-                if options_selected['audio']:
-                    success['audio'] = self.download_video_audio(url, safe_title, 'audio')
-                
-                # 자막만 선택했고 다운로드에 실패한 경우 최종 메시지를 출력하지 않음
-                only_caption_failed = (
-                    options_selected['caption'] and not success['caption'] and 
-                    not options_selected['video'] and not options_selected['audio']
-                )
-                
-                if not only_caption_failed:
-                    all_selected_succeeded = all(
-                        success[opt] for opt, selected in options_selected.items() if selected
-                    )
-                    if all_selected_succeeded:
-                        self.update_status("모든 다운로드가 완료되었습니다!")
-                    else:
-                        # 자막 이외의 것이 선택되었고 실패하지 않았다면 일부 완료 메시지 표시
-                        has_other_success = any(
-                            success[opt] for opt, selected in options_selected.items() 
-                            if selected and opt != 'caption'
-                        )
-                        if has_other_success:
-                            self.update_status("일부 다운로드가 완료되었습니다.")
-                
-            except Exception as e:
-                self.update_status(f"오류 발생: {str(e)}")
-                
-        if not any(options_selected.values()):
+        입력한 URL(공백이나 줄바꿈으로 여러 개 입력 가능)마다 작업을 만들어
+        다운로드 엔진의 대기열에 넣습니다. 사용자 지정 제목은 URL이 하나일 때만 사용합니다.
+        """
+        urls = self.url_entry.get().split()
+        if not urls:
+            self.update_status("URL을 입력해주세요.")
+            return
+        
+        options = self.collect_options()
+        try:
+            parse_clips(options['clips'])
+        except ValueError as e:
+            self.update_status(str(e))
+            return
+        if not any(options[stage] for stage in JOB_STAGES):
             self.update_status("다운로드 옵션을 선택해주세요.")
             return
+        if len(urls) > 1:
+            options['title'] = ''
         
-        threading.Thread(target=run_tasks, daemon=True).start()
+        self.engine.submit_batch(urls, options)
+        if len(urls) > 1:
+            self.update_status(f"{len(urls)}개 작업을 대기열에 추가했습니다.")
 
-if __name__ == "__main__":
+# 모의 실행에서 단계별로 걸리는 시간 (초)
+SIM_CAPTION_TIME = 0.8    # 자막 목록 조회와 본문 다운로드
+SIM_ESTIMATE_TIME = 1.5   # 준비 단계의 형식 정보 조회 (크기 예상)
+SIM_SETUP_TIME = 1.5      # 영상/음성 단계 시작 시 형식 정보 조회
+
+
+def simulate_schedule(workload, policy='sjf', workers=2, prepare_workers=2,
+                      bandwidth=10 * 1024 * 1024, aging=1024 * 1024, prepare_lane=True):
+    """가상 시계로 작업 배치의 실행 과정을 모의 실행합니다.
+    
+    실제 JobQueue로 작업 순서를 정하고, 전송 중인 작업들이 회선 대역폭을 똑같이
+    나눠 쓴다고 가정합니다. prepare_lane이 False이면 준비 단계 없이 작업자가 자막부터
+    차례로 받던 이전 방식을 모의 실행합니다.
+    
+    Args:
+        workload (list): {'arrival', 'batch', 'caption', 'estimate', 'size', 'priority'} 딕셔너리 목록
+        policy (str): 예약 정책
+        workers (int): 영상/음성 작업자 수
+        prepare_workers (int): 준비 스레드 수
+        bandwidth (float): 회선 대역폭 (초당 바이트)
+        aging (float): JobQueue의 aging 값
+        prepare_lane (bool): 준비 단계 사용 여부
+        
+    Returns:
+        dict: 작업 완료 시간과 자막 완료 시간의 평균/백분위수 (초)
+    """
+    clock = [0.0]
+    job_queue = JobQueue(policy, aging=aging, clock=lambda: clock[0])
+    jobs = [DownloadJob(f"sim://{index}", {'caption': spec['caption'], 'video': spec['size'] > 0,
+                                           'priority': spec['priority'], 'batch': spec['batch']},
+                        job_id=f"sim-{index}", video_id=f"sim-{index}")
+            for index, spec in enumerate(workload)]
+    index_of = {job.job_id: index for index, job in enumerate(jobs)}
+    arrivals = deque(sorted(range(len(jobs)), key=lambda index: workload[index]['arrival']))
+    waiting, preparing, running = deque(), {}, {}
+    caption_at, done_at = {}, {}
+    
+    while arrivals or waiting or preparing or running or len(job_queue):
+        now = clock[0]
+        while waiting and len(preparing) < prepare_workers:
+            index = waiting.popleft()
+            spec = workload[index]
+            duration = SIM_CAPTION_TIME if spec['caption'] else 0
+            if spec['size'] and policy in ('sjf', 'fair'):
+                duration += SIM_ESTIMATE_TIME
+            preparing[index] = now + duration
+        while len(running) < workers and len(job_queue):
+            index = index_of[job_queue.get().job_id]
+            job_queue.task_done()
+            spec = workload[index]
+            setup = SIM_SETUP_TIME if spec['size'] else 0
+            if not prepare_lane and spec['caption']:
+                caption_at[index] = now + SIM_CAPTION_TIME
+                setup += SIM_CAPTION_TIME
+            running[index] = {'setup_end': now + setup, 'remaining': float(spec['size'])}
+        
+        transferring = [index for index, state in running.items() if state['setup_end'] <= now]
+        rate = bandwidth / len(transferring) if transferring else 0
+        candidates = [workload[arrivals[0]]['arrival']] if arrivals else []
+        candidates += preparing.values()
+        candidates += [state['setup_end'] for state in running.values() if state['setup_end'] > now]
+        candidates += [now + running[index]['remaining'] / rate for index in transferring]
+        if not candidates:
+            break
+        next_time = max(now, min(candidates))
+        for index in transferring:
+            running[index]['remaining'] -= rate * (next_time - now)
+        clock[0] = now = next_time
+        
+        while arrivals and workload[arrivals[0]]['arrival'] <= now:
+            index = arrivals.popleft()
+            if prepare_lane:
+                waiting.append(index)
+            else:
+                job_queue.put(jobs[index])
+        for index, end in list(preparing.items()):
+            if end <= now:
+                del preparing[index]
+                spec = workload[index]
+                if spec['caption']:
+                    caption_at[index] = now
+                if spec['size']:
+                    if policy in ('sjf', 'fair'):
+                        jobs[index].estimate = spec['estimate']
+                    job_queue.put(jobs[index])
+                else:
+                    done_at[index] = now
+        for index, state in list(running.items()):
+            if state['setup_end'] <= now and state['remaining'] <= 1e-6 * bandwidth:
+                del running[index]
+                done_at[index] = now
+    
+    completion = [done_at[index] - spec['arrival'] for index, spec in enumerate(workload)]
+    captions = [caption_at[index] - workload[index]['arrival'] for index in caption_at]
+    return {
+        'policy': policy,
+        'prepare_lane': prepare_lane,
+        'mean': round(sum(completion) / len(completion), 1),
+        'p50': round(percentile(completion, 50), 1),
+        'p95': round(percentile(completion, 95), 1),
+        'max': round(max(completion), 1),
+        'caption_mean': round(sum(captions) / len(captions), 1) if captions else None,
+        'caption_max': round(max(captions), 1) if captions else None,
+    }
+
+
+def run_bench_tool(args):
+    """standin, bench, simulate 명령을 실행합니다.
+    
+    대체 서버와 가짜 추출기 같은 벤치마크/테스트용 코드는 프로그램에 넣지 않고 저장소의
+    bench 폴더에 두므로, 이 명령을 실행할 때만 불러옵니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    # bench 폴더가 이 모듈을 경로로 다시 불러오지 않고 실행 중인 모듈을 쓰도록 등록
+    sys.modules.setdefault('youtube_downloader', sys.modules[__name__])
+    try:
+        from bench import runner, standin
+    except ImportError as e:
+        print(f"오류: 벤치마크 도구(bench 폴더)를 불러오지 못했습니다: {e}")
+        return 1
+    if args.command == 'standin':
+        return standin.run_standin(args)
+    if args.command == 'bench':
+        return runner.run_bench(args)
+    return runner.run_simulate(args)
+
+
+def print_event(event):
+    """엔진 이벤트 중 상태 메시지와 작업 완료를 표준 출력으로 출력합니다.
+    
+    Args:
+        event (dict): 엔진 이벤트
+    """
+    if event['type'] == 'status':
+        print(f"[{event['job_id'] or '-'}] {event['message']}")
+    elif event['type'] == 'job' and event['state'] in ('done', 'failed'):
+        print(f"[{event['job_id']}] 작업 {'완료' if event['state'] == 'done' else '실패'}")
+
+
+def deadline_time(value):
+    """배치 마감 시간 문자열을 마감 시각으로 변환합니다.
+    
+    Args:
+        value (str): "30m", "1h" 같은 시간 (비어 있거나 "없음"이면 마감 없음)
+        
+    Returns:
+        float: 마감 시각 (time.time() 기준, 마감이 없으면 None)
+    """
+    seconds = parse_duration('' if value == '없음' else value)
+    return time.time() + seconds if seconds else None
+
+
+def job_options_from_args(args):
+    """명령행 인자로 작업 옵션을 만듭니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+        
+    Returns:
+        dict: 작업 옵션 (DEFAULT_JOB_OPTIONS 참조)
+    """
+    return {
+        'caption': not args.no_caption,
+        'video': not args.no_video,
+        'audio': args.audio,
+        'srt': args.srt,
+        'language': args.language,
+        'resolution': args.resolution,
+        'title': args.title if len(args.urls) == 1 else '',
+        'download_path': args.output or '',
+        'priority': args.priority,
+        'deadline': deadline_time(args.deadline),
+        'job_deadline': args.job_deadline or '',
+        'clips': args.clip or [],
+        'accurate_cuts': args.accurate_cuts,
+        'split_chapters': args.split_chapters,
+        'audio_passthrough': args.audio_passthrough,
+    }
+
+
+def run_download(args):
+    """download 명령을 실행합니다.
+    
+    저널에 남아 있는 미완료 작업을 먼저 이어서 진행하고, 지정한 URL을 대기열에 넣은 뒤
+    모든 작업이 끝날 때까지 기다립니다. URL 없이 실행하면 미완료 작업만 이어서 진행합니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    try:
+        options = job_options_from_args(args)
+        parse_duration(options['job_deadline'])
+        parse_clips(options['clips'])
+    except ValueError as e:
+        print(f"오류: {e}")
+        return 1
+    config = load_config()
+    try:
+        apply_archive_arguments(args, config)
+    except ValueError as e:
+        print(f"오류: {e}")
+        return 1
+    if args.metrics_port is not None:
+        config['metrics_port'] = args.metrics_port
+    engine = DownloadEngine(config)
+    if args.profile:
+        engine.profiler = JobProfiler(args.profile, args.profile_mode, args.profile_job)
+    engine.add_listener(print_event)
+    engine.start(workers=args.workers)
+    if args.urls:
+        engine.submit_batch(args.urls, options)
+    engine.wait()
+    if engine.profiler:
+        print(f"프로파일링 결과: {engine.profiler.close()}")
+    return 0
+
+
+def run_serve(args):
+    """serve 명령을 실행합니다.
+    
+    엔진 하나를 시작하고 작업 API 서버로 공유합니다. 저널에 남아 있는 미완료 작업도
+    이어서 진행하며, Ctrl+C로 종료할 때까지 요청을 받습니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    config = load_config()
+    try:
+        apply_archive_arguments(args, config)
+    except ValueError as e:
+        print(f"오류: {e}")
+        return 1
+    if args.token is not None:
+        config['api_token'] = args.token
+    host = args.host or config['api_host']
+    if host not in ('127.0.0.1', 'localhost', '::1') and not config['api_token']:
+        print("경고: 인증 토큰 없이 외부 주소에서 요청을 받습니다. (--token 또는 api_token 설정)")
+    engine = DownloadEngine(config)
+    try:
+        server = JobApiServer(engine, config['api_port'] if args.port is None else args.port, host)
+    except OSError as e:
+        print(f"오류: 작업 API 서버를 시작할 수 없습니다: {e}")
+        return 1
+    engine.add_listener(print_event)
+    engine.start(workers=args.workers)
+    print(f"작업 API 서버: {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def open_job_store(args):
+    """--store 인자 또는 설정의 공유 작업 저장소를 엽니다.
+    
+    Returns:
+        tuple: (설정, SharedJobStore 또는 None)
+    """
+    config = load_config()
+    if args.store:
+        config['job_store'] = args.store
+    return config, SharedJobStore.from_config(config)
+
+
+def run_enqueue(args):
+    """enqueue 명령을 실행합니다. 공유 작업 저장소에 작업을 등록하고 상태를 출력합니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    config, store = open_job_store(args)
+    if store is None:
+        print("오류: 공유 작업 저장소를 지정하세요. (--store 또는 job_store 설정)")
+        return 1
+    try:
+        urls = read_urls(args)
+        options = job_options_from_args(args)
+        parse_duration(options['job_deadline'])
+        parse_clips(options['clips'])
+    except (OSError, ValueError) as e:
+        print(f"오류: {e}")
+        return 1
+    result = {}
+    if urls:
+        added, skipped = store.add(urls, options)
+        result.update(added=len(added), skipped=skipped)
+    result.update(store.stats())
+    store.close()
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+def run_worker(args):
+    """worker 명령을 실행합니다.
+    
+    공유 작업 저장소에서 작업을 가져와 실행합니다. 같은 저장소를 쓰는 작업자를 여러
+    컴퓨터에서 실행하면 작업이 나뉘어 처리됩니다. 같은 컴퓨터에서 둘 이상 실행하려면
+    폴더(저널)와 --node를 서로 다르게 지정하세요.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    config, store = open_job_store(args)
+    if store is None:
+        print("오류: 공유 작업 저장소를 지정하세요. (--store 또는 job_store 설정)")
+        return 1
+    engine = DownloadEngine(config)
+    engine.add_listener(print_event)
+    worker = ClusterWorker(engine, store, args.node).start(workers=args.workers)
+    print(f"작업자 {worker.node}: {store.path}")
+    try:
+        while not (args.exit_when_idle and worker.idle()):
+            time.sleep(ClusterWorker.POLL_INTERVAL)
+    except KeyboardInterrupt:
+        pass
+    worker.stop()
+    return 0
+
+
+def run_subscribe(args):
+    """subscribe 명령을 실행합니다. 구독을 추가하거나 지우고, URL이 없으면 구독 목록을 출력합니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    try:
+        options = job_options_from_args(args)
+        parse_duration(options['job_deadline'])
+        parse_clips(options['clips'])
+    except ValueError as e:
+        print(f"오류: {e}")
+        return 1
+    # 영상마다 파일명이 달라야 하고, 배치 마감은 동기화할 때마다 달라지므로 저장하지 않음
+    options.update(title='', deadline=None)
+    store = SubscriptionStore()
+    for url in args.urls:
+        url, newest_first = subscription_url(url)
+        if args.remove:
+            print(f"{'구독 해제' if store.remove(url) else '구독이 없습니다'}: {url}")
+            continue
+        if args.order != 'auto':
+            newest_first = args.order == 'newest'
+        store.add(url, options, newest_first, args.backfill)
+        print(f"구독 추가: {url} ({'최신순' if newest_first else '전체 목록 확인'})")
+    if not args.urls:
+        for subscription in store.subscriptions():
+            synced = (datetime.fromtimestamp(subscription['synced_at']).strftime('%Y-%m-%d %H:%M')
+                      if subscription['synced_at'] else '-')
+            print(f"{synced:<16}  {subscription['cursor'] or '-':<11}  +{subscription['last_new']:<4}  "
+                  f"{subscription['url']}" + (f"  (오류: {subscription['error']})" if subscription['error'] else ''))
+    store.close()
+    return 0
+
+
+def run_sync(args):
+    """sync 명령을 실행합니다.
+    
+    구독마다 마지막으로 본 영상 이후의 새 영상만 찾아 대기열에 넣습니다. 공유 작업
+    저장소(--store 또는 job_store)를 지정하면 엔진 대신 저장소에 등록해 작업자들이
+    나눠 받게 하고, 아니면 이 프로세스에서 받은 뒤 끝날 때까지 기다립니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    config = load_config()
+    if args.store:
+        config['job_store'] = args.store
+    store = SubscriptionStore()
+    subscriptions = store.subscriptions()
+    if args.only:
+        only = {subscription_url(url)[0] for url in args.only}
+        subscriptions = [subscription for subscription in subscriptions if subscription['url'] in only]
+    if not subscriptions:
+        print("동기화할 구독이 없습니다. (subscribe 명령으로 추가)")
+        store.close()
+        return 1
+    options = {subscription['url']: subscription['options'] for subscription in subscriptions}
+    results = ChannelSync(store, config).run(subscriptions)
+    job_store = None if args.dry_run else SharedJobStore.from_config(config)
+    engine = None
+    for result in results:
+        if args.dry_run or 'error' in result:
+            continue
+        urls = [url for _, url in result['new']]
+        if urls and job_store:
+            job_store.add(urls, options[result['url']])
+        elif urls:
+            if engine is None:
+                engine = DownloadEngine(config)
+                engine.add_listener(print_event)
+                engine.start(workers=args.workers)
+            engine.submit_batch(urls, options[result['url']])
+        # 대기열(저널 또는 공유 저장소)에 넣은 뒤 본 것으로 기록하므로 중간에 종료해도 빠지는 영상이 없음
+        store.mark_seen(result['url'], [video_id for video_id, _ in result['new']] + result['skipped'],
+                        result['cursor'], len(urls))
+    store.close()
+    summary = [{'url': result['url'], 'error': result['error']} if 'error' in result else
+               {'url': result['url'], 'new': [video_id for video_id, _ in result['new']],
+                'listed': result['listed'], 'requests': result['requests']} for result in results]
+    print(json.dumps({'subscriptions': summary,
+                      'new': sum(len(item.get('new', [])) for item in summary),
+                      'requests': sum(item.get('requests', 0) for item in summary),
+                      'errors': sum(1 for item in summary if 'error' in item)}, ensure_ascii=False, indent=2))
+    if job_store:
+        job_store.close()
+    if engine:
+        engine.wait()
+    return 0 if not any('error' in item for item in summary) else 1
+
+
+def read_urls(args):
+    """명령행 URL과 --input 파일의 URL을 합쳐 반환합니다.
+    
+    파일은 한 줄에 URL 하나이며 빈 줄과 #으로 시작하는 줄은 건너뜁니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+        
+    Returns:
+        list: URL 목록
+    """
+    urls = list(args.urls)
+    if args.input:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            urls += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    return urls
+
+
+def run_plan(args):
+    """plan 명령을 실행합니다.
+    
+    미디어를 받지 않고 메타데이터만 조회해(캐시 사용) 작업별 형식 ID, 예상 크기,
+    언어별 자막 종류와 배치 전체의 크기, 예상 소요 시간을 JSON으로 출력합니다.
+    소요 시간은 지정한 대역폭과 작업자 수로 simulate_schedule()을 실행해 계산합니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    config = load_config()
+    try:
+        apply_archive_arguments(args, config)
+        urls = read_urls(args)
+        options = job_options_from_args(args)
+        options['title'] = options['title'] if len(urls) == 1 else ''
+        options['download_path'] = options['download_path'] or config['download_path']
+        parse_duration(options['job_deadline'])
+        parse_clips(options['clips'])
+        bandwidth = (parse_rate(args.bandwidth or config['bandwidth_limit'])
+                     or parse_rate(config['assumed_throughput']))
+    except (OSError, ValueError) as e:
+        print(f"오류: {e}")
+        return 1
+    workers = args.workers or int(config['max_workers'])
+    engine = DownloadEngine(config)
+    jobs = [DownloadJob(url, options) for url in urls]
+    
+    # 자동 해상도: 배치 마감은 모든 작업이 회선을 나눠 쓰고, 작업별 마감은 작업자 수만큼 나눠 씀
+    if options['deadline']:
+        rate = bandwidth
+        window = max(options['deadline'] - time.time(), 0) / max(len(jobs), 1)
+    else:
+        rate = bandwidth / max(min(workers, len(jobs)), 1)
+        window = parse_duration(options['job_deadline'] or config['auto_resolution_deadline'])
+    
+    def plan(job):
+        try:
+            return engine.plan_job(job, rate, window)
+        except Exception as e:
+            return {'url': job.url, 'error': str(e)}
+    
+    with ThreadPoolExecutor(max_workers=int(config['host_concurrency'])) as executor:
+        plans = list(executor.map(plan, jobs))
+    for item in plans:
+        if 'bytes' in item:
+            item['estimated_seconds'] = round(item['bytes'] / rate, 1)
+    
+    planned = [item for item in plans if 'error' not in item]
+    workload = [{'arrival': 0, 'size': item['bytes'], 'estimate': item['bytes'],
+                 'caption': item['caption'], 'priority': options['priority'], 'batch': None}
+                for item in planned]
+    estimated = 0.0
+    if workload:
+        estimated = simulate_schedule(
+            workload, config['schedule_policy'], workers=workers,
+            prepare_workers=int(config['prepare_workers']), bandwidth=bandwidth,
+            aging=parse_rate(config['sjf_aging']))['max']
+    report = {
+        'jobs': len(plans),
+        'failed': len(plans) - len(planned),
+        'unknown_size': sum(1 for item in planned if item['unknown_size']),
+        'bytes': sum(item['bytes'] for item in planned),
+        'captions': sum(1 for item in planned if item['caption']),
+        'bandwidth': bandwidth,
+        'workers': workers,
+        'policy': config['schedule_policy'],
+        'estimated_seconds': estimated,
+        'metadata_cache': dict(engine.metadata.stats),
+        'response_archive': dict(engine.archive.stats) if engine.archive else None,
+        'plans': plans,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+def run_limit(args):
+    """limit 명령을 실행합니다.
+    
+    설정 파일의 속도 제한 값을 바꿉니다. 실행 중인 다운로더는 설정 파일의 변경을
+    감지해 진행 중인 다운로드에도 바로 새 제한을 적용합니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    config = load_config()
+    scheduler = BandwidthScheduler(config)
+    try:
+        if args.rate is not None:
+            if args.job:
+                scheduler.set_job_limit(args.job, args.rate)
+            else:
+                scheduler.set_global_limit(args.rate)
+        if args.per_job is not None:
+            parse_rate(args.per_job)
+            config['job_bandwidth_limit'] = args.per_job
+        if args.schedule is not None:
+            windows = []
+            for entry in args.schedule:
+                span, _, limit = entry.partition('=')
+                start, _, end = span.partition('-')
+                if not limit or not end:
+                    raise ValueError(f"잘못된 시간대 제한: {entry} (HH:MM-HH:MM=속도 형식)")
+                # "9:00"도 "09:00"으로 저장해 설정 파일의 형식을 맞춤
+                start, end, _ = parse_schedule([{'start': start, 'end': end, 'limit': limit}])[0]
+                windows.append({'start': start.strftime('%H:%M'), 'end': end.strftime('%H:%M'),
+                                'limit': limit})
+            config['bandwidth_schedule'] = windows
+    except ValueError as e:
+        print(f"오류: {e}")
+        return 1
+    save_config(config)
+    print(json.dumps({key: config[key] for key in (
+        'bandwidth_limit', 'job_bandwidth_limit', 'job_bandwidth_limits', 'bandwidth_schedule')},
+        ensure_ascii=False, indent=2))
+    return 0
+
+
+def run_verify(args):
+    """verify 명령을 실행합니다.
+    
+    폴더(하위 폴더 포함)의 해시 목록에 기록된 파일을 확인합니다. 기본 확인은 크기와
+    수정 시각만 비교하고, --deep을 지정하면 파일을 다시 읽어 해시를 비교합니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    labels = {'missing': "누락", 'size': "크기 불일치", 'modified': "변경됨", 'hash': "해시 불일치"}
+    counts = Counter()
+    for root in args.paths or [load_config()['download_path']]:
+        for folder, _, files in os.walk(root):
+            if HASH_INDEX_FILE not in files:
+                continue
+            for name, result in HashIndex.verify(folder, deep=args.deep):
+                counts[result] += 1
+                if result == 'modified':
+                    print(f"{labels[result]} (--deep으로 확인): {os.path.join(folder, name)}")
+                elif result != 'ok':
+                    print(f"{labels[result]}: {os.path.join(folder, name)}")
+    print(f"파일 {sum(counts.values())}개 확인: 정상 {counts['ok']}, "
+          + ", ".join(f"{label} {counts[result]}" for result, label in labels.items()))
+    return 0 if counts['ok'] == sum(counts.values()) else 1
+
+
+def run_gc(args):
+    """gc 명령을 실행합니다. 어떤 이름도 가리키지 않는 저장소 파일을 지웁니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    store = MediaStore.from_config(load_config())
+    if store is None:
+        print("설정 파일에 저장소(media_store)가 지정되지 않았습니다.")
+        return 1
+    removed, reclaimed = store.gc(dry_run=args.dry_run)
+    store.close()
+    action = "지울 수 있는" if args.dry_run else "지운"
+    print(f"{action} 파일 {removed}개, {reclaimed / (1024 * 1024):.1f}MB")
+    return 0
+
+
+def run_timings(args):
+    """timings 명령을 실행합니다.
+    
+    단계별 소요 시간 로그를 읽어 세부 단계별 횟수, 오류 수, p50/p95/최대 소요 시간,
+    바이트 합계를 JSON으로 출력합니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    path = args.log or load_config()['phase_log'] or PHASE_LOG_FILE
+    if not os.path.exists(path):
+        print(f"단계별 소요 시간 로그가 없습니다: {path} "
+              f"(설정 파일에 \"phase_log\": \"{PHASE_LOG_FILE}\"를 넣으면 다운로드할 때 기록)")
+        return 1
+    try:
+        since = time.time() - parse_duration(args.since) if args.since else 0
+    except ValueError as e:
+        print(f"오류: {e}")
+        return 1
+    events = [event for event in PhaseLog.read(path)
+              if event.get('time', 0) >= since and (not args.job or event.get('job_id') == args.job)
+              and (not args.stage or event.get('stage') == args.stage)]
+    print(json.dumps({'events': len(events), 'phases': PhaseLog.summarize(events)},
+                     ensure_ascii=False, indent=2))
+    return 0
+
+
+def run_jobs(args):
+    """jobs 명령을 실행합니다. 저널에 기록된 최근 작업 목록을 출력합니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    journal = JobJournal()
+    for job_id, state, title, url in journal.list_jobs(args.limit):
+        print(f"{job_id}  {state:<9}  {title or '-'}  {url}")
+    journal.close()
+    return 0
+
+
+def run_control(args):
+    """pause/resume/cancel 명령을 실행합니다.
+    
+    제어 요청을 저널에 남기면 실행 중인 다운로더(GUI 또는 download 명령)가
+    1초 안에 적용합니다. 실행 중인 다운로더가 없으면 다음에 시작할 때 적용됩니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+    """
+    journal = JobJournal()
+    journal.request_control(args.command, args.job_id)
+    journal.close()
+    target = args.job_id or "모든 작업"
+    print(f"{target}: {args.command} 요청을 남겼습니다.")
+    return 0
+
+
+def add_archive_arguments(parser):
+    """download/plan 명령이 함께 쓰는 응답 기록/재생 인자를 추가합니다.
+    
+    Args:
+        parser (argparse.ArgumentParser): 인자를 추가할 파서
+    """
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--record', metavar='ARCHIVE', help="메타데이터/제목/자막 응답을 이 파일에 기록")
+    group.add_argument('--replay', metavar='ARCHIVE',
+                       help="네트워크 대신 이 파일에 기록한 응답을 사용 (URL을 생략하면 기록한 모든 영상)")
+    parser.add_argument('--replay-delay', type=float,
+                        help="재생할 때 기록한 응답 시간에 곱해 기다릴 배율 (기본값: 0, 기다리지 않음)")
+
+
+def apply_archive_arguments(args, config):
+    """응답 기록/재생 인자를 설정에 반영하고, 재생할 때 URL이 없으면 기록한 영상 URL을 채웁니다.
+    
+    Args:
+        args (argparse.Namespace): 명령행 인자
+        config (dict): 반영할 설정
+    """
+    if args.record or args.replay:
+        config['response_archive'] = args.record or args.replay
+        config['response_archive_mode'] = 'record' if args.record else 'replay'
+    if args.replay_delay is not None:
+        config['replay_delay'] = args.replay_delay
+    if args.replay:
+        # 파일이 없으면 여기서 ValueError를 발생시켜 명령이 오류 메시지를 출력하게 함
+        archive = ResponseArchive(args.replay)
+        # URL을 받지 않는 명령(serve)은 기록한 영상을 채우지 않음
+        if hasattr(args, 'urls') and not args.urls and not getattr(args, 'input', None):
+            args.urls = [f"https://www.youtube.com/watch?v={video_id}" for video_id in archive.video_ids()]
+        archive.close()
+
+
+def add_job_arguments(parser):
+    """download/plan 명령이 함께 쓰는 작업 옵션 인자를 추가합니다.
+    
+    Args:
+        parser (argparse.ArgumentParser): 인자를 추가할 파서
+    """
+    parser.add_argument('--no-caption', action='store_true', help="자막 받지 않음")
+    parser.add_argument('--no-video', action='store_true', help="영상 받지 않음")
+    parser.add_argument('--audio', action='store_true', help="음성(mp3) 받기")
+    parser.add_argument('--srt', action='store_true', help="자막을 SRT 형식으로 저장")
+    parser.add_argument('--language', default='한국어', choices=["한국어", "영어", "모든 언어"])
+    parser.add_argument('--resolution', default='2160p', choices=[AUTO_RESOLUTION, "2160p", "1080p", "720p"],
+                        help=f"해상도 ({AUTO_RESOLUTION}: 측정한 속도로 마감에 맞는 해상도 선택)")
+    parser.add_argument('--deadline', help=f"{AUTO_RESOLUTION} 해상도에서 모든 작업을 받을 시간 (예: 30m, 1h)")
+    parser.add_argument('--job-deadline', help=f"{AUTO_RESOLUTION} 해상도에서 작업별로 받을 시간 (예: 10m)")
+    parser.add_argument('--title', default='', help="저장할 파일명 (URL이 하나일 때만 사용)")
+    parser.add_argument('--output', help="저장 경로 (기본값: 설정 파일의 저장 경로)")
+    parser.add_argument('--priority', type=int, default=0, help="우선순위 (높을수록 먼저 실행)")
+    parser.add_argument('--clip', action='append', metavar='START-END|CHAPTER',
+                        help="받을 구간 (예: 1:02:00-1:04:00) 또는 챕터 이름, 여러 번 지정 가능")
+    parser.add_argument('--accurate-cuts', action='store_true',
+                        help="구간 경계를 다시 인코딩해 정확히 자름 (기본값: 키프레임 단위)")
+    parser.add_argument('--split-chapters', action='store_true',
+                        help="음성을 챕터별 파일로 나눔 (ffmpeg 1회 실행)")
+    parser.add_argument('--audio-passthrough', action='store_true',
+                        help="음성을 mp3로 변환하지 않고 원본 코덱 그대로 저장")
+
+
+def main(argv=None):
+    """명령행 인자를 해석해 GUI 또는 지정한 명령을 실행합니다.
+    
+    Args:
+        argv (list): 명령행 인자 (None이면 sys.argv 사용)
+    """
+    parser = argparse.ArgumentParser(description="유튜브 다운로더")
+    commands = parser.add_subparsers(dest='command')
+    
+    standin = commands.add_parser('standin', help="오류를 주입하는 로컬 HTTP 대체 서버 실행")
+    standin.add_argument('--port', type=int, default=0)
+    standin.add_argument('--fail-rate', type=float, default=0.0, help="오류 응답 비율 (0-1)")
+    standin.add_argument('--fail-status', type=int, nargs='+', default=[429, 503])
+    standin.add_argument('--fail-first', type=int, default=0, help="처음 N개 요청을 오류로 응답")
+    standin.add_argument('--retry-after', type=int, default=None, help="오류 응답의 Retry-After (초)")
+    standin.add_argument('--seed', type=int, default=None)
+    standin.add_argument('--probe', type=int, default=0, help="요청 N개를 보내고 결과 요약 출력")
+    standin.add_argument('--concurrency', type=int, default=4, help="--probe 동시 요청 수")
+    standin.add_argument('--latency', type=float, default=0.0, help="응답 전 지연 시간 (초)")
+    standin.add_argument('--conn-rate', default='', help="연결별 전송 속도 제한 (예: 512K)")
+    standin.add_argument('--segments', type=int, default=30, help="DASH 세그먼트 수")
+    standin.add_argument('--segment-size', default='256K', help="DASH 세그먼트 크기")
+    standin.add_argument('--dash-probe', type=int, default=0,
+                         help="DASH 스트림을 N번 받아 동시 조각 수 조정 결과 출력")
+    standin.add_argument('--file-size', default='32M', help="단일 파일(/progressive.mp4) 크기")
+    standin.add_argument('--segmented-probe', type=int, default=0, metavar='CONNECTIONS',
+                         help="단일 파일을 연결 1개와 N개로 받아 처리량 비교")
+    
+    bench = commands.add_parser('bench', help="대체 서버와 가짜 추출기로 전체 과정을 오프라인 벤치마크")
+    bench.add_argument('--jobs', type=int, default=8, help="받을 가짜 영상 수")
+    bench.add_argument('--workers', type=int, default=2, help="동시에 실행할 작업 수")
+    bench.add_argument('--stream', choices=('progressive', 'dash', 'mixed'), default='progressive',
+                       help="가짜 영상의 형식 (단일 파일, DASH, 둘 다)")
+    bench.add_argument('--file-size', default='16M', help="단일 파일 크기")
+    bench.add_argument('--segments', type=int, default=30, help="DASH 세그먼트 수")
+    bench.add_argument('--segment-size', default='256K', help="DASH 세그먼트 크기")
+    bench.add_argument('--latency', type=float, default=0.0, help="응답 전 지연 시간 (초)")
+    bench.add_argument('--conn-rate', default='', help="연결별 전송 속도 제한 (예: 4M)")
+    bench.add_argument('--fail-rate', type=float, default=0.0, help="오류 응답 비율 (0-1)")
+    bench.add_argument('--seed', type=int, default=0)
+    bench.add_argument('--report', help="결과 JSON을 저장할 파일")
+    bench.add_argument('--compare', help="비교할 이전 결과 JSON 파일")
+    bench.add_argument('--nodes', type=int, default=0,
+                       help="공유 작업 저장소를 함께 쓰는 작업자 프로세스 수 (0이면 한 프로세스에서 실행)")
+    bench.add_argument('--lease', default='5s', help="--nodes에서 사용할 임대 시간")
+    bench.add_argument('--kill-after', type=float, help="--nodes에서 이 시간(초) 뒤 첫 작업자를 강제 종료")
+    
+    enqueue = commands.add_parser('enqueue', help="공유 작업 저장소에 작업 등록 (URL 없이 실행하면 상태 출력)")
+    enqueue.add_argument('urls', nargs='*', help="YouTube 영상 URL")
+    enqueue.add_argument('--input', help="URL 목록 파일 (한 줄에 하나)")
+    enqueue.add_argument('--store', help="공유 작업 저장소 파일 (기본값: 설정값)")
+    add_job_arguments(enqueue)
+    
+    subscribe = commands.add_parser('subscribe', help="채널/재생목록 구독 추가 (URL 없이 실행하면 구독 목록 출력)")
+    subscribe.add_argument('urls', nargs='*', help="채널 또는 재생목록 URL")
+    subscribe.add_argument('--remove', action='store_true', help="구독 해제")
+    subscribe.add_argument('--backfill', type=int,
+                           help="처음 동기화할 때 받을 최신 영상 수 (기본값: 전체, 0이면 앞으로 올라올 영상만)")
+    subscribe.add_argument('--order', choices=('auto', 'newest', 'full'), default='auto',
+                           help="목록 순서 (newest: 아는 영상에서 조회 중단, full: 매번 전체 확인, 기본값: URL로 판단)")
+    add_job_arguments(subscribe)
+    
+    sync = commands.add_parser('sync', help="구독한 채널/재생목록의 새 영상만 대기열에 추가")
+    sync.add_argument('--only', action='append', metavar='URL', help="이 구독만 동기화 (여러 번 지정 가능)")
+    sync.add_argument('--dry-run', action='store_true', help="새 영상만 출력하고 대기열에 넣지 않음")
+    sync.add_argument('--store', help="새 영상을 등록할 공유 작업 저장소 (기본값: 설정값, 없으면 바로 받음)")
+    sync.add_argument('--workers', type=int, help="동시에 실행할 작업 수")
+    
+    worker = commands.add_parser('worker', help="공유 작업 저장소의 작업을 가져와 실행")
+    worker.add_argument('--store', help="공유 작업 저장소 파일 (기본값: 설정값)")
+    worker.add_argument('--node', help="작업자 이름 (기본값: 설정값 또는 컴퓨터 이름)")
+    worker.add_argument('--workers', type=int, help="동시에 실행할 작업 수")
+    worker.add_argument('--exit-when-idle', action='store_true', help="저장소에 남은 작업이 없으면 종료")
+    
+    download = commands.add_parser('download', help="GUI 없이 다운로드 (미완료 작업 이어받기 포함)")
+    download.add_argument('urls', nargs='*', help="YouTube 영상 URL")
+    add_job_arguments(download)
+    add_archive_arguments(download)
+    download.add_argument('--workers', type=int, help="동시에 실행할 작업 수")
+    download.add_argument('--metrics-port', type=int,
+                          help="이 포트의 /metrics에서 Prometheus 형식 지표 제공 (기본값: 설정값)")
+    download.add_argument('--profile', metavar='DIR',
+                          help="CPU 프로파일링 결과(작업별 파일과 hotspots.txt)를 저장할 폴더")
+    download.add_argument('--profile-mode', choices=('sample', 'cprofile'), default='sample',
+                          help="표본 수집(sample, 기본값) 또는 cProfile(cprofile)")
+    download.add_argument('--profile-job', action='append', metavar='ID',
+                          help="이 작업 ID 또는 영상 ID만 프로파일링 (여러 번 지정 가능, 기본값: 전체)")
+    
+    serve = commands.add_parser('serve', help="엔진을 HTTP/JSON 작업 API 서버로 실행 (여러 클라이언트가 공유)")
+    serve.add_argument('--host', help="받을 주소 (기본값: 설정값 127.0.0.1)")
+    serve.add_argument('--port', type=int, help="포트 (기본값: 설정값 8765, 0이면 임의의 빈 포트)")
+    serve.add_argument('--token', help="인증 토큰 (기본값: 설정값)")
+    serve.add_argument('--workers', type=int, help="동시에 실행할 작업 수")
+    add_archive_arguments(serve)
+    
+    plan = commands.add_parser('plan', help="받지 않고 배치의 형식, 크기, 예상 시간을 JSON으로 출력")
+    plan.add_argument('urls', nargs='*', help="YouTube 영상 URL")
+    plan.add_argument('--input', help="URL 목록 파일 (한 줄에 하나)")
+    add_job_arguments(plan)
+    add_archive_arguments(plan)
+    plan.add_argument('--workers', type=int, help="동시에 실행할 작업 수 (기본값: 설정값)")
+    plan.add_argument('--bandwidth', help="회선 대역폭 (예: 10M, 기본값: 전체 속도 제한 또는 가정 속도)")
+    plan.add_argument('--report', help="JSON을 저장할 파일 (기본값: 표준 출력)")
+    
+    limit = commands.add_parser('limit', help="실행 중인 다운로드의 속도 제한 변경")
+    limit.add_argument('rate', nargs='?', help="속도 제한 (예: 500K, 2M, 0은 무제한)")
+    limit.add_argument('--job', help="이 영상 ID의 작업에만 제한 적용")
+    limit.add_argument('--per-job', help="작업별 기본 속도 제한")
+    limit.add_argument('--schedule', nargs='*', metavar='HH:MM-HH:MM=RATE',
+                       help="시간대별 전체 제한 (인자 없이 지정하면 시간대 제한 해제)")
+    
+    simulate = commands.add_parser('simulate', help="예약 정책별 완료 시간 모의 실행")
+    simulate.add_argument('--policies', nargs='+', default=list(JobQueue.POLICIES),
+                          choices=JobQueue.POLICIES, help="비교할 예약 정책")
+    simulate.add_argument('--workers', type=int, default=2, help="영상/음성 작업자 수")
+    simulate.add_argument('--prepare-workers', type=int, default=2, help="준비 스레드 수")
+    simulate.add_argument('--bandwidth', default='10M', help="회선 대역폭 (예: 10M)")
+    simulate.add_argument('--aging', default='1M', help="sjf/fair의 aging 값 (초당 바이트)")
+    simulate.add_argument('--seed', type=int, default=1, help="모의 배치 난수 시드")
+    
+    verify = commands.add_parser('verify', help="받은 파일을 해시 목록과 비교해 확인")
+    verify.add_argument('paths', nargs='*', help="확인할 폴더 (기본값: 설정 파일의 저장 경로)")
+    verify.add_argument('--deep', action='store_true', help="파일을 다시 읽어 해시까지 비교")
+    
+    gc = commands.add_parser('gc', help="어떤 파일명도 가리키지 않는 저장소 파일 정리")
+    gc.add_argument('--dry-run', action='store_true', help="지우지 않고 정리할 크기만 출력")
+    
+    timings = commands.add_parser('timings', help="단계별 소요 시간(p50/p95) 요약")
+    timings.add_argument('--since', help="최근 이 시간 동안의 기록만 (예: 1h, 30m)")
+    timings.add_argument('--job', help="이 작업 ID의 기록만")
+    timings.add_argument('--stage', choices=JOB_STAGES, help="이 작업 단계의 기록만")
+    timings.add_argument('--log', help="로그 파일 경로 (기본값: 설정값)")
+    
+    jobs = commands.add_parser('jobs', help="최근 작업 목록 출력")
+    jobs.add_argument('--limit', type=int, default=50, help="출력할 최대 작업 수")
+    
+    for command, help_text in (('pause', "작업 일시 정지"), ('resume', "일시 정지된 작업 재개"),
+                               ('cancel', "작업 취소")):
+        control = commands.add_parser(command, help=help_text)
+        control.add_argument('job_id', nargs='?', help="작업 ID (생략하면 모든 작업)")
+    
+    args = parser.parse_args(argv)
+    if args.command in ('standin', 'bench', 'simulate'):
+        return run_bench_tool(args)
+    if args.command == 'limit':
+        return run_limit(args)
+    if args.command == 'download':
+        return run_download(args)
+    if args.command == 'serve':
+        return run_serve(args)
+    if args.command == 'enqueue':
+        return run_enqueue(args)
+    if args.command == 'worker':
+        return run_worker(args)
+    if args.command == 'subscribe':
+        return run_subscribe(args)
+    if args.command == 'sync':
+        return run_sync(args)
+    if args.command == 'plan':
+        return run_plan(args)
+    if args.command == 'verify':
+        return run_verify(args)
+    if args.command == 'gc':
+        return run_gc(args)
+    if args.command == 'timings':
+        return run_timings(args)
+    if args.command == 'jobs':
+        return run_jobs(args)
+    if args.command in ('pause', 'resume', 'cancel'):
+        return run_control(args)
+    
     app = YouTubeDownloader()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file